@@ -1,34 +1,198 @@
 # app/chatgpt_wrapper.py
 
 import os
+import re
+import atexit
+import asyncio
 import time
+import random
 import logging
 import json
 import io
 import base64
-from typing import Optional, Dict, Any, List
+import hashlib
+import sqlite3
+import tempfile
+from typing import Optional, Dict, Any, List, Tuple
 from functools import lru_cache
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from enum import Enum
+import threading
 from threading import Lock
 
+import httpx
 import requests
-from openai import OpenAI, APITimeoutError, APIConnectionError, RateLimitError, APIError
+from openai import (
+    OpenAI, AsyncOpenAI, APITimeoutError, APIConnectionError, RateLimitError, APIError,
+    AuthenticationError, PermissionDeniedError,
+)
 from openai.types.chat import ChatCompletion
-from dotenv import load_dotenv
-from langdetect import detect, LangDetectException
+from langdetect import DetectorFactory, LangDetectException
+from langdetect.detector_factory import PROFILES_DIRECTORY
 from pathlib import Path
 
+from env_loader import load_local_env
 from openai_api_key import resolve_openai_api_key
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Logging is configured by the entry point (main.py / AppConfig._setup_logging).
 logger = logging.getLogger(__name__)
 
-_functions_dir = Path(__file__).resolve().parent
-load_dotenv(_functions_dir / ".env.local")
-load_dotenv(_functions_dir.parent / ".env")
-load_dotenv()
+load_local_env()
+
+# Retry backoff: base * 2**(attempt-1), capped, plus up to _BACKOFF_JITTER
+# seconds of random jitter so concurrent instances don't retry in lockstep.
+_BACKOFF_CAP = 30.0
+_BACKOFF_JITTER = 0.25
+
+# Single case-insensitive pass over the user prompt for injection markers.
+_SUSPICIOUS_RE = re.compile(r"<script>|javascript:|data:text/html", re.IGNORECASE)
+
+
+# Connection pool shared by every ChatGPTWrapper in the process.
+_HTTP_LIMITS = httpx.Limits(max_connections=128, max_keepalive_connections=64)
+_shared_http_client: Optional[httpx.Client] = None
+_shared_http_lock = Lock()
+
+
+def _get_shared_http_client() -> httpx.Client:
+    """Get or create the process-wide pooled httpx client for OpenAI calls"""
+    global _shared_http_client
+    with _shared_http_lock:
+        if _shared_http_client is None or _shared_http_client.is_closed:
+            _shared_http_client = httpx.Client(limits=_HTTP_LIMITS)
+        return _shared_http_client
+
+
+@atexit.register
+def _close_shared_http_client() -> None:
+    if _shared_http_client is not None and not _shared_http_client.is_closed:
+        _shared_http_client.close()
+
+
+# langdetect profiles are parsed once per process into our own factory; the
+# fixed seed makes detection deterministic across calls and instances. Only
+# the languages LanguageDetector.LANGUAGE_MAP can name are loaded, which
+# keeps the n-gram tables (the bulk of langdetect's memory) smaller.
+DetectorFactory.seed = 0
+_detector_factory: Optional[DetectorFactory] = None
+_detector_factory_lock = Lock()
+
+
+def _get_detector_factory() -> DetectorFactory:
+    """Get or load the process-wide langdetect profile factory"""
+    global _detector_factory
+    if _detector_factory is None:
+        with _detector_factory_lock:
+            if _detector_factory is None:
+                wanted = LanguageDetector.LANGUAGE_MAP.keys()
+                profiles = []
+                for code in sorted(wanted):
+                    profile_path = Path(PROFILES_DIRECTORY) / code
+                    if profile_path.is_file():
+                        profiles.append(profile_path.read_text(encoding="utf-8"))
+                factory = DetectorFactory()
+                factory.load_json_profile(profiles)
+                _detector_factory = factory
+    return _detector_factory
+
+
+# Scripts that identify exactly one LANGUAGE_MAP language, checked in order
+# (kana before Han so Japanese with kanji resolves to ja). Only consulted when
+# the text has no Latin letters; ASCII text and shared scripts such as Arabic
+# (ar/fa/ur) or Cyrillic still go through langdetect.
+_LATIN_RE = re.compile(r"[A-Za-z\u00C0-\u024F]")
+_SCRIPT_HINTS = (
+    (re.compile(r"[\u3040-\u30FF]"), "ja"),
+    (re.compile(r"[\uAC00-\uD7AF\u1100-\u11FF]"), "ko"),
+    (re.compile(r"[\u0E00-\u0E7F]"), "th"),
+    (re.compile(r"[\u4E00-\u9FFF]"), "zh-cn"),
+    (re.compile(r"[\u0590-\u05FF]"), "he"),
+    (re.compile(r"[\u0370-\u03FF]"), "el"),
+)
+
+
+class LanguageCacheStore:
+    """SQLite-backed sample-hash -> language code cache that survives restarts.
+
+    Cloud Run / Cloud Functions instances keep /tmp across warm requests and
+    the in-memory lru_cache resets on every cold start, so persisting results
+    avoids re-running langdetect for prompts seen by a previous process.
+    Any SQLite failure disables the store and detection simply falls back to
+    langdetect.
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disabled = not path
+        self._lock = Lock()
+
+    @staticmethod
+    def _key(sample: str) -> str:
+        return hashlib.blake2b(sample.encode("utf-8"), digest_size=8).hexdigest()
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if self._conn is None and not self._disabled:
+            try:
+                conn = sqlite3.connect(self.path, check_same_thread=False, timeout=1.0)
+                conn.execute("CREATE TABLE IF NOT EXISTS lang (key TEXT PRIMARY KEY, code TEXT NOT NULL)")
+                conn.commit()
+                self._conn = conn
+            except sqlite3.Error as e:
+                logger.warning(f"Language cache disabled ({self.path}): {e}")
+                self._disabled = True
+        return self._conn
+
+    def get(self, sample: str) -> Optional[str]:
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute("SELECT code FROM lang WHERE key = ?", (self._key(sample),)).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"Language cache read failed: {e}")
+                return None
+            return row[0] if row else None
+
+    def set(self, sample: str, code: str) -> None:
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return
+            try:
+                conn.execute("INSERT OR REPLACE INTO lang (key, code) VALUES (?, ?)", (self._key(sample), code))
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Language cache write failed: {e}")
+
+
+# Set LANGDETECT_CACHE_PATH to an empty string to disable the persistent cache.
+_language_cache = LanguageCacheStore(
+    os.getenv("LANGDETECT_CACHE_PATH", os.path.join(tempfile.gettempdir(), "langdetect_cache.sqlite3"))
+)
+
+
+# (exception type, log level, log label, user-facing message) checked in order
+# by ChatGPTWrapper._handle_api_error; subclasses must precede their bases.
+_API_ERROR_TABLE = (
+    (APITimeoutError, logging.WARNING, "API timeout",
+     "Request timed out. Please try again in a moment."),
+    (APIConnectionError, logging.WARNING, "API connection error",
+     "Connection issue. Please check your internet connection and try again."),
+    (RateLimitError, logging.WARNING, "Rate limit exceeded",
+     "I'm currently experiencing high demand. Please try again in a moment."),
+    (AuthenticationError, logging.ERROR, "OpenAI authentication error",
+     "Service configuration error. Please contact support."),
+    (PermissionDeniedError, logging.ERROR, "OpenAI permission error",
+     "Service configuration error. Please contact support."),
+    (APIError, logging.ERROR, "OpenAI API error",
+     "Service temporarily unavailable. Please try again later."),
+    (TimeoutError, logging.WARNING, "Timeout",
+     "Request timed out. Please try again."),
+    (ConnectionError, logging.WARNING, "Network error",
+     "Network connection issue. Please try again."),
+)
 
 
 class RateLimitExceededError(Exception):
@@ -87,22 +251,68 @@ class LanguageDetector:
         'vi': 'Vietnamese', 'id': 'Indonesian', 'ms': 'Malay', 'tl': 'Filipino'
     }
     
+    # langdetect scores n-grams over the whole input and degrades badly on long
+    # unbroken strings; language identity is stable within a short prefix.
+    SAMPLE_CHARS = 512
+
     @staticmethod
-    @lru_cache(maxsize=1000)
     def detect_language(text: str) -> str:
         """Detect language with caching for performance"""
+        if not text or len(text.strip()) < 3:
+            return 'en'  # Default to English for very short texts
+        return LanguageDetector._detect_sample(text[:LanguageDetector.SAMPLE_CHARS])
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _detect_sample(sample: str) -> str:
+        """Cached langdetect call keyed on the truncated sample"""
+        hint = LanguageDetector._script_hint(sample)
+        if hint:
+            return hint
+        cached = _language_cache.get(sample)
+        if cached:
+            return cached
         try:
-            if not text or len(text.strip()) < 3:
-                return 'en'  # Default to English for very short texts
-            return detect(text)
+            # Fresh Detector per call: its probability state is not reusable.
+            detector = _get_detector_factory().create()
+            detector.append(sample)
+            code = detector.detect()
         except LangDetectException:
-            logger.warning(f"Could not detect language for text: {text[:50]}...")
+            logger.warning(f"Could not detect language for text: {sample[:50]}...")
             return 'en'
+        _language_cache.set(sample, code)
+        return code
+    
+    @staticmethod
+    def _script_hint(sample: str) -> Optional[str]:
+        """Language implied by a single-language script when no Latin text is present"""
+        if _LATIN_RE.search(sample):
+            return None
+        for pattern, code in _SCRIPT_HINTS:
+            if pattern.search(sample):
+                return code
+        return None
     
     @staticmethod
     def get_language_name(language_code: str) -> str:
         """Get full language name from code"""
-        return LanguageDetector.LANGUAGE_MAP.get(language_code.lower(), language_code)
+        # Keys are lowercase and callers usually pass lowercase codes, so try
+        # the exact key before paying for lower().
+        language_map = LanguageDetector.LANGUAGE_MAP
+        return language_map.get(language_code) or language_map.get(language_code.lower(), language_code)
+
+    @staticmethod
+    def detect_language_name(text: str) -> str:
+        """Detect language and resolve it to a full name in one cached step"""
+        if not text or len(text.strip()) < 3:
+            return LanguageDetector.LANGUAGE_MAP['en']
+        return LanguageDetector._detect_sample_name(text[:LanguageDetector.SAMPLE_CHARS])
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _detect_sample_name(sample: str) -> str:
+        code = LanguageDetector._detect_sample(sample)
+        return LanguageDetector.get_language_name(code)
 
 class CircuitBreaker:
     """Circuit breaker to prevent cascading failures.
@@ -164,64 +374,68 @@ class CircuitBreaker:
             logger.info("Circuit breaker manually reset")
 
 class RateLimiter:
-    """Simple rate limiter for API calls"""
+    """Token-bucket rate limiter for API calls.
+
+    Allows bursts of up to ``max_calls`` and refills continuously at
+    ``max_calls / time_window`` tokens per second, so every check is O(1).
+    """
     
     def __init__(self, max_calls: int = 8, time_window: float = 60.0):
         self.max_calls = max_calls
         self.time_window = time_window
-        self.calls: List[float] = []
+        self.capacity = float(max_calls)
+        self.rate = max_calls / time_window
+        self.tokens = float(max_calls)
+        self.last_refill = time.monotonic()
         self.lock = Lock()  # Thread-safe operations
     
+    def _refill(self) -> None:
+        """Top up tokens for the time elapsed since the last refill (lock held)."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+    
     def can_proceed(self) -> bool:
         """Check if we can make another API call"""
         with self.lock:
-            now = time.time()
-            # Remove old calls outside the time window
-            self.calls = [call_time for call_time in self.calls if now - call_time < self.time_window]
-            return len(self.calls) < self.max_calls
+            self._refill()
+            return self.tokens >= 1.0
     
     def record_call(self):
         """Record an API call"""
         with self.lock:
-            self.calls.append(time.time())
+            self._refill()
+            self.tokens -= 1.0
     
     def get_wait_time(self) -> float:
         """Get the time to wait before the next call is allowed"""
         with self.lock:
-            if not self.calls:
+            self._refill()
+            if self.tokens >= 1.0:
                 return 0.0
-            now = time.time()
-            # Find the oldest call still in the window
-            valid_calls = [call_time for call_time in self.calls if now - call_time < self.time_window]
-            if len(valid_calls) < self.max_calls:
-                return 0.0
-            # Calculate when the oldest call will expire
-            oldest_call = min(valid_calls)
-            return (oldest_call + self.time_window) - now
+            return (1.0 - self.tokens) / self.rate
 
-class ChatGPTWrapper:
-    """Enhanced ChatGPT wrapper with error handling, retries, and monitoring"""
-    
-    def __init__(self, api_key: Optional[str] = None, config: Optional[ChatConfig] = None):
-        """Initialize the ChatGPT wrapper"""
+class _ChatCoreMixin:
+    """Transport-agnostic chat plumbing shared by the sync and async wrappers.
+
+    Covers input validation, request building, response handling and the
+    retry / circuit-breaker policy. Subclasses own ``self.client`` and drive
+    :meth:`_api_call_steps` with their own transport and sleep.
+    """
+
+    def _init_core(self, api_key: Optional[str], config: Optional[ChatConfig]) -> None:
+        """Resolve the API key and set up config, rate limiter and breaker"""
         self.api_key = api_key or resolve_openai_api_key()
         if not self.api_key:
             raise EnvironmentError(
                 "OPENAI_API_KEY is not set (env/Secret Manager or Firestore ai_api_key/open-api-key)."
             )
-        
+
         self.config = config or ChatConfig()
-        # Create client with more granular timeout control
-        self.client = OpenAI(
-            api_key=self.api_key,
-            timeout=(self.config.connection_timeout, self.config.read_timeout)
-        )
         self.rate_limiter = RateLimiter()
         self.circuit_breaker = CircuitBreaker()
         self.language_detector = LanguageDetector()
-        
-        logger.info(f"ChatGPT wrapper initialized with model: {self.config.model}")
-    
+
     def reset_circuit_breaker(self):
         """Manually reset the circuit breaker if it's stuck open"""
         self.circuit_breaker.reset()
@@ -234,11 +448,10 @@ class ChatGPTWrapper:
             raise ValueError("user_prompt cannot be empty")
         
         # Check for potential injection attempts
-        suspicious_patterns = ['<script>', 'javascript:', 'data:text/html']
-        for pattern in suspicious_patterns:
-            if pattern.lower() in user_prompt.lower():
-                logger.warning(f"Potential injection attempt detected: {pattern}")
-                raise ValueError("Invalid input detected")
+        match = _SUSPICIOUS_RE.search(user_prompt)
+        if match:
+            logger.warning(f"Potential injection attempt detected: {match.group(0).lower()}")
+            raise ValueError("Invalid input detected")
     
     def _prepare_messages(self, system_prompt: str, user_prompt: str, 
                          language_name: Optional[str] = None) -> List[Dict[str, str]]:
@@ -254,46 +467,18 @@ class ChatGPTWrapper:
     
     def _handle_api_error(self, error: Exception, attempt: int) -> str:
         """Handle API errors with appropriate logging and fallback"""
-        error_msg = str(error)
-        
-        # Handle specific OpenAI exceptions
-        if isinstance(error, APITimeoutError):
-            logger.warning(f"API timeout on attempt {attempt}: {error_msg}")
-            return "Request timed out. Please try again in a moment."
-        
-        elif isinstance(error, APIConnectionError):
-            logger.warning(f"API connection error on attempt {attempt}: {error_msg}")
-            return "Connection issue. Please check your internet connection and try again."
-        
-        elif isinstance(error, RateLimitError):
-            logger.warning(f"Rate limit exceeded on attempt {attempt}")
-            return "I'm currently experiencing high demand. Please try again in a moment."
-        
-        elif isinstance(error, APIError):
-            logger.error(f"OpenAI API error on attempt {attempt}: {error_msg}")
-            if "quota" in error_msg.lower():
-                return "Service temporarily unavailable due to quota limits."
-            elif "authentication" in error_msg.lower():
-                return "Service configuration error. Please contact support."
-            else:
-                return "Service temporarily unavailable. Please try again later."
-        
-        # Handle general error patterns
-        elif "timeout" in error_msg.lower() or "timed out" in error_msg.lower():
-            logger.warning(f"Timeout on attempt {attempt}: {error_msg}")
-            return "Request timed out. Please try again."
-        
-        elif "connection" in error_msg.lower() or "network" in error_msg.lower():
-            logger.warning(f"Network error on attempt {attempt}: {error_msg}")
-            return "Network connection issue. Please try again."
-        
-        elif "rate limit" in error_msg.lower():
-            logger.warning(f"Rate limit hit on attempt {attempt}")
-            return "I'm currently experiencing high demand. Please try again in a moment."
-        
-        else:
-            logger.error(f"Unexpected API error on attempt {attempt}: {error_msg}")
-            return "I encountered an unexpected error. Please try again later."
+        # OpenAI reports an exhausted billing quota as a 429 with this code.
+        if getattr(error, "code", None) == "insufficient_quota":
+            logger.error(f"OpenAI quota exhausted on attempt {attempt}: {error}")
+            return "Service temporarily unavailable due to quota limits."
+
+        for exc_type, level, label, user_msg in _API_ERROR_TABLE:
+            if isinstance(error, exc_type):
+                logger.log(level, f"{label} on attempt {attempt}: {error}")
+                return user_msg
+
+        logger.error(f"Unexpected API error on attempt {attempt}: {error}")
+        return "I encountered an unexpected error. Please try again later."
     
     def _extract_retry_after(self, error: Exception) -> Optional[float]:
         """Extract retry-after time from error response if available"""
@@ -308,211 +493,315 @@ class ChatGPTWrapper:
             pass
         return None
     
-    def _make_api_call(self, messages: List[Dict[str, str]], config: Optional[ChatConfig] = None, attempt: int = 1) -> str:
-        """Make API call with retry logic and circuit breaker"""
-        try:
-            # Check circuit breaker first
-            if not self.circuit_breaker.can_proceed():
-                logger.warning(
-                    "Circuit breaker is OPEN, request blocked (last: %s)",
-                    self.circuit_breaker.last_error or "unknown",
-                )
-                return "Service is temporarily unavailable due to recent failures. Please try again later."
-            
-            # Use provided config or fall back to default
-            current_config = config or self.config
-            
-            # Check rate limiting
-            if not self.rate_limiter.can_proceed():
-                wait_time = max(self.rate_limiter.get_wait_time(), current_config.retry_delay * 2)
-                logger.warning(f"Rate limit exceeded, waiting {wait_time:.1f}s...")
-                time.sleep(wait_time)
-            
-            self.rate_limiter.record_call()
-            
-            # Models that use newer API parameters (max_completion_tokens, no temp/top_p)
-            reasoning_models = ["o1", "o1-mini", "o1-preview", "o3-mini", "o3"]
-            # Models that only support temperature=1.0 but use standard max_completion_tokens
-            temp_restricted_models = ["gpt-5-mini", "gpt-5.1", "gpt-5.2", "gpt-5"]
-            
-            model_lower = current_config.model.lower()
-            is_reasoning_model = any(rm in model_lower for rm in reasoning_models)
-            is_temp_restricted = any(rm in model_lower for rm in temp_restricted_models)
-            
-            # Build API call parameters based on model type
-            api_params = {
-                "model": current_config.model,
-                "messages": messages,
-            }
-            
-            # Use appropriate max tokens parameter based on model
-            if is_reasoning_model:
-                # Reasoning models use max_completion_tokens
-                api_params["max_completion_tokens"] = current_config.max_completion_tokens
-            else:
-                # Standard models use max_completion_tokens
-                api_params["max_completion_tokens"] = current_config.max_completion_tokens
-            
-            # Only include temperature/top_p if the model supports them
-            if not is_reasoning_model and not is_temp_restricted:
-                api_params["temperature"] = current_config.temperature
-                api_params["top_p"] = current_config.top_p
-            elif current_config.temperature != 1.0:
-                logger.info(f"Model {current_config.model} only supports temperature=1.0, ignoring temperature={current_config.temperature}")
-
-            # Constrain output to JSON when requested (callers that parse the reply).
-            if current_config.response_format:
-                api_params["response_format"] = current_config.response_format
-            
-            logger.info(f"API params: model={current_config.model}, max_completion_tokens={current_config.max_completion_tokens}")
-            
-            # Make the API call
-            response: ChatCompletion = self.client.chat.completions.create(**api_params)
-            
-            # Log response details for debugging
-            logger.debug(f"Response: {response}")
-            # Extract content from response, handling various response formats
-            content = None
-            if response.choices and len(response.choices) > 0:
-                message = response.choices[0].message
-                finish_reason = response.choices[0].finish_reason
-                logger.debug(f"Message: {message}, finish_reason: {finish_reason}")
-            
-                content = message.content
-                # Check for refusal (some models return refusal instead of content)
-                if not content and hasattr(message, 'refusal') and message.refusal:
-                    logger.warning(f"Model refused to respond: {message.refusal}")
-                    content = f"Unable to process request: {message.refusal}"
-                
-                # Log finish reason for debugging
-                finish_reason = response.choices[0].finish_reason
-                if finish_reason and finish_reason != "stop":
-                    logger.info(f"Response finish_reason: {finish_reason}")
-                
-                # Log if content is empty (regardless of finish_reason)
-                if not content:
-                    logger.warning(f"Empty content received. finish_reason={finish_reason}, usage={response.usage}")
-            
+    @staticmethod
+    def _backoff_delay(base: float, attempt: int) -> float:
+        """Capped exponential backoff with a small random jitter."""
+        return min(_BACKOFF_CAP, base * (2 ** (attempt - 1))) + random.random() * _BACKOFF_JITTER
+
+    def _build_api_params(self, messages: List[Dict[str, Any]], current_config: ChatConfig) -> Dict[str, Any]:
+        """Build chat.completions.create kwargs for the configured model"""
+        # Models that use newer API parameters (max_completion_tokens, no temp/top_p)
+        reasoning_models = ["o1", "o1-mini", "o1-preview", "o3-mini", "o3"]
+        # Models that only support temperature=1.0 but use standard max_completion_tokens
+        temp_restricted_models = ["gpt-5-mini", "gpt-5.1", "gpt-5.2", "gpt-5"]
+
+        model_lower = current_config.model.lower()
+        is_reasoning_model = any(rm in model_lower for rm in reasoning_models)
+        is_temp_restricted = any(rm in model_lower for rm in temp_restricted_models)
+
+        # Build API call parameters based on model type
+        api_params = {
+            "model": current_config.model,
+            "messages": messages,
+        }
+
+        # Use appropriate max tokens parameter based on model
+        if is_reasoning_model:
+            # Reasoning models use max_completion_tokens
+            api_params["max_completion_tokens"] = current_config.max_completion_tokens
+        else:
+            # Standard models use max_completion_tokens
+            api_params["max_completion_tokens"] = current_config.max_completion_tokens
+
+        # Only include temperature/top_p if the model supports them
+        if not is_reasoning_model and not is_temp_restricted:
+            api_params["temperature"] = current_config.temperature
+            api_params["top_p"] = current_config.top_p
+        elif current_config.temperature != 1.0:
+            logger.info(f"Model {current_config.model} only supports temperature=1.0, ignoring temperature={current_config.temperature}")
+
+        # Constrain output to JSON when requested (callers that parse the reply).
+        if current_config.response_format:
+            api_params["response_format"] = current_config.response_format
+
+        logger.info(f"API params: model={current_config.model}, max_completion_tokens={current_config.max_completion_tokens}")
+        return api_params
+
+    def _process_response(self, response: ChatCompletion, current_config: ChatConfig, attempt: int) -> str:
+        """Extract the reply text from a completion and record success"""
+        # Log response details for debugging
+        logger.debug(f"Response: {response}")
+        # Extract content from response, handling various response formats
+        content = None
+        if response.choices and len(response.choices) > 0:
+            message = response.choices[0].message
+            finish_reason = response.choices[0].finish_reason
+            logger.debug(f"Message: {message}, finish_reason: {finish_reason}")
+
+            content = message.content
+            # Check for refusal (some models return refusal instead of content)
+            if not content and hasattr(message, 'refusal') and message.refusal:
+                logger.warning(f"Model refused to respond: {message.refusal}")
+                content = f"Unable to process request: {message.refusal}"
+
+            # Log finish reason for debugging
+            finish_reason = response.choices[0].finish_reason
+            if finish_reason and finish_reason != "stop":
+                logger.info(f"Response finish_reason: {finish_reason}")
+
+            # Log if content is empty (regardless of finish_reason)
             if not content:
-                # Log response structure for debugging
-                finish_reason = response.choices[0].finish_reason if response.choices else None
-                logger.warning(f"Empty response. Model: {current_config.model}, Choices: {len(response.choices) if response.choices else 0}, finish_reason: {finish_reason}")
-                if response.choices and len(response.choices) > 0:
-                    logger.warning(f"Message object: {response.choices[0].message}")
-                
-                # Don't trip circuit breaker for empty responses - it's likely a prompt/token issue, not service failure
-                # Return a user-friendly message instead of raising an exception
-                if finish_reason == "length":
-                    logger.warning(f"Response cut off due to token limit. max_completion_tokens={current_config.max_completion_tokens}")
-                    return "Response was cut off due to token limit. Please try with a shorter prompt or increase max_completion_tokens."
-                else:
-                    return "The model returned an empty response. Please try rephrasing your request."
-            
-            # Handle partial response (content exists but was cut off)
+                logger.warning(f"Empty content received. finish_reason={finish_reason}, usage={response.usage}")
+
+        if not content:
+            # Log response structure for debugging
             finish_reason = response.choices[0].finish_reason if response.choices else None
-            if finish_reason == "length" and content:
-                logger.warning(f"Response truncated at {len(content)} chars due to token limit ({current_config.max_completion_tokens} tokens)")
-                # Return the partial content - it may still be useful
-            
-            # Record success in circuit breaker
-            self.circuit_breaker.record_success()
-            logger.info(f"API call successful (attempt {attempt})")
-            return content.strip()
-            
-        except RateLimitError as e:
-            # Rate limits are transient — do not count intermediate retries toward
-            # the circuit breaker; only the final exhausted attempt counts.
-            retry_after = self._extract_retry_after(e)
-
-            if attempt < current_config.max_retries:
-                if retry_after:
-                    backoff_time = retry_after + (time.time() % 1)  # Add jitter
-                else:
-                    backoff_time = 5.0 * (2 ** (attempt - 1)) + (time.time() % 1)
+            logger.warning(f"Empty response. Model: {current_config.model}, Choices: {len(response.choices) if response.choices else 0}, finish_reason: {finish_reason}")
+            if response.choices and len(response.choices) > 0:
+                logger.warning(f"Message object: {response.choices[0].message}")
 
-                logger.warning(
-                    "Rate limit exceeded on attempt %d, retrying in %.1fs...",
-                    attempt, backoff_time,
-                )
-                time.sleep(backoff_time)
-                return self._make_api_call(messages, config, attempt + 1)
+            # Don't trip circuit breaker for empty responses - it's likely a prompt/token issue, not service failure
+            # Return a user-friendly message instead of raising an exception
+            if finish_reason == "length":
+                logger.warning(f"Response cut off due to token limit. max_completion_tokens={current_config.max_completion_tokens}")
+                return "Response was cut off due to token limit. Please try with a shorter prompt or increase max_completion_tokens."
+            else:
+                return "The model returned an empty response. Please try rephrasing your request."
+
+        # Handle partial response (content exists but was cut off)
+        finish_reason = response.choices[0].finish_reason if response.choices else None
+        if finish_reason == "length" and content:
+            logger.warning(f"Response truncated at {len(content)} chars due to token limit ({current_config.max_completion_tokens} tokens)")
+            # Return the partial content - it may still be useful
 
-            logger.error(
-                "Rate limit exceeded after %d attempts",
-                current_config.max_retries,
+        # Record success in circuit breaker
+        self.circuit_breaker.record_success()
+        logger.info(f"API call successful (attempt {attempt})")
+        return content.strip()
+
+    @staticmethod
+    def _is_auth_error(error_msg: str) -> bool:
+        """Auth / config errors are permanent and must never be retried"""
+        low_err = error_msg.lower()
+        return (
+            "401" in error_msg
+            or "invalid_api_key" in low_err
+            or "incorrect api key" in low_err
+            or "authentication" in low_err
+        )
+
+    @staticmethod
+    def _fallback_config(error_msg: str, current_config: ChatConfig, attempt: int) -> Optional[ChatConfig]:
+        """Config for an immediate one-off retry after a parameter rejection, if any"""
+        if attempt != 1:
+            return None
+        low_err = error_msg.lower()
+
+        # Some models reject response_format / json_object mode. Retry once
+        # immediately without it rather than burning the backoff budget — the
+        # caller still parses the reply defensively.
+        if "response_format" in low_err and current_config.response_format:
+            logger.warning("Model rejected response_format; retrying without it")
+            return replace(current_config, response_format=None)
+
+        # Check for temperature not supported error - don't retry with exponential backoff,
+        # instead retry immediately (once) without temperature parameter
+        if "temperature" in low_err and "unsupported" in low_err:
+            logger.warning(f"Model doesn't support custom temperature, retrying without temperature parameter")
+            return replace(
+                current_config,
+                temperature=1.0,  # Use default temperature
+                top_p=1.0,  # Also reset top_p to default
             )
-            self.circuit_breaker.record_failure(str(e))
-            raise RateLimitExceededError(
-                "Rate limit exceeded. Please try again later.",
-                retry_after=retry_after,
+        return None
+
+    def _rate_limit_backoff(self, error: RateLimitError, current_config: ChatConfig, attempt: int) -> float:
+        """Seconds to wait before retrying a 429, or raise once retries are exhausted"""
+        # Rate limits are transient — do not count intermediate retries toward
+        # the circuit breaker; only the final exhausted attempt counts.
+        retry_after = self._extract_retry_after(error)
+
+        if attempt < current_config.max_retries:
+            if retry_after:
+                backoff_time = retry_after + random.random() * _BACKOFF_JITTER
+            else:
+                backoff_time = self._backoff_delay(5.0, attempt)
+            logger.warning(
+                "Rate limit exceeded on attempt %d, retrying in %.1fs...",
+                attempt, backoff_time,
             )
-            
-        except Exception as e:
-            error_msg = str(e)
-
-            # Auth / config errors are permanent — never retry them.
-            low_err = error_msg.lower()
-            if (
-                "401" in error_msg
-                or "invalid_api_key" in low_err
-                or "incorrect api key" in low_err
-                or "authentication" in low_err
-            ):
-                logger.error("OpenAI auth/config error (no retry): %s", error_msg[:300])
+            return backoff_time
+
+        logger.error(
+            "Rate limit exceeded after %d attempts",
+            current_config.max_retries,
+        )
+        self.circuit_breaker.record_failure(str(error))
+        raise RateLimitExceededError(
+            "Rate limit exceeded. Please try again later.",
+            retry_after=retry_after,
+        )
+
+    def _api_call_steps(self, messages: List[Dict[str, str]], config: Optional[ChatConfig] = None):
+        """Retry logic and circuit breaker for one API call, as a generator.
+
+        Yields a float to ask the driver to sleep that many seconds, or a dict
+        of chat.completions.create kwargs; the driver sends back the response
+        or throws the exception the call raised. Returns the reply text.
+        """
+        # Use provided config or fall back to default
+        current_config = config or self.config
+        attempt = 1
+
+        while True:
+            try:
+                # Check circuit breaker first
+                if not self.circuit_breaker.can_proceed():
+                    logger.warning(
+                        "Circuit breaker is OPEN, request blocked (last: %s)",
+                        self.circuit_breaker.last_error or "unknown",
+                    )
+                    return "Service is temporarily unavailable due to recent failures. Please try again later."
+
+                # Check rate limiting
+                if not self.rate_limiter.can_proceed():
+                    wait_time = max(self.rate_limiter.get_wait_time(), current_config.retry_delay * 2)
+                    logger.warning(f"Rate limit exceeded, waiting {wait_time:.1f}s...")
+                    yield wait_time
+
+                self.rate_limiter.record_call()
+
+                # Make the API call
+                response: ChatCompletion = yield self._build_api_params(messages, current_config)
+                return self._process_response(response, current_config, attempt)
+
+            except RateLimitError as e:
+                yield self._rate_limit_backoff(e, current_config, attempt)
+                attempt += 1
+
+            except Exception as e:
+                error_msg = str(e)
+
+                if self._is_auth_error(error_msg):
+                    logger.error("OpenAI auth/config error (no retry): %s", error_msg[:300])
+                    self.circuit_breaker.record_failure(error_msg)
+                    return "Service configuration error. Please contact support."
+
+                fallback = self._fallback_config(error_msg, current_config, attempt)
+                if fallback is not None:
+                    current_config = fallback
+                    attempt += 1
+                    continue
+
+                # Count one breaker failure only after all retries for this call are
+                # exhausted — not on each intermediate attempt (which used to trip
+                # the breaker after a single bad request with max_retries=5).
+                if attempt < current_config.max_retries:
+                    backoff_time = self._backoff_delay(current_config.retry_delay, attempt)
+                    logger.warning(
+                        "API call failed on attempt %d: %s, retrying in %.1fs",
+                        attempt, error_msg, backoff_time,
+                    )
+                    yield backoff_time
+                    attempt += 1
+                    continue
+
                 self.circuit_breaker.record_failure(error_msg)
-                return "Service configuration error. Please contact support."
-            
-            # Some models reject response_format / json_object mode. Retry once
-            # immediately without it rather than burning the backoff budget — the
-            # caller still parses the reply defensively.
-            if "response_format" in error_msg.lower() and current_config.response_format:
-                logger.warning("Model rejected response_format; retrying without it")
-                no_fmt = ChatConfig(
-                    model=current_config.model,
-                    temperature=current_config.temperature,
-                    top_p=current_config.top_p,
-                    max_completion_tokens=current_config.max_completion_tokens,
-                    timeout=current_config.timeout,
-                    max_retries=current_config.max_retries,
-                    retry_delay=current_config.retry_delay,
-                    response_format=None,
-                )
-                if attempt == 1:
-                    return self._make_api_call(messages, no_fmt, attempt + 1)
-
-            # Check for temperature not supported error - don't retry with exponential backoff,
-            # instead retry immediately without temperature parameter
-            if "temperature" in error_msg.lower() and "unsupported" in error_msg.lower():
-                logger.warning(f"Model doesn't support custom temperature, retrying without temperature parameter")
-                # Create a new config with default temperature
-                temp_config = ChatConfig(
-                    model=current_config.model,
-                    temperature=1.0,  # Use default temperature
-                    top_p=1.0,  # Also reset top_p to default
-                    max_completion_tokens=current_config.max_completion_tokens,
-                    timeout=current_config.timeout,
-                    max_retries=current_config.max_retries,
-                    retry_delay=current_config.retry_delay
-                )
-                # Retry once with the corrected config
-                if attempt == 1:  # Only retry once for this specific error
-                    return self._make_api_call(messages, temp_config, attempt + 1)
-
-            # Count one breaker failure only after all retries for this call are
-            # exhausted — not on each intermediate attempt (which used to trip
-            # the breaker after a single bad request with max_retries=5).
-            if attempt < current_config.max_retries:
-                backoff_time = current_config.retry_delay * (2 ** (attempt - 1)) + (time.time() % 1)
-                logger.warning(
-                    "API call failed on attempt %d: %s, retrying in %.1fs",
-                    attempt, error_msg, backoff_time,
-                )
-                time.sleep(backoff_time)
-                return self._make_api_call(messages, config, attempt + 1)
+                return self._handle_api_error(e, attempt)
 
-            self.circuit_breaker.record_failure(error_msg)
-            return self._handle_api_error(e, attempt)
+    def _build_chat_request(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        top_p: Optional[float] = None,
+        max_completion_tokens: Optional[int] = None,
+        auto_detect_language: bool = True,
+        reply_language: Optional[str] = None,
+        language: Optional[str] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[List[Dict[str, str]], ChatConfig]:
+        """Validate inputs and resolve the messages + effective config for a chat call"""
+        # Validate inputs
+        self._validate_inputs(system_prompt, user_prompt)
+
+        # Determine language
+        language_name = None
+        if language:
+            language_name = self.language_detector.get_language_name(language)
+        elif reply_language:
+            language_name = self.language_detector.get_language_name(reply_language)
+        elif auto_detect_language:
+            language_name = self.language_detector.detect_language_name(user_prompt)
+            logger.debug(f"Detected language: {language_name}")
+
+        # Prepare messages
+        messages = self._prepare_messages(system_prompt, user_prompt, language_name)
+
+        # Override config only for parameters actually provided (0.0 is a
+        # valid temperature/top_p, so compare against None, not truthiness).
+        overrides = {
+            key: value
+            for key, value in (
+                ("model", model),
+                ("temperature", temperature),
+                ("top_p", top_p),
+                ("max_completion_tokens", max_completion_tokens),
+                ("response_format", response_format),
+            )
+            if value is not None
+        }
+        current_config = replace(self.config, **overrides) if overrides else self.config
+        return messages, current_config
+
+
+class ChatGPTWrapper(_ChatCoreMixin):
+    """Enhanced ChatGPT wrapper with error handling, retries, and monitoring"""
     
+    def __init__(self, api_key: Optional[str] = None, config: Optional[ChatConfig] = None):
+        """Initialize the ChatGPT wrapper"""
+        self._init_core(api_key, config)
+        # Create client with more granular timeout control. The underlying
+        # connection pool is shared process-wide so warm instances reuse
+        # keep-alive connections instead of paying a TLS handshake per request.
+        self.client = OpenAI(
+            api_key=self.api_key,
+            timeout=httpx.Timeout(self.config.read_timeout, connect=self.config.connection_timeout),
+            http_client=_get_shared_http_client(),
+        )
+        
+        logger.info(f"ChatGPT wrapper initialized with model: {self.config.model}")
+
+    def _make_api_call(self, messages: List[Dict[str, str]], config: Optional[ChatConfig] = None) -> str:
+        """Make API call with retry logic and circuit breaker"""
+        steps = self._api_call_steps(messages, config)
+        try:
+            step = next(steps)
+            while True:
+                if isinstance(step, dict):
+                    try:
+                        response = self.client.chat.completions.create(**step)
+                    except Exception as e:
+                        step = steps.throw(e)
+                    else:
+                        step = steps.send(response)
+                else:
+                    time.sleep(step)
+                    step = next(steps)
+        except StopIteration as done:
+            return done.value
+
     def chat_with_gpt(
         self,
         system_prompt: str,
@@ -549,33 +838,10 @@ class ChatGPTWrapper:
         start_time = time.time()
         
         try:
-            # Validate inputs
-            self._validate_inputs(system_prompt, user_prompt)
-            
-            # Determine language
-            language_name = None
-            if language:
-                language_name = self.language_detector.get_language_name(language)
-            elif reply_language:
-                language_name = self.language_detector.get_language_name(reply_language)
-            elif auto_detect_language:
-                user_language_code = self.language_detector.detect_language(user_prompt)
-                logger.debug(f"Detected language: {user_language_code}")
-                language_name = self.language_detector.get_language_name(user_language_code)
-            
-            # Prepare messages
-            messages = self._prepare_messages(system_prompt, user_prompt, language_name)
-            
-            # Override config if parameters provided
-            current_config = ChatConfig(
-                model=model or self.config.model,
-                temperature=temperature or self.config.temperature,
-                top_p=top_p or self.config.top_p,
-                max_completion_tokens=max_completion_tokens or self.config.max_completion_tokens,
-                timeout=self.config.timeout,
-                max_retries=self.config.max_retries,
-                retry_delay=self.config.retry_delay,
-                response_format=response_format,
+            messages, current_config = self._build_chat_request(
+                system_prompt, user_prompt, model, temperature, top_p,
+                max_completion_tokens, auto_detect_language, reply_language,
+                language, response_format,
             )
             
             # Make API call
@@ -637,14 +903,10 @@ class ChatGPTWrapper:
                 {"role": "user", "content": content},
             ]
 
-            current_config = ChatConfig(
+            current_config = replace(
+                self.config,
                 model=model or self.config.model,
-                temperature=self.config.temperature,
-                top_p=self.config.top_p,
                 max_completion_tokens=max_completion_tokens or self.config.max_completion_tokens,
-                timeout=self.config.timeout,
-                max_retries=self.config.max_retries,
-                retry_delay=self.config.retry_delay,
                 response_format=response_format,
             )
 
@@ -890,14 +1152,112 @@ class ChatGPTWrapper:
             logger.error(f"Speech transcription failed: {e}")
             raise
 
+class AsyncChatGPTWrapper(_ChatCoreMixin):
+    """Asyncio chat client for dispatching many prompts concurrently.
+
+    Shares validation, parameter building, retry policy and error handling with
+    ChatGPTWrapper through _ChatCoreMixin; only the transport (AsyncOpenAI) and
+    sleeps are async. The httpx pool is per instance because async clients are
+    bound to the event loop that uses them.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, config: Optional[ChatConfig] = None):
+        """Initialize the async ChatGPT wrapper"""
+        self._init_core(api_key, config)
+        self.client = AsyncOpenAI(
+            api_key=self.api_key,
+            timeout=httpx.Timeout(self.config.read_timeout, connect=self.config.connection_timeout),
+            http_client=httpx.AsyncClient(limits=_HTTP_LIMITS),
+        )
+
+        logger.info(f"Async ChatGPT wrapper initialized with model: {self.config.model}")
+
+    async def aclose(self) -> None:
+        """Close the underlying async HTTP connection pool"""
+        await self.client.close()
+
+    async def _make_api_call(self, messages: List[Dict[str, str]], config: Optional[ChatConfig] = None) -> str:
+        """Make API call with retry logic and circuit breaker (async)"""
+        steps = self._api_call_steps(messages, config)
+        try:
+            step = next(steps)
+            while True:
+                if isinstance(step, dict):
+                    try:
+                        response = await self.client.chat.completions.create(**step)
+                    except Exception as e:
+                        step = steps.throw(e)
+                    else:
+                        step = steps.send(response)
+                else:
+                    await asyncio.sleep(step)
+                    step = next(steps)
+        except StopIteration as done:
+            return done.value
+
+    async def chat_with_gpt(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        top_p: Optional[float] = None,
+        max_completion_tokens: Optional[int] = None,
+        auto_detect_language: bool = True,
+        reply_language: Optional[str] = None,
+        language: Optional[str] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Async counterpart of ChatGPTWrapper.chat_with_gpt (same arguments and errors)."""
+        start_time = time.time()
+
+        try:
+            messages, current_config = self._build_chat_request(
+                system_prompt, user_prompt, model, temperature, top_p,
+                max_completion_tokens, auto_detect_language, reply_language,
+                language, response_format,
+            )
+            response = await self._make_api_call(messages, current_config)
+            logger.info(f"Chat completion completed in {time.time() - start_time:.2f}s")
+            return response
+
+        except Exception as e:
+            duration = time.time() - start_time
+            logger.error(f"Chat completion failed after {duration:.2f}s: {str(e)}")
+            raise RuntimeError(f"Failed to communicate with OpenAI API: {str(e)}") from e
+
+    async def chat_many(self, items: List[Dict[str, Any]], concurrency: int = 8) -> List[Any]:
+        """
+        Run several chat_with_gpt calls concurrently.
+
+        Args:
+            items: One dict of chat_with_gpt keyword arguments per request
+            concurrency: Maximum number of requests in flight at once
+
+        Returns:
+            Replies in the same order as ``items``; a failed request yields its
+            exception instead of aborting the whole batch.
+        """
+        sem = asyncio.Semaphore(max(1, concurrency))
+
+        async def _one(item: Dict[str, Any]) -> str:
+            async with sem:
+                return await self.chat_with_gpt(**item)
+
+        return await asyncio.gather(*[_one(item) for item in items], return_exceptions=True)
+
+
 # Global instance for backward compatibility
 _default_wrapper = None
+_default_wrapper_lock = Lock()
 
 def get_default_wrapper() -> ChatGPTWrapper:
     """Get or create the default ChatGPT wrapper instance"""
     global _default_wrapper
     if _default_wrapper is None:
-        _default_wrapper = ChatGPTWrapper()
+        with _default_wrapper_lock:
+            if _default_wrapper is None:
+                _default_wrapper = ChatGPTWrapper()
     return _default_wrapper
 
 def reset_circuit_breaker():
@@ -957,4 +1317,20 @@ def chat_with_images(
         max_completion_tokens=max_completion_tokens,
         reply_language=reply_language,
         response_format=response_format,
-    )
\ No newline at end of file
+    )
+
+
+def _warm_up() -> None:
+    """Build the default wrapper and load langdetect profiles ahead of the first request"""
+    try:
+        get_default_wrapper()
+        _get_detector_factory()
+        logger.info("chatgpt_wrapper warm-up complete")
+    except Exception as e:
+        logger.warning(f"chatgpt_wrapper warm-up skipped: {e}")
+
+
+# Opt-in (CHATGPT_WRAPPER_PRELOAD=1) so tests and scripts don't pay for it.
+# Runs in a daemon thread so importing the module is never blocked.
+if os.getenv("CHATGPT_WRAPPER_PRELOAD", "").strip().lower() in ("1", "true", "yes"):
+    threading.Thread(target=_warm_up, name="chatgpt-wrapper-warmup", daemon=True).start()
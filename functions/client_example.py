@@ -4,10 +4,26 @@ Client example for the School Schedule Optimization Google Cloud Function
 This script demonstrates how to use the API from a Python client
 """
 
-import requests
+import asyncio
+import httpx
 import json
 import time
-from typing import Dict, Any, Optional
+from collections import Counter
+from typing import Dict, Any, List, Optional
+
+# Transient gateway / throttling responses from Cloud Run worth retrying.
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5
+
+DEFAULT_HEADERS = {
+    'Content-Type': 'application/json',
+    'User-Agent': 'ScheduleOptimizerClient/1.0'
+}
+# HTTP/2 multiplexes concurrent calls over one TLS connection; the pool
+# still caps how many connections parallel callers can open.
+DEFAULT_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16)
+DEFAULT_TIMEOUT = 30.0
 
 class ScheduleOptimizerClient:
     """Client for the School Schedule Optimization API"""
@@ -21,23 +37,33 @@ class ScheduleOptimizerClient:
                      e.g., 'https://your-project.cloudfunctions.net'
         """
         self.base_url = base_url.rstrip('/')
-        self.session = requests.Session()
-        self.session.headers.update({
-            'Content-Type': 'application/json',
-            'User-Agent': 'ScheduleOptimizerClient/1.0'
-        })
+        self.client = httpx.Client(
+            headers=DEFAULT_HEADERS,
+            timeout=DEFAULT_TIMEOUT,
+            transport=httpx.HTTPTransport(http2=True, limits=DEFAULT_LIMITS, retries=MAX_RETRIES),
+        )
     
-    def health_check(self) -> Dict[str, Any]:
-        """Check if the service is healthy"""
-        response = self.session.get(f"{self.base_url}/health_check")
+    def close(self):
+        """Close the underlying connection pool"""
+        self.client.close()
+    
+    def _request(self, method: str, path: str, **kwargs) -> Dict[str, Any]:
+        """Send a request, retrying transient status codes with backoff"""
+        for attempt in range(MAX_RETRIES + 1):
+            response = self.client.request(method, f"{self.base_url}/{path}", **kwargs)
+            if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                break
+            time.sleep(BACKOFF_FACTOR * (2 ** attempt))
         response.raise_for_status()
         return response.json()
     
+    def health_check(self) -> Dict[str, Any]:
+        """Check if the service is healthy"""
+        return self._request("GET", "health_check")
+    
     def get_schedule_info(self) -> Dict[str, Any]:
         """Get information about the API"""
-        response = self.session.get(f"{self.base_url}/get_schedule_info")
-        response.raise_for_status()
-        return response.json()
+        return self._request("GET", "get_schedule_info")
     
     def generate_schedule(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -49,12 +75,54 @@ class ScheduleOptimizerClient:
         Returns:
             Generated schedule data
         """
-        response = self.session.post(
-            f"{self.base_url}/generate_schedule",
-            json=parameters
+        return self._request("POST", "generate_schedule", json=parameters)
+
+class AsyncScheduleOptimizerClient:
+    """Async client for firing several schedule generations concurrently"""
+    
+    def __init__(self, base_url: str):
+        """
+        Initialize the client
+        
+        Args:
+            base_url: Base URL of the Google Cloud Function
+        """
+        self.base_url = base_url.rstrip('/')
+        self.client = httpx.AsyncClient(
+            headers=DEFAULT_HEADERS,
+            timeout=DEFAULT_TIMEOUT,
+            transport=httpx.AsyncHTTPTransport(http2=True, limits=DEFAULT_LIMITS, retries=MAX_RETRIES),
         )
+    
+    async def aclose(self):
+        """Close the underlying connection pool"""
+        await self.client.aclose()
+    
+    async def _request(self, method: str, path: str, **kwargs) -> Dict[str, Any]:
+        """Send a request, retrying transient status codes with backoff"""
+        for attempt in range(MAX_RETRIES + 1):
+            response = await self.client.request(method, f"{self.base_url}/{path}", **kwargs)
+            if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                break
+            await asyncio.sleep(BACKOFF_FACTOR * (2 ** attempt))
         response.raise_for_status()
         return response.json()
+    
+    async def generate_schedule(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate a school schedule"""
+        return await self._request("POST", "generate_schedule", json=parameters)
+    
+    async def generate_many(self, parameter_sets: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Generate several schedules concurrently
+        
+        Returns:
+            Results in input order; a failed call yields its exception
+        """
+        return await asyncio.gather(
+            *(self.generate_schedule(params) for params in parameter_sets),
+            return_exceptions=True,
+        )
 
 def print_schedule_summary(schedule_data: Dict[str, Any]):
     """Print a summary of the generated schedule"""
@@ -70,29 +138,17 @@ def print_schedule_summary(schedule_data: Dict[str, Any]):
     print(f"📊 Total assignments: {metadata.get('total_assignments', 0)}")
     print(f"🏠 Homeroom assignments: {metadata.get('homeroom_assignments', 0)}")
     
-    # Group by teacher
-    teacher_assignments = {}
-    for assignment in schedule:
-        teacher = assignment['Teacher']
-        if teacher not in teacher_assignments:
-            teacher_assignments[teacher] = []
-        teacher_assignments[teacher].append(assignment)
+    # Count periods per teacher and per grade
+    teacher_counts = Counter(assignment['Teacher'] for assignment in schedule)
+    grade_counts = Counter(assignment['Grade'] for assignment in schedule)
     
     print(f"\n👨‍🏫 Teacher assignments:")
-    for teacher, assignments in sorted(teacher_assignments.items()):
-        print(f"  {teacher}: {len(assignments)} periods")
-    
-    # Group by grade
-    grade_assignments = {}
-    for assignment in schedule:
-        grade = assignment['Grade']
-        if grade not in grade_assignments:
-            grade_assignments[grade] = []
-        grade_assignments[grade].append(assignment)
+    for teacher, count in sorted(teacher_counts.items()):
+        print(f"  {teacher}: {count} periods")
     
     print(f"\n📚 Grade assignments:")
-    for grade, assignments in sorted(grade_assignments.items()):
-        print(f"  {grade}: {len(assignments)} periods")
+    for grade, count in sorted(grade_counts.items()):
+        print(f"  {grade}: {count} periods")
     
     # Show homeroom assignments
     if homeroom:
@@ -173,22 +229,24 @@ def main():
             json.dump(schedule_data, f, indent=2)
         print(f"\n💾 Schedule saved to {output_file}")
         
-    except requests.exceptions.ConnectionError:
+    except httpx.ConnectError:
         print("❌ Connection error: Could not connect to the API")
         print("   Make sure the Google Cloud Function is deployed and running")
         print(f"   URL: {base_url}")
         
-    except requests.exceptions.HTTPError as e:
+    except httpx.HTTPStatusError as e:
         print(f"❌ HTTP error: {e}")
-        if e.response is not None:
-            try:
-                error_data = e.response.json()
-                print(f"   Error details: {error_data}")
-            except:
-                print(f"   Response: {e.response.text}")
+        try:
+            error_data = e.response.json()
+            print(f"   Error details: {error_data}")
+        except:
+            print(f"   Response: {e.response.text}")
                 
     except Exception as e:
         print(f"❌ Unexpected error: {e}")
+    
+    finally:
+        client.close()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
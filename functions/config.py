@@ -4,17 +4,17 @@ import os
 import logging
 from typing import Optional, Dict, Any
 from dataclasses import dataclass, field
+from functools import cached_property
 from enum import Enum
-from dotenv import load_dotenv
 
+from env_loader import load_local_env
 from openai_api_key import resolve_openai_api_key
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Logging is configured by AppConfig._setup_logging once the config loads.
 logger = logging.getLogger(__name__)
 
 # Load environment variables
-load_dotenv()
+load_local_env()
 
 class Environment(Enum):
     """Environment types"""
@@ -30,63 +30,152 @@ class LogLevel(Enum):
     ERROR = "ERROR"
     CRITICAL = "CRITICAL"
 
+# Environment readers. Each config's from_env() reads every key exactly once;
+# the dataclass defaults below mirror the env fallbacks. Sub-configs built
+# directly (OpenAIConfig(), ...) use those defaults and ignore the environment.
+_E = os.environ
+
+
+def _env_int(key: str, default: int) -> int:
+    return int(_E.get(key, default))
+
+
+def _env_float(key: str, default: float) -> float:
+    return float(_E.get(key, default))
+
+
+def _env_bool(key: str, default: bool) -> bool:
+    value = _E.get(key)
+    return default if value is None else value.lower() == "true"
+
+
 @dataclass
 class OpenAIConfig:
     """OpenAI API configuration"""
-    api_key: str = field(default_factory=resolve_openai_api_key)
-    model: str = field(default_factory=lambda: os.getenv("OPENAI_MODEL", "gpt-5-mini"))
-    max_completion_tokens: int = field(default_factory=lambda: int(os.getenv("OPENAI_max_completion_tokens", "300")))
-    temperature: float = field(default_factory=lambda: float(os.getenv("OPENAI_TEMPERATURE", "1.0")))
-    top_p: float = field(default_factory=lambda: float(os.getenv("OPENAI_TOP_P", "0.9")))
-    timeout: int = field(default_factory=lambda: int(os.getenv("OPENAI_TIMEOUT", "60")))
-    max_retries: int = field(default_factory=lambda: int(os.getenv("OPENAI_MAX_RETRIES", "3")))
-    retry_delay: float = field(default_factory=lambda: float(os.getenv("OPENAI_RETRY_DELAY", "1.0")))
-    rate_limit_calls: int = field(default_factory=lambda: int(os.getenv("OPENAI_RATE_LIMIT_CALLS", "10")))
-    rate_limit_window: float = field(default_factory=lambda: float(os.getenv("OPENAI_RATE_LIMIT_WINDOW", "60.0")))
+    api_key: str = ""
+    model: str = "gpt-5-mini"
+    max_completion_tokens: int = 300
+    temperature: float = 1.0
+    top_p: float = 0.9
+    timeout: int = 60
+    max_retries: int = 3
+    retry_delay: float = 1.0
+    rate_limit_calls: int = 10
+    rate_limit_window: float = 60.0
+
+    @classmethod
+    def from_env(cls) -> "OpenAIConfig":
+        """Build from OPENAI_* environment variables"""
+        return cls(
+            api_key=resolve_openai_api_key(),
+            model=_E.get("OPENAI_MODEL", cls.model),
+            max_completion_tokens=_env_int("OPENAI_max_completion_tokens", cls.max_completion_tokens),
+            temperature=_env_float("OPENAI_TEMPERATURE", cls.temperature),
+            top_p=_env_float("OPENAI_TOP_P", cls.top_p),
+            timeout=_env_int("OPENAI_TIMEOUT", cls.timeout),
+            max_retries=_env_int("OPENAI_MAX_RETRIES", cls.max_retries),
+            retry_delay=_env_float("OPENAI_RETRY_DELAY", cls.retry_delay),
+            rate_limit_calls=_env_int("OPENAI_RATE_LIMIT_CALLS", cls.rate_limit_calls),
+            rate_limit_window=_env_float("OPENAI_RATE_LIMIT_WINDOW", cls.rate_limit_window),
+        )
 
 @dataclass
 class PlannerConfig:
     """Planner configuration"""
-    default_language: str = field(default_factory=lambda: os.getenv("PLANNER_DEFAULT_LANGUAGE", "thai"))
-    max_completion_tokens: int = field(default_factory=lambda: int(os.getenv("PLANNER_max_completion_tokens", "200")))
-    temperature: float = field(default_factory=lambda: float(os.getenv("PLANNER_TEMPERATURE", "1.0")))
-    top_p: float = field(default_factory=lambda: float(os.getenv("PLANNER_TOP_P", "0.9")))
-    enable_emojis: bool = field(default_factory=lambda: os.getenv("PLANNER_ENABLE_EMOJIS", "true").lower() == "true")
-    enable_motivation: bool = field(default_factory=lambda: os.getenv("PLANNER_ENABLE_MOTIVATION", "true").lower() == "true")
+    default_language: str = "thai"
+    max_completion_tokens: int = 200
+    temperature: float = 1.0
+    top_p: float = 0.9
+    enable_emojis: bool = True
+    enable_motivation: bool = True
+
+    @classmethod
+    def from_env(cls) -> "PlannerConfig":
+        """Build from PLANNER_* environment variables"""
+        return cls(
+            default_language=_E.get("PLANNER_DEFAULT_LANGUAGE", cls.default_language),
+            max_completion_tokens=_env_int("PLANNER_max_completion_tokens", cls.max_completion_tokens),
+            temperature=_env_float("PLANNER_TEMPERATURE", cls.temperature),
+            top_p=_env_float("PLANNER_TOP_P", cls.top_p),
+            enable_emojis=_env_bool("PLANNER_ENABLE_EMOJIS", cls.enable_emojis),
+            enable_motivation=_env_bool("PLANNER_ENABLE_MOTIVATION", cls.enable_motivation),
+        )
 
 @dataclass
 class FirebaseConfig:
     """Firebase configuration"""
-    project_id: str = field(default_factory=lambda: os.getenv("FIREBASE_PROJECT_ID", ""))
-    region: str = field(default_factory=lambda: os.getenv("FIREBASE_REGION", "us-central1"))
-    max_instances: int = field(default_factory=lambda: int(os.getenv("FIREBASE_MAX_INSTANCES", "5")))
+    project_id: str = ""
+    region: str = "us-central1"
+    max_instances: int = 5
+
+    @classmethod
+    def from_env(cls) -> "FirebaseConfig":
+        """Build from FIREBASE_* environment variables"""
+        return cls(
+            project_id=_E.get("FIREBASE_PROJECT_ID", cls.project_id),
+            region=_E.get("FIREBASE_REGION", cls.region),
+            max_instances=_env_int("FIREBASE_MAX_INSTANCES", cls.max_instances),
+        )
+
+_DEFAULT_ALLOWED_LANGUAGES = "en,th,zh,ja,ko"
 
 @dataclass
 class SecurityConfig:
     """Security configuration"""
-    enable_input_validation: bool = field(default_factory=lambda: os.getenv("SECURITY_ENABLE_INPUT_VALIDATION", "true").lower() == "true")
-    enable_rate_limiting: bool = field(default_factory=lambda: os.getenv("SECURITY_ENABLE_RATE_LIMITING", "true").lower() == "true")
-    max_input_length: int = field(default_factory=lambda: int(os.getenv("SECURITY_MAX_INPUT_LENGTH", "10000")))
-    allowed_languages: list = field(default_factory=lambda: os.getenv("SECURITY_ALLOWED_LANGUAGES", "en,th,zh,ja,ko").split(","))
+    enable_input_validation: bool = True
+    enable_rate_limiting: bool = True
+    max_input_length: int = 10000
+    allowed_languages: list = field(default_factory=lambda: _DEFAULT_ALLOWED_LANGUAGES.split(","))
+
+    @classmethod
+    def from_env(cls) -> "SecurityConfig":
+        """Build from SECURITY_* environment variables"""
+        return cls(
+            enable_input_validation=_env_bool("SECURITY_ENABLE_INPUT_VALIDATION", cls.enable_input_validation),
+            enable_rate_limiting=_env_bool("SECURITY_ENABLE_RATE_LIMITING", cls.enable_rate_limiting),
+            max_input_length=_env_int("SECURITY_MAX_INPUT_LENGTH", cls.max_input_length),
+            allowed_languages=_E.get("SECURITY_ALLOWED_LANGUAGES", _DEFAULT_ALLOWED_LANGUAGES).split(","),
+        )
 
 @dataclass
 class MonitoringConfig:
     """Monitoring and logging configuration"""
-    log_level: LogLevel = field(default_factory=lambda: LogLevel(os.getenv("LOG_LEVEL", "INFO").upper()))
-    enable_metrics: bool = field(default_factory=lambda: os.getenv("MONITORING_ENABLE_METRICS", "true").lower() == "true")
-    enable_performance_logging: bool = field(default_factory=lambda: os.getenv("MONITORING_ENABLE_PERFORMANCE", "true").lower() == "true")
-    log_format: str = field(default_factory=lambda: os.getenv("LOG_FORMAT", "%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+    log_level: LogLevel = LogLevel.INFO
+    enable_metrics: bool = True
+    enable_performance_logging: bool = True
+    log_format: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+    @classmethod
+    def from_env(cls) -> "MonitoringConfig":
+        """Build from LOG_* / MONITORING_* environment variables"""
+        return cls(
+            log_level=LogLevel(_E.get("LOG_LEVEL", cls.log_level.value).upper()),
+            enable_metrics=_env_bool("MONITORING_ENABLE_METRICS", cls.enable_metrics),
+            enable_performance_logging=_env_bool("MONITORING_ENABLE_PERFORMANCE", cls.enable_performance_logging),
+            log_format=_E.get("LOG_FORMAT", cls.log_format),
+        )
 
 @dataclass
 class AppConfig:
-    """Main application configuration"""
-    environment: Environment = field(default_factory=lambda: Environment(os.getenv("ENVIRONMENT", "development")))
-    debug: bool = field(default_factory=lambda: os.getenv("DEBUG", "false").lower() == "true")
-    openai: OpenAIConfig = field(default_factory=OpenAIConfig)
-    planner: PlannerConfig = field(default_factory=PlannerConfig)
-    firebase: FirebaseConfig = field(default_factory=FirebaseConfig)
-    security: SecurityConfig = field(default_factory=SecurityConfig)
-    monitoring: MonitoringConfig = field(default_factory=MonitoringConfig)
+    """Main application configuration
+
+    Unlike the sub-configs, a bare AppConfig() still reads the environment:
+    every field defaults to its from_env() reader.
+    """
+    environment: Environment = field(
+        default_factory=lambda: Environment(_E.get("ENVIRONMENT", Environment.DEVELOPMENT.value))
+    )
+    debug: bool = field(default_factory=lambda: _env_bool("DEBUG", False))
+    openai: OpenAIConfig = field(default_factory=OpenAIConfig.from_env)
+    planner: PlannerConfig = field(default_factory=PlannerConfig.from_env)
+    firebase: FirebaseConfig = field(default_factory=FirebaseConfig.from_env)
+    security: SecurityConfig = field(default_factory=SecurityConfig.from_env)
+    monitoring: MonitoringConfig = field(default_factory=MonitoringConfig.from_env)
+
+    @classmethod
+    def from_env(cls) -> "AppConfig":
+        """Build the full configuration from environment variables"""
+        return cls()
     
     def __post_init__(self):
         """Validate configuration after initialization"""
@@ -125,8 +214,18 @@ class AppConfig:
         logging.getLogger("httpx").setLevel(logging.WARNING)
         logging.getLogger("urllib3").setLevel(logging.WARNING)
     
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert configuration to dictionary (for logging/debugging)"""
+    @cached_property
+    def as_dict(self) -> Dict[str, Any]:
+        """Configuration as a nested dictionary (for logging/debugging).
+
+        Computed once per instance; reload_config() builds a new instance,
+        so the cached value never outlives the settings it describes.
+        Shared between callers, so treat it as read-only; to_dict() returns
+        a fresh copy.
+        """
+        return self._build_dict()
+
+    def _build_dict(self) -> Dict[str, Any]:
         return {
             "environment": self.environment.value,
             "debug": self.debug,
@@ -165,6 +264,10 @@ class AppConfig:
             }
         }
     
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert configuration to dictionary (for logging/debugging)"""
+        return self._build_dict()
+    
     def is_production(self) -> bool:
         """Check if running in production environment"""
         return self.environment == Environment.PRODUCTION
@@ -180,10 +283,10 @@ def get_config() -> AppConfig:
     """Get the global configuration instance"""
     global _config
     if _config is None:
-        _config = AppConfig()
+        _config = AppConfig.from_env()
         logger.info(f"Configuration loaded for environment: {_config.environment.value}")
         if _config.debug:
-            logger.debug(f"Configuration: {_config.to_dict()}")
+            logger.debug(f"Configuration: {_config.as_dict}")
     return _config
 
 def reload_config() -> AppConfig:
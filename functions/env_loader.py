@@ -0,0 +1,35 @@
+# app/env_loader.py
+"""
+Load local .env overrides once per process.
+
+Several modules need the same .env files applied before they read os.environ.
+Routing them all through load_local_env() parses the files on the first call
+only, instead of once per importing module during a cold start.
+"""
+
+from pathlib import Path
+from threading import Lock
+
+from dotenv import load_dotenv
+
+_functions_dir = Path(__file__).resolve().parent
+_loaded = False
+_lock = Lock()
+
+
+def load_local_env() -> None:
+    """Apply functions/.env.local, ../.env and ./.env (first call only).
+
+    Local overrides only — never deployed as plain env vars by Firebase CLI.
+    Existing environment variables always win over file values.
+    """
+    global _loaded
+    if _loaded:
+        return
+    with _lock:
+        if _loaded:
+            return
+        load_dotenv(_functions_dir / ".env.local")
+        load_dotenv(_functions_dir.parent / ".env")
+        load_dotenv()
+        _loaded = True
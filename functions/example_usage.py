@@ -12,8 +12,6 @@ from chatgpt_wrapper import ChatGPTWrapper, ChatConfig, get_default_wrapper
 from planner_utils import PlannerUtils, PlannerConfig, get_default_planner
 from config import get_config
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 def example_basic_usage():
@@ -214,4 +212,5 @@ def main():
 
 if __name__ == "__main__":
     import time
+    logging.basicConfig(level=logging.INFO)
     main() 
\ No newline at end of file
@@ -16,7 +16,6 @@ Usage Flow:
 import os
 import json
 import time
-import uuid
 import threading
 from typing import Dict, Any, Optional
 from dataclasses import dataclass, asdict
@@ -32,7 +31,9 @@ from generate_planner_content import (
     ChatWrapper,
     ChatWrapperConfig,
     PlannerGenerationError,
-    ValidationError
+    ValidationError,
+    parse_request,
+    _cors_headers as _planner_cors_headers,
 )
 
 # Job storage (use Firestore in production)
@@ -60,7 +61,8 @@ class JobStatus:
     created_at: str
     updated_at: str
     request: Dict[str, Any]
-    result: Optional[Dict[str, Any]] = None
+    result: Optional[str] = None  # PlannerContent JSON, served as-is
+    result_summary: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
     
     # Progress stages for frontend
@@ -78,7 +80,7 @@ def estimate_generation_time(total_days: int, fast_mode: bool) -> int:
 
 def create_job(request: GeneratePlannerRequest) -> JobStatus:
     """Create a new generation job"""
-    job_id = f"plan_{uuid.uuid4().hex[:12]}"
+    job_id = f"plan_{os.urandom(6).hex()}"
     now = datetime.utcnow().isoformat()
     
     estimated_time = estimate_generation_time(request.totalDays, request.fastMode)
@@ -136,7 +138,14 @@ def complete_job(job_id: str, result: PlannerContent):
             job["stages_completed"] = 4
             job["estimated_seconds_remaining"] = 0
             job["updated_at"] = datetime.utcnow().isoformat()
-            job["result"] = result.model_dump()
+            # Serialized once in pydantic-core; no intermediate dict tree
+            job["result"] = result.model_dump_json()
+            job["result_summary"] = {
+                "planName": result.planName,
+                "category": result.category,
+                "totalDays": result.totalDays,
+                "ready": True
+            }
 
 
 def fail_job(job_id: str, error: str):
@@ -192,14 +201,8 @@ def run_generation_job(job_id: str, request: GeneratePlannerRequest):
 # HTTP Endpoints
 # =========================
 
-def _cors_headers(origin: Optional[str]) -> Dict[str, str]:
-    allow_origin = origin or "*"
-    return {
-        "Access-Control-Allow-Origin": allow_origin,
-        "Access-Control-Allow-Methods": "GET, POST, OPTIONS",
-        "Access-Control-Allow-Headers": "Content-Type, Authorization",
-        "Access-Control-Max-Age": "3600"
-    }
+def _cors_headers(origin: Optional[str], json_body: bool = False) -> Dict[str, str]:
+    return _planner_cors_headers(origin, json_body, methods="GET, POST, OPTIONS")
 
 
 @https_fn.on_request(memory=512, timeout_sec=30)
@@ -228,12 +231,12 @@ def start_planner_generation(req: https_fn.Request) -> https_fn.Response:
         return https_fn.Response(
             json.dumps({"error": "Use POST method"}),
             status=405,
-            headers={**_cors_headers(origin), "Content-Type": "application/json"}
+            headers=_cors_headers(origin, json_body=True)
         )
     
     try:
         payload = req.get_json(silent=True) or {}
-        parsed_request = GeneratePlannerRequest(**payload)
+        parsed_request = parse_request(payload)
         
         # Create job
         job = create_job(parsed_request)
@@ -263,7 +266,7 @@ def start_planner_generation(req: https_fn.Request) -> https_fn.Response:
         return https_fn.Response(
             json.dumps(response),
             status=202,  # Accepted
-            headers={**_cors_headers(origin), "Content-Type": "application/json"}
+            headers=_cors_headers(origin, json_body=True)
         )
         
     except ValidationError as ve:
@@ -271,13 +274,13 @@ def start_planner_generation(req: https_fn.Request) -> https_fn.Response:
         return https_fn.Response(
             json.dumps({"error": "Invalid request", "details": errors}),
             status=400,
-            headers={**_cors_headers(origin), "Content-Type": "application/json"}
+            headers=_cors_headers(origin, json_body=True)
         )
     except Exception as e:
         return https_fn.Response(
             json.dumps({"error": str(e)}),
             status=500,
-            headers={**_cors_headers(origin), "Content-Type": "application/json"}
+            headers=_cors_headers(origin, json_body=True)
         )
 
 
@@ -310,7 +313,7 @@ def get_planner_status(req: https_fn.Request) -> https_fn.Response:
         return https_fn.Response(
             json.dumps({"error": "Missing jobId parameter"}),
             status=400,
-            headers={**_cors_headers(origin), "Content-Type": "application/json"}
+            headers=_cors_headers(origin, json_body=True)
         )
     
     job = get_job(job_id)
@@ -318,7 +321,7 @@ def get_planner_status(req: https_fn.Request) -> https_fn.Response:
         return https_fn.Response(
             json.dumps({"error": "Job not found", "jobId": job_id}),
             status=404,
-            headers={**_cors_headers(origin), "Content-Type": "application/json"}
+            headers=_cors_headers(origin, json_body=True)
         )
     
     # Don't return full result in status - just summary
@@ -340,19 +343,13 @@ def get_planner_status(req: https_fn.Request) -> https_fn.Response:
         response["error"] = job["error"]
     
     # Include result summary if completed
-    if job["status"] == "completed" and job.get("result"):
-        result = job["result"]
-        response["resultSummary"] = {
-            "planName": result.get("planName"),
-            "category": result.get("category"),
-            "totalDays": result.get("totalDays"),
-            "ready": True
-        }
+    if job["status"] == "completed" and job.get("result_summary"):
+        response["resultSummary"] = job["result_summary"]
     
     return https_fn.Response(
         json.dumps(response),
         status=200,
-        headers={**_cors_headers(origin), "Content-Type": "application/json"}
+        headers=_cors_headers(origin, json_body=True)
     )
 
 
@@ -375,7 +372,7 @@ def get_planner_result(req: https_fn.Request) -> https_fn.Response:
         return https_fn.Response(
             json.dumps({"error": "Missing jobId parameter"}),
             status=400,
-            headers={**_cors_headers(origin), "Content-Type": "application/json"}
+            headers=_cors_headers(origin, json_body=True)
         )
     
     job = get_job(job_id)
@@ -383,7 +380,7 @@ def get_planner_result(req: https_fn.Request) -> https_fn.Response:
         return https_fn.Response(
             json.dumps({"error": "Job not found", "jobId": job_id}),
             status=404,
-            headers={**_cors_headers(origin), "Content-Type": "application/json"}
+            headers=_cors_headers(origin, json_body=True)
         )
     
     if job["status"] != "completed":
@@ -394,11 +391,11 @@ def get_planner_result(req: https_fn.Request) -> https_fn.Response:
                 "progress": job["progress"]
             }),
             status=400,
-            headers={**_cors_headers(origin), "Content-Type": "application/json"}
+            headers=_cors_headers(origin, json_body=True)
         )
     
     return https_fn.Response(
-        json.dumps(job["result"], ensure_ascii=False),
+        job["result"],
         status=200,
-        headers={**_cors_headers(origin), "Content-Type": "application/json"}
+        headers=_cors_headers(origin, json_body=True)
     )
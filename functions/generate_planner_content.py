@@ -1,12 +1,23 @@
 import os
 import re
+import sys
+import gzip
+import math
+import zlib
 import json
+import logging
+import hashlib
 import time
-import uuid
+import random
+import orjson
+import threading
 import asyncio
 import concurrent.futures
-from typing import List, Optional, Literal, Dict, Any, Tuple, Union, Callable
+from datetime import datetime, timezone
+from typing import Annotated, List, Optional, Literal, Dict, Any, Tuple, Union, Callable
 from dataclasses import dataclass, asdict
+from functools import lru_cache
+from types import MappingProxyType
 
 # Firebase imports - optional for local testing
 try:
@@ -18,12 +29,21 @@ except ImportError:
     https_fn = None
     print("Note: Firebase modules not available - running in local mode")
 
-from pydantic import BaseModel, Field, ValidationError, conint, confloat, constr, field_validator, model_validator
+# Brotli is optional; responses fall back to gzip without it
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from cachetools import TTLCache
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints, TypeAdapter, ValidationError, field_validator, model_validator
 
 # Shared with main.py's itinerary image import so both producers of a plan task
 # agree on what a clock time is (see plan_time.py for why this matters).
 from plan_time import normalize_clock_time
 
+logger = logging.getLogger(__name__)
+
 # ---- Initialize Firebase Admin (safe if called multiple times) ----
 if FIREBASE_AVAILABLE:
     try:
@@ -34,11 +54,48 @@ if FIREBASE_AVAILABLE:
 
 # ---- OpenAI (Responses API) ----
 # pip install openai>=1.40
+import httpx
 from openai import OpenAI
 
 # Lazy initialization of OpenAI client to prevent cold start failures
 _openai_client = None
 
+# One keep-alive HTTP/2 pool for every OpenAI call in the process, so warm
+# invocations (and the parallel chunk workers) skip the TCP+TLS handshake.
+# The read timeout matches the OpenAI SDK default; long plans take minutes.
+_OPENAI_HTTP_LIMITS = httpx.Limits(max_connections=16, max_keepalive_connections=8)
+_OPENAI_HTTP_TIMEOUT = httpx.Timeout(600.0, connect=10.0)
+
+# Chunk workers for every plan in the process share one bounded pool, so
+# concurrent requests queue for a slot instead of each spawning threads and
+# multiplying in-flight OpenAI calls. Half the HTTP pool, leaving room for
+# extraction, outline and enrichment calls.
+_CHUNK_WORKERS = 8
+_CHUNK_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+    max_workers=_CHUNK_WORKERS, thread_name_prefix="planner-chunk"
+)
+
+# Retry backoff: full jitter over base * 2**attempt, capped, so chunk workers
+# that hit the same rate limit spread their retries instead of stampeding.
+_RETRY_BACKOFF_CAP = 30.0
+
+
+def _retry_delay(attempt: int, error: Optional[BaseException] = None, base: float = 1.0) -> float:
+    """Seconds to wait after failed attempt (0-based); honours Retry-After."""
+    # Chunk workers see the PlannerGenerationError raised over the OpenAI error
+    for exc in (error, getattr(error, "__context__", None)):
+        headers = getattr(getattr(exc, "response", None), "headers", None)
+        if headers and "retry-after" in headers:
+            try:
+                retry_after = float(headers["retry-after"])
+            except ValueError:
+                break
+            # Negative or NaN/inf values are as useless as unparsable ones
+            if not (math.isfinite(retry_after) and retry_after >= 0):
+                break
+            return min(retry_after, _RETRY_BACKOFF_CAP) + random.random() * base
+    return random.uniform(0, min(_RETRY_BACKOFF_CAP, base * 2 ** attempt))
+
 def get_openai_client():
     """Get or create OpenAI client with lazy initialization."""
     global _openai_client
@@ -49,7 +106,14 @@ def get_openai_client():
             raise ValueError(
                 "OPENAI_API_KEY is not set (env/Secret Manager or Firestore ai_api_key/open-api-key)"
             )
-        _openai_client = OpenAI(api_key=api_key)
+        _openai_client = OpenAI(
+            api_key=api_key,
+            http_client=httpx.Client(
+                http2=True,
+                limits=_OPENAI_HTTP_LIMITS,
+                timeout=_OPENAI_HTTP_TIMEOUT,
+            ),
+        )
     return _openai_client
 
 
@@ -126,10 +190,19 @@ def infer_plan_intent(category: object, plan_name: object = "", detail_prompt: o
     return "other"
 
 
+_CATEGORY_SLUG_RE = re.compile(r"[^a-z0-9฀-๿]+")
+
+
+@lru_cache(maxsize=512)
+def _category_slug(raw: str) -> str:
+    slug = _CATEGORY_SLUG_RE.sub("_", raw.strip().lower()).strip("_")[:40]
+    # Interned so every plan/request in the process shares one string per category
+    return sys.intern(slug or "other")
+
+
 def sanitize_plan_category(value: object) -> str:
     """Free-form category → safe slug (lowercase, underscores, ≤40 chars)."""
-    slug = re.sub(r"[^a-z0-9฀-๿]+", "_", str(value or "").strip().lower()).strip("_")[:40]
-    return slug or "other"
+    return _category_slug(str(value or ""))
 
 
 class FreeFormCategoryMixin:
@@ -226,9 +299,13 @@ def resolve_fast_mode(total_days: int, fast_mode: Optional[bool] = None) -> bool
 # =========================
 # Extracted User Context (from detailPrompt)
 # =========================
+# Only needed when context extraction runs (skipContextExtraction is common),
+# so these models use defer_build and build their schemas on first use.
 
 class UserProfile(BaseModel):
     """Extracted user profile information"""
+    model_config = ConfigDict(defer_build=True)
+
     experience_level: Optional[Literal["beginner", "intermediate", "advanced", "expert"]] = Field(
         default=None,
         description="User's experience level in this domain"
@@ -252,6 +329,8 @@ class UserProfile(BaseModel):
 
 class UserGoals(BaseModel):
     """Extracted user goals and motivations"""
+    model_config = ConfigDict(defer_build=True)
+
     primary_goal: Optional[str] = Field(
         default=None,
         description="Main objective user wants to achieve"
@@ -275,6 +354,8 @@ class UserGoals(BaseModel):
 
 class UserConstraints(BaseModel):
     """Extracted user constraints and preferences"""
+    model_config = ConfigDict(defer_build=True)
+
     budget_level: Optional[Literal["minimal", "moderate", "flexible", "unlimited"]] = Field(
         default=None,
         description="Budget constraints mentioned"
@@ -298,6 +379,8 @@ class UserConstraints(BaseModel):
 
 class UserLearningStyle(BaseModel):
     """Extracted learning and engagement preferences"""
+    model_config = ConfigDict(defer_build=True)
+
     learning_style: Optional[Literal["visual", "reading", "hands_on", "auditory", "mixed"]] = Field(
         default=None,
         description="Preferred way of learning"
@@ -313,6 +396,8 @@ class UserLearningStyle(BaseModel):
 
 class ExtractedUserContext(BaseModel):
     """Complete extracted context from user's detailPrompt"""
+    model_config = ConfigDict(defer_build=True)
+
     profile: UserProfile = Field(default_factory=UserProfile)
     goals: UserGoals = Field(default_factory=UserGoals)
     constraints: UserConstraints = Field(default_factory=UserConstraints)
@@ -338,7 +423,45 @@ class ExtractedUserContext(BaseModel):
         description="Any special considerations or notes"
     )
 
+_ID_BYTES = 4  # 8 hex chars per id
+_ID_BATCH = 256
+_id_buffer: List[str] = []
+_id_lock = threading.Lock()
+
+
+def _gen_ids(n: int) -> List[str]:
+    """Return ``n`` random 8-char hex ids from a single os.urandom call."""
+    raw = os.urandom(_ID_BYTES * n)
+    return [raw[i:i + _ID_BYTES].hex() for i in range(0, len(raw), _ID_BYTES)]
+
+
+def _new_id() -> str:
+    """Pop an id from a shared buffer, refilling it in batches of _ID_BATCH."""
+    with _id_lock:
+        if not _id_buffer:
+            _id_buffer.extend(_gen_ids(_ID_BATCH))
+        return _id_buffer.pop()
+
+# Shared constrained-string types, one core schema each instead of one per field
+NonEmptyStr = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1)]
+PlanNameStr = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1, max_length=100)]
+DetailPromptStr = Annotated[str, StringConstraints(strip_whitespace=True, max_length=1000)]
+CurrencyCode = Annotated[str, StringConstraints(strip_whitespace=True, min_length=3, max_length=3)]
+
+# Shared integer bounds; PlanDays is a plan length or a day within the longest plan
+PlanDays = Annotated[int, Field(ge=1, le=90)]
+DayNumber = Annotated[int, Field(ge=1)]
+MinutesPerDay = Annotated[int, Field(ge=10, le=480)]
+TaskDuration = Annotated[int, Field(ge=0, le=600)]
+
+# Shared choice types for the request models. pydantic-core already checks a
+# string Literal with a single hash lookup, so no extra pre-validator is needed.
+PlanIntensity = Literal["easy", "moderate", "hard", "periodized"]
+PlanLanguage = Literal["en", "th"]
+
 class TimeStamp(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     seconds: int = Field(..., description="Unix seconds")
     nanoseconds: int = Field(..., ge=0, lt=1_000_000_000, description="0..999,999,999")
 
@@ -354,12 +477,11 @@ class TimeStamp(BaseModel):
         working, calendar-applied plan as a failed draft.
         """
         if isinstance(value, str):
-            from datetime import datetime, timezone as _tz
             raw = value.strip()
             try:
                 dt = datetime.fromisoformat(raw.replace("Z", "+00:00"))
                 if dt.tzinfo is None:
-                    dt = dt.replace(tzinfo=_tz.utc)
+                    dt = dt.replace(tzinfo=timezone.utc)
                 epoch = dt.timestamp()
                 return {"seconds": int(epoch), "nanoseconds": int(round((epoch % 1) * 1e9)) % 1_000_000_000}
             except ValueError:
@@ -376,6 +498,8 @@ class TimeStamp(BaseModel):
 
 class TaskVideo(BaseModel):
     """Real YouTube video attached post-generation (planner_enrichment.py). Not part of the LLM schema."""
+    model_config = ConfigDict(frozen=True)
+
     videoId: str
     title: str
     channel: Optional[str] = None
@@ -384,6 +508,8 @@ class TaskVideo(BaseModel):
 
 class TaskPlace(BaseModel):
     """Real Google Places venue attached post-generation. Never store key-bearing URLs (e.g. staticMapUrl)."""
+    model_config = ConfigDict(frozen=True)
+
     name: str
     address: Optional[str] = None
     lat: Optional[float] = None
@@ -394,22 +520,29 @@ class TaskPlace(BaseModel):
 
 class Flashcard(BaseModel):
     """Study card for learning plans — front (prompt/term) and back (answer/meaning)."""
-    front: constr(strip_whitespace=True, min_length=1, max_length=120)
-    back: constr(strip_whitespace=True, min_length=1, max_length=200)
+    model_config = ConfigDict(frozen=True, str_strip_whitespace=True)
+
+    front: Annotated[str, StringConstraints(min_length=1, max_length=120)]
+    back: Annotated[str, StringConstraints(min_length=1, max_length=200)]
 
 
 class Task(BaseModel):
-    id: constr(strip_whitespace=True, min_length=1) = Field(default_factory=lambda: uuid.uuid4().hex[:8])
-    text: constr(strip_whitespace=True, min_length=1)
+    # Mutable: generation fix-ups and enrichment update tasks in place.
+    # Instances nested into a DayPlan/PlannerContent are kept, not re-validated
+    # (the pydantic default, pinned so chunk merges stay a single pass).
+    model_config = ConfigDict(str_strip_whitespace=True, revalidate_instances="never")
+
+    id: NonEmptyStr = Field(default_factory=_new_id)
+    text: NonEmptyStr
     done: bool = False
-    duration_min: Optional[conint(ge=0, le=600)] = None   # optional per-task duration
-    estimatedCost: confloat(ge=0, le=1_000_000_000) = Field(
+    duration_min: Optional[TaskDuration] = None   # optional per-task duration
+    estimatedCost: Annotated[float, Field(ge=0, le=1_000_000_000)] = Field(
         0,
         description="Estimated cost of this activity in the plan currency; use 0 when free",
     )
     time: Optional[str] = Field(None, description="HH:MM local start time — travel itineraries / scheduled days")
     note: Optional[str] = None
-    link: Optional[constr(strip_whitespace=True, min_length=1)] = Field(None, description="Optional helpful link or resource for this task")
+    link: Optional[NonEmptyStr] = Field(None, description="Optional helpful link or resource for this task")
     # Post-generation enrichment (real API data) — never produced by the LLM itself.
     video: Optional[TaskVideo] = None
     place: Optional[TaskPlace] = None
@@ -420,10 +553,12 @@ class Task(BaseModel):
         return normalize_clock_time(value)
 
 class DayPlan(BaseModel):
-    id: constr(strip_whitespace=True, min_length=1) = Field(default_factory=lambda: uuid.uuid4().hex[:8])
-    dayNumber: conint(ge=1)                               # 1..N
-    title: constr(strip_whitespace=True, min_length=1)
-    summary: constr(strip_whitespace=True, min_length=1)
+    model_config = ConfigDict(str_strip_whitespace=True, revalidate_instances="never")
+
+    id: NonEmptyStr = Field(default_factory=_new_id)
+    dayNumber: DayNumber  # 1..N
+    title: NonEmptyStr
+    summary: NonEmptyStr
     tasks: List[Task] = Field(default_factory=list)
     tips: Optional[Union[str, List[str]]] = None
     # Learning plans: 3-6 study cards per day (renders as tap-to-flip flashcards).
@@ -444,6 +579,8 @@ ProgressCallback = Callable[[Dict[str, Any]], None]
 
 
 class PlanPhaseOutline(BaseModel):
+    model_config = ConfigDict(defer_build=True, frozen=True)
+
     phase_name: str
     start_day: int
     end_day: int
@@ -453,6 +590,8 @@ class PlanPhaseOutline(BaseModel):
 
 class PlanOutline(BaseModel):
     """High-level plan structure generated before day-by-day content."""
+    model_config = ConfigDict(defer_build=True, frozen=True)
+
     overview: str
     difficulty_arc: Optional[str] = None
     key_milestones: List[str] = Field(default_factory=list)
@@ -463,6 +602,8 @@ class PlanOutline(BaseModel):
 
 class PlannerSummary(BaseModel):
     """Summary information about the generated planner"""
+    model_config = ConfigDict(frozen=True)
+
     overview: Optional[str] = Field(None, description="Brief overview of what this plan covers and its approach")
     #targetAudience: Optional[str] = Field(None, description="Who this plan is best suited for")
     #expectedOutcomes: Optional[List[str]] = Field(None, description="What the user can expect to achieve")
@@ -474,16 +615,18 @@ class PlannerSummary(BaseModel):
     weeklyFocus: Optional[List[str]] = Field(None, description="Brief focus area for each week")
 
 class PlannerContent(FreeFormCategoryMixin, BaseModel):
-    planName: constr(strip_whitespace=True, min_length=1)
+    model_config = ConfigDict(str_strip_whitespace=True, revalidate_instances="never")
+
+    planName: NonEmptyStr
     category: str
     intentType: Optional[str] = Field(
         None,
         description="Execution intent such as itinerary, learning, workout, project, or routine",
     )
-    totalDays: conint(ge=1, le=90) = 30
-    minutesPerDay: Optional[conint(ge=10, le=480)] = None
-    currency: constr(strip_whitespace=True, min_length=3, max_length=3) = "THB"
-    totalBudget: confloat(ge=0, le=90_000_000_000) = 0
+    totalDays: PlanDays = 30
+    minutesPerDay: Optional[MinutesPerDay] = None
+    currency: CurrencyCode = "THB"
+    totalBudget: Annotated[float, Field(ge=0, le=90_000_000_000)] = 0
     coverImage: Optional[str] = None
     coverImageUrl: Optional[str] = None
     createdAt: TimeStamp
@@ -510,11 +653,46 @@ class PlannerContent(FreeFormCategoryMixin, BaseModel):
         )
         return self
 
+    @classmethod
+    def from_trusted(cls, **fields: Any) -> "PlannerContent":
+        """Assemble a plan from already-validated parts, skipping re-validation.
+
+        For server-side merges only: days, createdAt and summary must already be
+        model instances and scalar fields must come from validated requests or
+        plans. totalBudget is still recomputed from the tasks.
+        """
+        return cls.model_construct(**fields).calculate_total_budget()
+
 # -------- Request --------
+# startDate formats accepted from clients, tried in order; normalized to ISO.
+_START_DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%d/%m/%Y", "%Y/%m/%d")
+# Safe minutesPerDay range per category, clamped in validate_plan_consistency
+_CATEGORY_MINUTES_BOUNDS = MappingProxyType({"exercise": (15, 480)})
+# Whole-plan time budget (200 hours); longer plans get a smaller daily share
+_MAX_PLAN_MINUTES = 200 * 60
+_ISO_DATE_RE = re.compile(r"(\d{4})-(\d{2})-(\d{2})", re.ASCII)
+
+def _normalize_start_date(value: str) -> Optional[str]:
+    """Return value as YYYY-MM-DD, or None if no accepted format matches."""
+    iso = _ISO_DATE_RE.fullmatch(value)
+    if iso:
+        # The common case: already canonical, just check it is a real day
+        try:
+            datetime(int(iso[1]), int(iso[2]), int(iso[3]))
+        except ValueError:
+            return None
+        return value
+    for fmt in _START_DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return None
+
 class GeneratePlannerRequest(FreeFormCategoryMixin, BaseModel):
     """Request model for generating planner content with comprehensive validation."""
 
-    planName: constr(strip_whitespace=True, min_length=1, max_length=100) = Field(
+    planName: PlanNameStr = Field(
         default="30-Day Practice",
         description="Name of the plan to generate (1-100 characters)"
     )
@@ -524,12 +702,12 @@ class GeneratePlannerRequest(FreeFormCategoryMixin, BaseModel):
         description="Life domain for the plan — free-form (any domain), sanitized to a slug",
     )
     
-    totalDays: Optional[conint(ge=1, le=90)] = Field(
+    totalDays: Optional[PlanDays] = Field(
         default=None,
         description="Number of days in the plan (1-90). Omit for a category-typical length.",
     )
     
-    detailPrompt: Optional[constr(strip_whitespace=True, max_length=1000)] = Field(
+    detailPrompt: Optional[DetailPromptStr] = Field(
         default=None,
         description="User specifics (level, constraints, destinations, equipment, etc.) - max 1000 characters"
     )
@@ -552,22 +730,22 @@ class GeneratePlannerRequest(FreeFormCategoryMixin, BaseModel):
     )
     
     # Optional configuration knobs:
-    minutesPerDay: Optional[conint(ge=10, le=480)] = Field(
+    minutesPerDay: Optional[MinutesPerDay] = Field(
         default=None,
         description="Daily time allocation in minutes (10-480, i.e., 10 min to 8 hours)"
     )
     
-    intensity: Optional[Literal["easy", "moderate", "hard", "periodized"]] = Field(
+    intensity: Optional[PlanIntensity] = Field(
         default=None,
         description="Difficulty/intensity level of the plan"
     )
     
-    language: Literal["en", "th"] = Field(
+    language: PlanLanguage = Field(
         default="en",
         description="Output language for the generated content"
     )
 
-    currency: constr(strip_whitespace=True, min_length=3, max_length=3) = Field(
+    currency: CurrencyCode = Field(
         default="THB",
         description="ISO 4217 currency used for all activity costs in this plan",
     )
@@ -617,53 +795,48 @@ class GeneratePlannerRequest(FreeFormCategoryMixin, BaseModel):
     @model_validator(mode='after')
     def validate_plan_consistency(self) -> 'GeneratePlannerRequest':
         """Validate business logic constraints with user-friendly suggestions."""
-        if self.minutesPerDay and self.category == "exercise":
-            if self.minutesPerDay < 15:
-                print(f"Warning: Exercise plans should be at least 15 minutes for safety. Adjusting from {self.minutesPerDay} to 15 minutes.")
-                self.minutesPerDay = 15
-            if self.minutesPerDay > 480:
-                print(f"Warning: Exercise plans should not exceed 8 hours for safety. Adjusting from {self.minutesPerDay} to 480 minutes.")
-                self.minutesPerDay = 480
-
-        if self.minutesPerDay and self.category == "travel":
-            if self.minutesPerDay < 60:
-                print(
+        # Adjustment notes are collected and logged once at the end
+        notes: List[str] = []
+        # Lean requests (no minutesPerDay) skip every time check in one test
+        if self.minutesPerDay:
+            bounds = _CATEGORY_MINUTES_BOUNDS.get(self.category)
+            if bounds:
+                lo, hi = bounds
+                clamped = min(max(self.minutesPerDay, lo), hi)
+                if clamped != self.minutesPerDay:
+                    notes.append(
+                        f"Warning: {self.category.capitalize()} plans should stay within {lo}-{hi} minutes per day for safety. "
+                        f"Adjusting from {self.minutesPerDay} to {clamped} minutes."
+                    )
+                    self.minutesPerDay = clamped
+
+            if self.category == "travel" and self.minutesPerDay < 60:
+                notes.append(
                     f"Warning: Travel itineraries need meaningful daily activity time. "
                     f"Adjusting from {self.minutesPerDay} to 120 minutes."
                 )
                 self.minutesPerDay = 120
 
-        if self.minutesPerDay and self.totalDays:
-            total_hours = (self.minutesPerDay * self.totalDays) / 60
-            if total_hours > 200:
-                print(f"Warning: Plan would require {total_hours:.1f} total hours, which may be intensive. Consider reducing daily time or total days.")
-                suggested_minutes = int((200 * 60) / self.totalDays)
-                if suggested_minutes < self.minutesPerDay:
-                    print(f"Auto-adjusting daily time from {self.minutesPerDay} to {suggested_minutes} minutes for better balance.")
+            if self.totalDays:
+                total_minutes = self.minutesPerDay * self.totalDays
+                if total_minutes > _MAX_PLAN_MINUTES:
+                    # Over the cap means the floor-divided share is always smaller
+                    suggested_minutes = _MAX_PLAN_MINUTES // self.totalDays
+                    notes.append(f"Warning: Plan would require {total_minutes / 60:.1f} total hours, which may be intensive. Consider reducing daily time or total days.")
+                    notes.append(f"Auto-adjusting daily time from {self.minutesPerDay} to {suggested_minutes} minutes for better balance.")
                     self.minutesPerDay = suggested_minutes
 
         if self.startDate:
-            try:
-                from datetime import datetime
-                date_formats = ["%Y-%m-%d", "%m/%d/%Y", "%d/%m/%Y", "%Y/%m/%d"]
-                parsed_date = None
-                for fmt in date_formats:
-                    try:
-                        parsed_date = datetime.strptime(self.startDate, fmt)
-                        break
-                    except ValueError:
-                        continue
-                if parsed_date is None:
-                    print(f"Warning: Date format '{self.startDate}' not recognized. Please use YYYY-MM-DD format. Continuing without date validation.")
-                else:
-                    self.startDate = parsed_date.strftime("%Y-%m-%d")
-            except Exception as e:
-                print(f"Warning: Could not parse start date '{self.startDate}': {e}. Continuing without date validation.")
+            normalized = _normalize_start_date(self.startDate)
+            if normalized is None:
+                notes.append(f"Warning: Date format '{self.startDate}' not recognized. Please use YYYY-MM-DD format. Continuing without date validation.")
+            else:
+                self.startDate = normalized
 
         # Lean-form defaults (mobile sends category + goal; other fields optional)
         if not self.detailPrompt or not str(self.detailPrompt).strip():
             self.detailPrompt = default_detail_prompt_for_category(self.category, self.language)
-            print(f"Applied default detailPrompt for category={self.category}")
+            notes.append(f"Applied default detailPrompt for category={self.category}")
 
         cat_defaults = default_plan_params_for_category(self.category)
 
@@ -682,27 +855,32 @@ class GeneratePlannerRequest(FreeFormCategoryMixin, BaseModel):
 
         self.fastMode = resolve_fast_mode(self.totalDays, self.fastMode)
 
+        if notes:
+            logger.warning("; ".join(notes))
+
         return self
 
 
 class RefinePlannerRequest(FreeFormCategoryMixin, BaseModel):
     """Refine an existing draft plan based on user feedback."""
+    # Refine-only; its schema is built on first use rather than at import
+    model_config = ConfigDict(defer_build=True)
 
-    refinementPrompt: constr(strip_whitespace=True, min_length=1, max_length=800) = Field(
+    refinementPrompt: Annotated[str, StringConstraints(strip_whitespace=True, min_length=1, max_length=800)] = Field(
         description="What the user wants changed in the current draft"
     )
     existingContent: Dict[str, Any] = Field(
         description="Current PlannerContent object to refine"
     )
-    planName: constr(strip_whitespace=True, min_length=1, max_length=100)
+    planName: PlanNameStr
     category: str
-    totalDays: conint(ge=1, le=90)
-    minutesPerDay: Optional[conint(ge=10, le=480)] = None
-    intensity: Optional[Literal["easy", "moderate", "hard", "periodized"]] = None
-    language: Literal["en", "th"] = "en"
+    totalDays: PlanDays
+    minutesPerDay: Optional[MinutesPerDay] = None
+    intensity: Optional[PlanIntensity] = None
+    language: PlanLanguage = "en"
     fastMode: bool = True
-    refineDayStart: Optional[conint(ge=1, le=90)] = None
-    refineDayEnd: Optional[conint(ge=1, le=90)] = None
+    refineDayStart: Optional[PlanDays] = None
+    refineDayEnd: Optional[PlanDays] = None
 
     @model_validator(mode='after')
     def validate_refine_range(self) -> 'RefinePlannerRequest':
@@ -714,6 +892,19 @@ class RefinePlannerRequest(FreeFormCategoryMixin, BaseModel):
         return self
 
 
+# Built once at import so the hot path goes straight to pydantic-core instead of
+# unpacking dicts into model __init__ kwargs on every request.
+_PLANNER_VALIDATOR = TypeAdapter(PlannerContent)
+_REQ_VALIDATOR = TypeAdapter(GeneratePlannerRequest)
+
+
+def parse_request(data: Union[bytes, str, Dict[str, Any]]) -> GeneratePlannerRequest:
+    """Validate a generate request from a decoded dict or a raw JSON body."""
+    if isinstance(data, (bytes, str)):
+        return _REQ_VALIDATOR.validate_json(data)
+    return _REQ_VALIDATOR.validate_python(data)
+
+
 # =========================
 # Chat Wrapper
 # =========================
@@ -736,7 +927,657 @@ class PlanChunk:
     key_goals: List[str]
     special_instructions: str
 
-@dataclass
+# JSON schema for the exact PlannerContent shape with summary fields. Built once
+# at import; ChatWrapperConfig.json_schema overrides it when set.
+_PLANNER_JSON_SCHEMA: Dict[str, Any] = {
+    "name": "planner_content",
+    "schema": {
+        "type": "object",
+        "additionalProperties": False,
+        "properties": {
+            "planName": {"type": "string"},
+            "category": {"type": "string"},
+            "intentType": {
+                "type": ["string", "null"],
+                "enum": [*PLAN_INTENT_TYPES, None],
+                "description": "Resolved execution intent; controls how the plan should behave in the app",
+            },
+            "totalDays": {"type": "integer", "minimum": 1, "maximum": 90},
+            "minutesPerDay": {"type": ["integer", "null"], "minimum": 10, "maximum": 480},
+            "currency": {
+                "type": "string",
+                "minLength": 3,
+                "maxLength": 3,
+                "description": "One ISO 4217 currency code for all activity estimates",
+            },
+            "totalBudget": {
+                "type": "number",
+                "minimum": 0,
+                "description": "Sum of activity estimatedCost values; server recalculates this value",
+            },
+            "coverImage": {"type": ["string", "null"]},
+            "coverImageUrl": {"type": ["string", "null"]},
+            "createdAt": {
+                "type": "object",
+                "additionalProperties": False,
+                "properties": {
+                    "seconds": {"type": "integer"},
+                    "nanoseconds": {"type": "integer", "minimum": 0, "maximum": 999999999}
+                },
+                "required": ["seconds", "nanoseconds"]
+            },
+            # New summary fields
+            "summary": {
+                "type": ["object", "null"],
+                "additionalProperties": False,
+                "properties": {
+                    "overview": {"type": ["string", "null"], "description": "Brief overview of the plan (2-3 sentences)"},
+                    #"targetAudience": {"type": ["string", "null"], "description": "Who this plan is best suited for"},
+                    #"expectedOutcomes": {"type": ["array", "null"], "items": {"type": "string"}, "description": "3-5 expected outcomes"},
+                    "keyMilestones": {"type": ["array", "null"], "items": {"type": "string"}, "description": "3-5 key milestones"},
+                    #"difficultyProgression": {"type": ["string", "null"], "description": "How difficulty changes"},
+                    #"totalEstimatedHours": {"type": ["number", "null"], "description": "Total hours to complete"},
+                    #"prerequisites": {"type": ["array", "null"], "items": {"type": "string"}, "description": "Prerequisites if any"},
+                    "tipsForSuccess": {"type": ["array", "null"], "items": {"type": "string"}, "description": "3-5 tips for success"},
+                    "weeklyFocus": {"type": ["array", "null"], "items": {"type": "string"}, "description": "Focus for each week"}
+                },
+                "required": ["overview", "keyMilestones", "tipsForSuccess", "weeklyFocus"]
+            },
+            "tags": {"type": ["array", "null"], "items": {"type": "string"}, "description": "Relevant tags for the plan"},
+            "difficultyLevel": {"type": ["string", "null"], "enum": ["beginner", "intermediate", "advanced", "mixed", None], "description": "Overall difficulty"},
+            "estimatedCompletionRate": {"type": ["string", "null"], "description": "Expected completion rate"},
+            "days": {
+                "type": "array",
+                "minItems": 1,
+                "maxItems": 90,
+                "items": {
+                    "type": "object",
+                    "additionalProperties": False,
+                    "properties": {
+                        "id": {"type": "string"},
+                        "dayNumber": {"type": "integer", "minimum": 1},
+                        "title": {"type": "string"},
+                        "summary": {"type": "string"},
+                        "tasks": {
+                            "type": "array",
+                            "minItems": 1,
+                            "items": {
+                                "type": "object",
+                                "additionalProperties": False,
+                                "properties": {
+                                    "id": {"type": "string"},
+                                    "text": {"type": "string"},
+                                    "done": {"type": "boolean"},
+                                    "duration_min": {"type": ["integer", "null"], "minimum": 0, "maximum": 600},
+                                    "estimatedCost": {
+                                        "type": "number",
+                                        "minimum": 0,
+                                        "maximum": 1000000000,
+                                        "description": "Realistic activity estimate in plan currency; 0 if free",
+                                    },
+                                    "time": {"type": ["string", "null"], "description": "HH:MM start time — REQUIRED for travel itinerary days, chronological"},
+                                    "note": {"type": ["string", "null"]},
+                                    "link": {"type": "string"},
+                                },
+                                "required": ["id", "text", "done", "estimatedCost", "link"]
+                            }
+                        },
+                        "tips": {"type": ["string", "array", "null"], "items": {"type": "string"}},
+                        "flashcards": {
+                            "type": ["array", "null"],
+                            "maxItems": 6,
+                            "description": "Learning plans only: 3-6 study cards for the day's key facts/vocab",
+                            "items": {
+                                "type": "object",
+                                "additionalProperties": False,
+                                "properties": {
+                                    "front": {"type": "string", "description": "Prompt/term (short)"},
+                                    "back": {"type": "string", "description": "Answer/meaning"}
+                                },
+                                "required": ["front", "back"]
+                            }
+                        }
+                    },
+                    "required": ["id", "dayNumber", "title", "summary", "tasks"]
+                }
+            }
+        },
+        "required": ["planName", "category", "totalDays", "currency", "totalBudget", "createdAt", "days", "summary", "tags", "difficultyLevel", "estimatedCompletionRate"]
+    }
+}
+
+# Wrapped once so every request hands the SDK the same response_format object.
+_PLANNER_RESPONSE_FORMAT: Dict[str, Any] = {"type": "json_schema", "json_schema": _PLANNER_JSON_SCHEMA}
+
+# Outline user message, rendered in one format_map call per request
+_OUTLINE_USER_TEMPLATE = (
+    "{lang_note}\n"
+    "Category: {category}\n"
+    "Execution intent: {intent_type}\n"
+    "Plan: {plan_name}\n"
+    "Total days: {total_days}\n"
+    "Intensity: {intensity}\n"
+    "Minutes per day: {minutes}\n"
+    "{context}"
+    "\n\nCreate a logical outline covering all days 1.."
+    "{total_days} without gaps. Match the execution intent exactly. "
+    "{intent_rule}"
+)
+_OUTLINE_ITINERARY_RULE = (
+    "For an itinerary, each phase/day represents the trip itself; do not turn it "
+    "into lessons, quizzes, travel research, or a pre-trip preparation course."
+)
+_OUTLINE_DEFAULT_RULE = "Include rest/light days only when the domain genuinely benefits from them."
+
+# Outline response_format, built once; the same object is passed on every call.
+_OUTLINE_RESPONSE_FORMAT: Dict[str, Any] = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "plan_outline",
+        "schema": {
+            "type": "object",
+            "additionalProperties": False,
+            "properties": {
+                "overview": {"type": "string"},
+                "difficulty_arc": {"type": ["string", "null"]},
+                "key_milestones": {"type": "array", "items": {"type": "string"}},
+                "weekly_focus": {"type": "array", "items": {"type": "string"}},
+                "rest_day_numbers": {"type": "array", "items": {"type": "integer"}},
+                "phases": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "additionalProperties": False,
+                        "properties": {
+                            "phase_name": {"type": "string"},
+                            "start_day": {"type": "integer", "minimum": 1},
+                            "end_day": {"type": "integer", "minimum": 1},
+                            "focus": {"type": "string"},
+                            "goals": {"type": "array", "items": {"type": "string"}},
+                        },
+                        "required": ["phase_name", "start_day", "end_day", "focus", "goals"],
+                    },
+                },
+            },
+            "required": [
+                "overview",
+                "difficulty_arc",
+                "key_milestones",
+                "weekly_focus",
+                "rest_day_numbers",
+                "phases",
+            ],
+        },
+    },
+}
+
+# Assistant guidance for per-category specifics (few-shot style brief)
+_CATEGORY_HINTS = MappingProxyType({
+    "learning": (
+        "User goal: skill acquisition and knowledge development. Include variety: active practice, "
+        "review/repetition, application exercises, and reflection. Build progressively from basics "
+        "to advanced concepts. Include weekly review days with lighter cognitive load. "
+        "Adapt to user's specified learning domain (language, coding, music, etc.). "
+        "EVERY day MUST include 3-6 `flashcards` capturing that day's key facts, vocabulary, or "
+        "concepts (front = term/prompt, back = answer/meaning, in the plan's language) — the app "
+        "renders them as tap-to-flip study cards, and review days should reuse earlier cards' topics "
+        "with new phrasing for spaced repetition."
+    ),
+    "exercise": (
+        "User goal: physical fitness and health. Rotate training focus (strength, cardio, flexibility, mobility), "
+        "include proper warm-ups and cool-downs. At least one full rest day per week; incorporate deload weeks. "
+        "Progressive overload with safe form cues. Scale exercises for different fitness levels. "
+        "Balance intensity across the week."
+    ),
+    "travel": (
+        "User goal: trip planning and itinerary. Group activities by geographic proximity and themes. "
+        "Include practical logistics (transport modes, time estimates, booking tips). "
+        "Provide budget estimates per activity. Alternate high-intensity sightseeing days with relaxed exploration. "
+        "Include contingency plans and local cultural tips. "
+        "EVERY task MUST carry a realistic `time` (HH:MM, chronological through the day) and NAME the "
+        "specific venue/area in its text (e.g. 'Wat Mahathat, Ayutthaya old town') — the app renders "
+        "each day as a visual timeline and attaches real map data to named places."
+    ),
+    "finance": (
+        "User goal: financial management and literacy. Cover budgeting, tracking expenses, saving strategies, "
+        "investment basics, and debt management. Include actionable review tasks (e.g., audit subscriptions, "
+        "track weekly spending). Build from foundational concepts to advanced planning. "
+        "Weekly reflection on progress and adjustments."
+    ),
+    "health": (
+        "User goal: holistic wellness and healthy habits. Include nutrition planning, sleep hygiene, "
+        "stress management, hydration tracking, and mental health practices. "
+        "Provide evidence-based, sustainable habit formation. Balance physical and mental wellness tasks. "
+        "Include weekly self-assessment and adjustment days."
+    ),
+    "personal_development": (
+        "User goal: self-improvement and growth. Cover goal setting, productivity habits, mindfulness, "
+        "relationship skills, time management, and self-reflection practices. "
+        "Include journaling prompts, actionable exercises, and progress tracking. "
+        "Build awareness before action; emphasize consistency over intensity."
+    ),
+    "other": (
+        "User goal: custom plan based on user's specific needs. Analyze the user's detailPrompt carefully "
+        "and structure the plan with logical progression, variety, and practical actionable tasks. "
+        "Include appropriate rest/reflection days and balance intensity throughout the period."
+    )
+})
+
+# Category-specific expertise prepended to the system prompt
+_CATEGORY_EXPERTISE = MappingProxyType({
+    "learning": (
+        "You are a learning science expert who understands spaced repetition, active recall, "
+        "and progressive skill building. Design learning plans that:\n"
+        "- Start with foundational concepts before advancing\n"
+        "- Include regular review sessions to reinforce retention\n"
+        "- Alternate between theory and practical application\n"
+        "- Build in weekly reflection and consolidation days\n"
+        "- Vary learning activities to maintain engagement\n"
+    ),
+    "exercise": (
+        "You are a certified fitness professional who understands exercise physiology and "
+        "progressive training. Design workout plans that:\n"
+        "- Follow proper periodization (preparation, building, peak, recovery)\n"
+        "- Include appropriate warm-up and cool-down for each session\n"
+        "- Alternate muscle groups and training modalities\n"
+        "- Build in rest days and deload periods\n"
+        "- Progress safely with gradual intensity increases\n"
+        "- Adapt to user's available equipment and limitations\n"
+    ),
+    "travel": (
+        "You are an experienced travel planner who understands logistics and local experiences. "
+        "Design travel itineraries that:\n"
+        "- Treat every generated day as a day of the actual trip unless the user explicitly asks for pre-trip preparation\n"
+        "- Fill each day with a realistic schedule using most of the user's daily time budget "
+        "(typically several hours: sightseeing blocks, meals, transit, and short rest breaks)\n"
+        "- Group activities by geographic proximity to minimize backtracking\n"
+        "- Balance busy exploration days with lighter recovery days\n"
+        "- Name exact venues/areas so Google Places enrichment can attach maps, addresses, coordinates, and ratings\n"
+        "- Include practical logistics in task notes: transport mode and duration, reservation/ticket needs, "
+        "approximate cost, accessibility, and a fallback when it materially helps\n"
+        "- Use realistic chronological HH:MM task times; include arrival/check-in, meals, and transfers when present\n"
+        "- Include buffer time for unexpected discoveries\n"
+        "- Never add quizzes, study drills, generic research homework, packing, or reflection exercises unless explicitly requested\n"
+    ),
+    "finance": (
+        "You are a financial literacy expert who understands budgeting, saving, and investing. "
+        "Design financial plans that:\n"
+        "- Start with assessment and goal-setting\n"
+        "- Build foundational habits before complex strategies\n"
+        "- Include regular tracking and review tasks\n"
+        "- Progress from saving to investing concepts\n"
+        "- Provide actionable, specific financial tasks\n"
+        "- Account for user's financial situation and goals\n"
+    ),
+    "health": (
+        "You are a wellness expert who understands holistic health and sustainable habits. "
+        "Design health plans that:\n"
+        "- Address multiple dimensions (physical, mental, nutritional)\n"
+        "- Build sustainable habits over quick fixes\n"
+        "- Include regular self-assessment checkpoints\n"
+        "- Balance action items with rest and recovery\n"
+        "- Provide evidence-based recommendations\n"
+        "- Adapt to user's health conditions and preferences\n"
+    ),
+    "personal_development": (
+        "You are a personal development coach who understands behavior change and growth. "
+        "Design development plans that:\n"
+        "- Start with self-reflection and goal clarity\n"
+        "- Build habits using proven frameworks (habit stacking, tiny habits)\n"
+        "- Include journaling and reflection prompts\n"
+        "- Progress from awareness to action to mastery\n"
+        "- Balance challenge with achievability\n"
+        "- Incorporate accountability mechanisms\n"
+    ),
+    "other": (
+        "You are a versatile planning expert who can adapt to any domain. "
+        "Design plans that:\n"
+        "- Analyze the user's specific needs carefully\n"
+        "- Create logical progression from start to goal\n"
+        "- Include variety and engagement\n"
+        "- Build in reflection and adjustment points\n"
+    )
+})
+
+# Static tail of every planner system prompt
+_GENERATION_RULES = """
+GENERATION RULES:
+1) Keep each day practical (2-4 tasks tailored to the user's context)
+2) Add brief tips that are relevant to the user's situation
+3) Titles should be short, motivating, and reflect the day's focus
+4) Never invent unsafe or extreme advice; prefer safe defaults
+5) CRITICAL: Output MUST be valid JSON matching the exact schema provided
+6) Include ALL required fields: planName, category, totalDays, currency, totalBudget, createdAt, days, summary, tags, difficultyLevel, estimatedCompletionRate
+7) ABSOLUTE REQUIREMENT: The 'days' array MUST contain EXACTLY the number of days specified in totalDays
+8) TIME ALLOCATION: If minutesPerDay is specified, allocate time based on task complexity (±20% flexibility)
+9) DAY NUMBERING: dayNumber must start from 1 and increment sequentially
+10) DETAILED TASKS: Each task MUST include comprehensive, actionable instructions
+11) INTENT FIRST: Do not force every plan into learning, practice, habit-building, reflection, or quiz form.
+    Use itinerary stops for trips, sessions for workouts, deliverables for projects, logistics for events,
+    transactions/checks for finance, and lessons/exercises only for true learning plans.
+12) QUIZZES: Planner content never contains quiz-like questions unless the resolved intent is learning and
+    the user would genuinely benefit from recall. Travel, exercise, event, project, finance, and routine plans
+    must not contain quizzes.
+13) UNIVERSAL BUDGET: Every task in every intent carries `estimatedCost` in the single plan currency.
+    Use 0 for free activities. This includes meetings, events, projects, workouts, learning, errands, and travel.
+    For event/meeting plans, include relevant venue, AV, catering, material, transport, and service costs.
+
+PLAN SUMMARY REQUIREMENTS (REQUIRED):
+You MUST include a comprehensive 'summary' object with these fields:
+- overview: 2-3 sentence overview of the entire plan and its approach
+- targetAudience: Who this plan is ideal for (e.g., "Beginners with no prior experience" or "Intermediate learners looking to advance")
+- expectedOutcomes: List of 3-5 specific outcomes users can expect to achieve
+- keyMilestones: List of 3-5 major milestones throughout the plan (e.g., "Week 1: Master fundamentals", "Week 2: Build first project")
+- difficultyProgression: How difficulty evolves (e.g., "Starts easy, gradually increases to intermediate level by week 3")
+- totalEstimatedHours: Calculate total hours based on daily time allocation and number of days
+- prerequisites: List any prerequisites (or null if none required)
+- tipsForSuccess: 3-5 actionable tips for users to maximize success
+- weeklyFocus: Brief description of each week's main focus area
+
+Also include:
+- tags: 5-8 relevant tags for categorization (e.g., ["python", "programming", "beginner", "30-day", "coding"])
+- difficultyLevel: Overall difficulty ("beginner", "intermediate", "advanced", or "mixed")
+- estimatedCompletionRate: Realistic completion expectation (e.g., "85% with consistent daily practice")
+
+TASK QUALITY REQUIREMENTS:
+✓ Provide specific, actionable steps personalized to the user
+✓ Include relevant tips, techniques, or methods
+✓ Give clear success criteria or what to expect
+✓ Include safety considerations where applicable
+✓ Make tasks self-contained and complete
+✓ Use the 'note' field for additional helpful details
+✓ Reference user's goals, equipment, and preferences when relevant
+
+TASK EXAMPLES:
+✅ GOOD: 'Practice Python variables: Create 5 different variable types (string, integer, float, boolean, list). Write a simple program that uses each type and prints the results. Focus on proper naming conventions and data type understanding.'
+✅ GOOD: 'Morning cardio workout: Do 20 minutes of moderate-intensity exercise (brisk walking, jogging, or cycling). Start with 5-minute warm-up, maintain steady pace for 15 minutes, finish with 5-minute cool-down.'
+✅ GOOD TRAVEL: '09:00 — Wat Mahathat: explore the central ruins for 75 minutes; arrive by tuk-tuk from the hotel (15 minutes). Note ticket requirements and keep the official place name for Maps.'
+❌ BAD: 'Learn Python' (too vague)
+❌ BAD: 'Do some exercise' (not specific enough)
+❌ BAD TRAVEL: 'Research the destination and take a quiz about local culture' (this is not an itinerary)
+"""
+
+
+@lru_cache(maxsize=256)
+def _system_prompt_head(category: str, intent_type: str, refinement_mode: bool) -> str:
+    """Role preamble plus category expertise; everything before personalization."""
+    if refinement_mode:
+        base_prompt = (
+            "You are an expert plan editor for a lifestyle planner app. "
+            "The user has a DRAFT plan and wants specific changes. "
+            "Preserve days, tasks, and structure they did NOT ask to change. "
+            "Apply only the requested refinements while keeping the same totalDays. "
+            "Output a complete updated plan JSON matching the schema. "
+        )
+    else:
+        base_prompt = (
+            "You are an expert intent-aware planner-content generator for a lifestyle planner app. "
+            "Generate structured daily plans with clear titles, concise summaries, and actionable tasks. "
+            f"The resolved execution intent is '{intent_type}'. Match that experience exactly. "
+        )
+    return base_prompt + _CATEGORY_EXPERTISE.get(category, _CATEGORY_EXPERTISE["other"])
+
+
+@lru_cache(maxsize=256)
+def _default_system_prompt(category: str, intent_type: str, refinement_mode: bool) -> str:
+    """Full system prompt for requests without extracted user context."""
+    return _system_prompt_head(category, intent_type, refinement_mode) + _GENERATION_RULES
+
+
+# Marker counted in streamed completions to track how many days are written
+_STREAM_DAY_KEY = '"dayNumber"'
+
+# Fenced ```json block, for replies that wrap the object in markdown
+_JSON_FENCE_RE = re.compile(r'```(?:json)?\s*(\{.*?\})\s*```', re.DOTALL)
+
+# Link validation tables for ChatWrapper._validate_task_link. Domains are
+# stored as reversed label tuples ("www.coursera.org" -> ("org", "coursera",
+# "www")), so a suffix match is one set lookup per label of the link's host
+# and can never match across a label boundary.
+# Scheme check and host (netloc) capture in one anchored match
+_LINK_HOST_RE = re.compile(r"https?://([^/?#]*)")
+_INVALID_LINK_RE = re.compile("|".join(map(re.escape, (
+    'example.com', 'placeholder', 'test.com', 'dummy.com',
+    'bit.ly', 'tinyurl.com', 'short.link', 'goo.gl',
+    'localhost', '127.0.0.1', '0.0.0.0', 'example.org',
+    'test.org', 'dummy.org', 'sample.com', 'demo.com',
+))))
+# Bad words and shorteners rejected by the permissive fallback
+_UNTRUSTED_DOMAIN_RE = re.compile("|".join(map(re.escape, (
+    'localhost', '127.0.0.1', 'test', 'dummy', 'example', 'placeholder',
+    'bit.ly', 'tinyurl', 'short.link', 'goo.gl', 't.co',
+))))
+
+
+def _domain_table(*domains: str) -> frozenset:
+    return frozenset(tuple(reversed(d.split('.'))) for d in domains)
+
+
+def _matches_domain(labels: Tuple[str, ...], table: frozenset, *, subdomains_only: bool = False) -> bool:
+    """True if the reversed host labels end in a domain from table."""
+    depth = len(labels) if subdomains_only else len(labels) + 1
+    return any(labels[:n] in table for n in range(1, depth))
+
+
+# Educational, government and international TLD/subdomain patterns
+_TRUSTED_LINK_SUFFIXES = _domain_table(
+    'edu', 'ac.uk', 'ac.jp', 'ac.kr', 'ac.in',
+    'gov', 'gov.uk', 'gov.au', 'gov.ca', 'gov.in',
+    'org', 'int', 'un.org', 'who.int', 'unicef.org',
+)
+
+
+_TRUSTED_LINK_DOMAINS = _domain_table(
+    # Major platforms
+    'youtube.com', 'vimeo.com', 'ted.com', 'khanacademy.org',
+    'coursera.org', 'edx.org', 'udemy.com', 'skillshare.com',
+    'codecademy.com', 'freecodecamp.org', 'w3schools.com',
+    'stackoverflow.com', 'github.com', 'gitlab.com',
+    # News and reference
+    'wikipedia.org', 'britannica.com', 'merriam-webster.com',
+    'dictionary.com', 'thesaurus.com', 'oxford.com',
+    # Health and medical
+    'mayoclinic.org', 'healthline.com', 'webmd.com',
+    'medlineplus.gov', 'cdc.gov', 'nih.gov', 'who.int',
+    'clevelandclinic.org', 'hopkinsmedicine.org',
+    # Finance
+    'investopedia.com', 'nerdwallet.com', 'bankrate.com',
+    'mint.com', 'yahoo.com', 'marketwatch.com', 'cnbc.com',
+    'forbes.com', 'bloomberg.com', 'reuters.com',
+    # Fitness and wellness
+    'nike.com', 'adidas.com', 'fitnessblender.com', 'darebee.com',
+    'myfitnesspal.com', 'bodybuilding.com', 'acefitness.org',
+    'verywellfit.com', 'menshealth.com', 'womenshealthmag.com',
+    # Travel
+    'tripadvisor.com', 'booking.com', 'expedia.com', 'airbnb.com',
+    'lonelyplanet.com', 'nationalgeographic.com', 'rome2rio.com',
+    # Personal development
+    'mindtools.com', 'psychologytoday.com', 'hbr.org',
+    'lifehack.org', 'zenhabits.net', 'jamesclear.com',
+    'charlesduhigg.com', 'gretchenrubin.com',
+    # General platforms
+    'medium.com', 'quora.com', 'reddit.com', 'linkedin.com',
+    'twitter.com', 'facebook.com', 'instagram.com',
+    # Technology
+    'mozilla.org', 'w3.org', 'ietf.org', 'apache.org',
+    'python.org', 'nodejs.org', 'reactjs.org', 'vuejs.org',
+    'angular.io', 'typescript.org', 'developer.mozilla.org',
+)
+_CATEGORY_LINK_DOMAINS = MappingProxyType({
+    "learning": _domain_table(
+        'udacity.com', 'pluralsight.com', 'lynda.com', 'treehouse.com',
+        'datacamp.com', 'kaggle.com', 'leetcode.com', 'hackerrank.com',
+        'codewars.com', 'exercism.io', 'scrimba.com', 'egghead.io',
+    ),
+    "exercise": _domain_table(
+        'peloton.com', 'strava.com', 'runtastic.com', 'mapmyrun.com',
+        'myfitnesspal.com', 'cronometer.com', 'fitbit.com', 'garmin.com',
+    ),
+    "finance": _domain_table(
+        'mint.com', 'ynab.com', 'personalcapital.com', 'wealthfront.com',
+        'betterment.com', 'robinhood.com', 'etrade.com', 'schwab.com',
+    ),
+    "health": _domain_table(
+        'myfitnesspal.com', 'cronometer.com', 'loseit.com', 'sparkpeople.com',
+        'fitbit.com', 'garmin.com', 'apple.com/health', 'google.com/fit',
+    ),
+})
+
+# Context-extraction response schemas. The per-category part is the only
+# thing that varies, so each category's full schema is built once at import
+# rather than rebuilt on every extract_context call.
+_EXTRACTION_CATEGORY_SCHEMAS: Dict[str, Dict[str, Any]] = {
+    "learning": {
+        "type": "object",
+        "properties": {
+            "subject_area": {"type": ["string", "null"], "description": "Main subject being learned"},
+            "current_knowledge": {"type": ["string", "null"], "description": "What user already knows"},
+            "target_skill_level": {"type": ["string", "null"], "description": "Desired proficiency level"},
+            "learning_resources": {"type": ["array", "null"], "items": {"type": "string"}, "description": "Available learning materials"},
+            "exam_or_certification": {"type": ["string", "null"], "description": "Any exam or certification goal"},
+            "practice_focus": {"type": ["string", "null"], "description": "Specific areas to focus practice on"}
+        }
+    },
+    "exercise": {
+        "type": "object",
+        "properties": {
+            "fitness_goal": {"type": ["string", "null"], "description": "Primary fitness objective"},
+            "current_fitness_level": {"type": ["string", "null"], "description": "Current fitness state"},
+            "workout_types_preferred": {"type": ["array", "null"], "items": {"type": "string"}, "description": "Preferred workout types"},
+            "equipment_available": {"type": ["array", "null"], "items": {"type": "string"}, "description": "Available equipment"},
+            "injuries_or_limitations": {"type": ["array", "null"], "items": {"type": "string"}, "description": "Physical limitations"},
+            "workout_location": {"type": ["string", "null"], "description": "Where workouts will happen"},
+            "target_metrics": {"type": ["string", "null"], "description": "Specific metrics to achieve"}
+        }
+    },
+    "travel": {
+        "type": "object",
+        "properties": {
+            "destination": {"type": ["string", "null"], "description": "Travel destination(s)"},
+            "trip_type": {"type": ["string", "null"], "description": "Type of trip (adventure, relaxation, cultural, etc.)"},
+            "travel_companions": {"type": ["string", "null"], "description": "Who is traveling (solo, couple, family, group)"},
+            "interests": {"type": ["array", "null"], "items": {"type": "string"}, "description": "Activities and interests"},
+            "accommodation_preference": {"type": ["string", "null"], "description": "Preferred accommodation type"},
+            "transportation_preference": {"type": ["string", "null"], "description": "Preferred transportation"},
+            "must_see_places": {"type": ["array", "null"], "items": {"type": "string"}, "description": "Must-visit locations"}
+        }
+    },
+    "finance": {
+        "type": "object",
+        "properties": {
+            "financial_goal": {"type": ["string", "null"], "description": "Primary financial objective"},
+            "current_situation": {"type": ["string", "null"], "description": "Current financial state"},
+            "income_level": {"type": ["string", "null"], "description": "General income bracket"},
+            "debt_situation": {"type": ["string", "null"], "description": "Any debt to manage"},
+            "saving_target": {"type": ["string", "null"], "description": "Specific saving goal"},
+            "investment_interest": {"type": ["string", "null"], "description": "Interest in investments"},
+            "financial_knowledge": {"type": ["string", "null"], "description": "Current financial literacy level"}
+        }
+    },
+    "health": {
+        "type": "object",
+        "properties": {
+            "health_goal": {"type": ["string", "null"], "description": "Primary health objective"},
+            "current_health_status": {"type": ["string", "null"], "description": "Current health state"},
+            "health_conditions": {"type": ["array", "null"], "items": {"type": "string"}, "description": "Existing health conditions"},
+            "diet_preferences": {"type": ["string", "null"], "description": "Dietary preferences or restrictions"},
+            "sleep_patterns": {"type": ["string", "null"], "description": "Current sleep habits"},
+            "stress_level": {"type": ["string", "null"], "description": "Current stress level"},
+            "wellness_focus": {"type": ["array", "null"], "items": {"type": "string"}, "description": "Areas to focus on"}
+        }
+    },
+    "personal_development": {
+        "type": "object",
+        "properties": {
+            "development_area": {"type": ["string", "null"], "description": "Main area of development"},
+            "current_challenges": {"type": ["array", "null"], "items": {"type": "string"}, "description": "Current challenges faced"},
+            "skills_to_develop": {"type": ["array", "null"], "items": {"type": "string"}, "description": "Skills to build"},
+            "habits_to_build": {"type": ["array", "null"], "items": {"type": "string"}, "description": "Habits to establish"},
+            "habits_to_break": {"type": ["array", "null"], "items": {"type": "string"}, "description": "Habits to eliminate"},
+            "life_area_focus": {"type": ["string", "null"], "description": "Life area to focus on"},
+            "role_models": {"type": ["array", "null"], "items": {"type": "string"}, "description": "Mentioned role models or influences"}
+        }
+    },
+    "other": {
+        "type": "object",
+        "properties": {
+            "main_topic": {"type": ["string", "null"], "description": "Main topic or activity"},
+            "specific_requirements": {"type": ["array", "null"], "items": {"type": "string"}, "description": "Specific requirements mentioned"},
+            "desired_outcomes": {"type": ["array", "null"], "items": {"type": "string"}, "description": "Desired outcomes"}
+        }
+    }
+}
+
+
+def _build_extraction_schema(category_specific: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "name": "extracted_user_context",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "additionalProperties": False,
+            "properties": {
+                "profile": {
+                    "type": "object",
+                    "additionalProperties": False,
+                    "properties": {
+                        "experience_level": {"type": ["string", "null"], "enum": ["beginner", "intermediate", "advanced", "expert", None]},
+                        "age_group": {"type": ["string", "null"], "enum": ["teen", "young_adult", "adult", "senior", None]},
+                        "physical_limitations": {"type": ["array", "null"], "items": {"type": "string"}},
+                        "available_resources": {"type": ["array", "null"], "items": {"type": "string"}},
+                        "location": {"type": ["string", "null"]}
+                    },
+                    "required": ["experience_level", "age_group", "physical_limitations", "available_resources", "location"]
+                },
+                "goals": {
+                    "type": "object",
+                    "additionalProperties": False,
+                    "properties": {
+                        "primary_goal": {"type": ["string", "null"]},
+                        "secondary_goals": {"type": ["array", "null"], "items": {"type": "string"}},
+                        "target_outcome": {"type": ["string", "null"]},
+                        "deadline": {"type": ["string", "null"]},
+                        "motivation_type": {"type": ["string", "null"], "enum": ["achievement", "health", "social", "mastery", "enjoyment", "necessity", None]}
+                    },
+                    "required": ["primary_goal", "secondary_goals", "target_outcome", "deadline", "motivation_type"]
+                },
+                "constraints": {
+                    "type": "object",
+                    "additionalProperties": False,
+                    "properties": {
+                        "budget_level": {"type": ["string", "null"], "enum": ["minimal", "moderate", "flexible", "unlimited", None]},
+                        "time_constraints": {"type": ["string", "null"]},
+                        "excluded_activities": {"type": ["array", "null"], "items": {"type": "string"}},
+                        "preferred_activities": {"type": ["array", "null"], "items": {"type": "string"}},
+                        "rest_requirements": {"type": ["string", "null"]}
+                    },
+                    "required": ["budget_level", "time_constraints", "excluded_activities", "preferred_activities", "rest_requirements"]
+                },
+                "learning_style": {
+                    "type": "object",
+                    "additionalProperties": False,
+                    "properties": {
+                        "learning_style": {"type": ["string", "null"], "enum": ["visual", "reading", "hands_on", "auditory", "mixed", None]},
+                        "pace_preference": {"type": ["string", "null"], "enum": ["slow_steady", "moderate", "intensive", "flexible", None]},
+                        "feedback_preference": {"type": ["string", "null"], "enum": ["detailed", "brief", "encouraging", "challenging", None]}
+                    },
+                    "required": ["learning_style", "pace_preference", "feedback_preference"]
+                },
+                "category_specific": category_specific,
+                "key_requirements": {"type": ["array", "null"], "items": {"type": "string"}},
+                "tone_preference": {"type": ["string", "null"], "enum": ["professional", "casual", "motivational", "educational", "friendly", None]},
+                "special_considerations": {"type": ["array", "null"], "items": {"type": "string"}}
+            },
+            "required": ["profile", "goals", "constraints", "learning_style", "category_specific", "key_requirements", "tone_preference", "special_considerations"]
+        }
+    }
+
+
+_EXTRACTION_SCHEMAS = MappingProxyType({
+    cat: _build_extraction_schema(fields) for cat, fields in _EXTRACTION_CATEGORY_SCHEMAS.items()
+})
+
+@dataclass(frozen=True, slots=True)
 class ChatWrapperConfig:
     model: str = "gpt-5.4"  # High quality model for content generation
     fast_model: str = "gpt-5.4-mini"  # Faster model for fast mode
@@ -747,7 +1588,7 @@ class ChatWrapperConfig:
     chunk_size: int = 30  # Days per chunk for large plans
     max_chunks: int = 3   # Maximum number of chunks (90 days max)
     # Guardrails via JSON schema (response_format)
-    json_schema: Dict[str, Any] = None
+    json_schema: Optional[Dict[str, Any]] = None  # None -> _PLANNER_JSON_SCHEMA
 
 
 class ContextExtractor:
@@ -762,151 +1603,7 @@ class ContextExtractor:
     
     def _get_extraction_schema(self, category: str) -> Dict[str, Any]:
         """Get JSON schema for context extraction based on category"""
-        
-        # Category-specific fields to extract
-        category_specific_schema = {
-            "learning": {
-                "type": "object",
-                "properties": {
-                    "subject_area": {"type": ["string", "null"], "description": "Main subject being learned"},
-                    "current_knowledge": {"type": ["string", "null"], "description": "What user already knows"},
-                    "target_skill_level": {"type": ["string", "null"], "description": "Desired proficiency level"},
-                    "learning_resources": {"type": ["array", "null"], "items": {"type": "string"}, "description": "Available learning materials"},
-                    "exam_or_certification": {"type": ["string", "null"], "description": "Any exam or certification goal"},
-                    "practice_focus": {"type": ["string", "null"], "description": "Specific areas to focus practice on"}
-                }
-            },
-            "exercise": {
-                "type": "object",
-                "properties": {
-                    "fitness_goal": {"type": ["string", "null"], "description": "Primary fitness objective"},
-                    "current_fitness_level": {"type": ["string", "null"], "description": "Current fitness state"},
-                    "workout_types_preferred": {"type": ["array", "null"], "items": {"type": "string"}, "description": "Preferred workout types"},
-                    "equipment_available": {"type": ["array", "null"], "items": {"type": "string"}, "description": "Available equipment"},
-                    "injuries_or_limitations": {"type": ["array", "null"], "items": {"type": "string"}, "description": "Physical limitations"},
-                    "workout_location": {"type": ["string", "null"], "description": "Where workouts will happen"},
-                    "target_metrics": {"type": ["string", "null"], "description": "Specific metrics to achieve"}
-                }
-            },
-            "travel": {
-                "type": "object",
-                "properties": {
-                    "destination": {"type": ["string", "null"], "description": "Travel destination(s)"},
-                    "trip_type": {"type": ["string", "null"], "description": "Type of trip (adventure, relaxation, cultural, etc.)"},
-                    "travel_companions": {"type": ["string", "null"], "description": "Who is traveling (solo, couple, family, group)"},
-                    "interests": {"type": ["array", "null"], "items": {"type": "string"}, "description": "Activities and interests"},
-                    "accommodation_preference": {"type": ["string", "null"], "description": "Preferred accommodation type"},
-                    "transportation_preference": {"type": ["string", "null"], "description": "Preferred transportation"},
-                    "must_see_places": {"type": ["array", "null"], "items": {"type": "string"}, "description": "Must-visit locations"}
-                }
-            },
-            "finance": {
-                "type": "object",
-                "properties": {
-                    "financial_goal": {"type": ["string", "null"], "description": "Primary financial objective"},
-                    "current_situation": {"type": ["string", "null"], "description": "Current financial state"},
-                    "income_level": {"type": ["string", "null"], "description": "General income bracket"},
-                    "debt_situation": {"type": ["string", "null"], "description": "Any debt to manage"},
-                    "saving_target": {"type": ["string", "null"], "description": "Specific saving goal"},
-                    "investment_interest": {"type": ["string", "null"], "description": "Interest in investments"},
-                    "financial_knowledge": {"type": ["string", "null"], "description": "Current financial literacy level"}
-                }
-            },
-            "health": {
-                "type": "object",
-                "properties": {
-                    "health_goal": {"type": ["string", "null"], "description": "Primary health objective"},
-                    "current_health_status": {"type": ["string", "null"], "description": "Current health state"},
-                    "health_conditions": {"type": ["array", "null"], "items": {"type": "string"}, "description": "Existing health conditions"},
-                    "diet_preferences": {"type": ["string", "null"], "description": "Dietary preferences or restrictions"},
-                    "sleep_patterns": {"type": ["string", "null"], "description": "Current sleep habits"},
-                    "stress_level": {"type": ["string", "null"], "description": "Current stress level"},
-                    "wellness_focus": {"type": ["array", "null"], "items": {"type": "string"}, "description": "Areas to focus on"}
-                }
-            },
-            "personal_development": {
-                "type": "object",
-                "properties": {
-                    "development_area": {"type": ["string", "null"], "description": "Main area of development"},
-                    "current_challenges": {"type": ["array", "null"], "items": {"type": "string"}, "description": "Current challenges faced"},
-                    "skills_to_develop": {"type": ["array", "null"], "items": {"type": "string"}, "description": "Skills to build"},
-                    "habits_to_build": {"type": ["array", "null"], "items": {"type": "string"}, "description": "Habits to establish"},
-                    "habits_to_break": {"type": ["array", "null"], "items": {"type": "string"}, "description": "Habits to eliminate"},
-                    "life_area_focus": {"type": ["string", "null"], "description": "Life area to focus on"},
-                    "role_models": {"type": ["array", "null"], "items": {"type": "string"}, "description": "Mentioned role models or influences"}
-                }
-            },
-            "other": {
-                "type": "object",
-                "properties": {
-                    "main_topic": {"type": ["string", "null"], "description": "Main topic or activity"},
-                    "specific_requirements": {"type": ["array", "null"], "items": {"type": "string"}, "description": "Specific requirements mentioned"},
-                    "desired_outcomes": {"type": ["array", "null"], "items": {"type": "string"}, "description": "Desired outcomes"}
-                }
-            }
-        }
-        
-        return {
-            "name": "extracted_user_context",
-            "strict": True,
-            "schema": {
-                "type": "object",
-                "additionalProperties": False,
-                "properties": {
-                    "profile": {
-                        "type": "object",
-                        "additionalProperties": False,
-                        "properties": {
-                            "experience_level": {"type": ["string", "null"], "enum": ["beginner", "intermediate", "advanced", "expert", None]},
-                            "age_group": {"type": ["string", "null"], "enum": ["teen", "young_adult", "adult", "senior", None]},
-                            "physical_limitations": {"type": ["array", "null"], "items": {"type": "string"}},
-                            "available_resources": {"type": ["array", "null"], "items": {"type": "string"}},
-                            "location": {"type": ["string", "null"]}
-                        },
-                        "required": ["experience_level", "age_group", "physical_limitations", "available_resources", "location"]
-                    },
-                    "goals": {
-                        "type": "object",
-                        "additionalProperties": False,
-                        "properties": {
-                            "primary_goal": {"type": ["string", "null"]},
-                            "secondary_goals": {"type": ["array", "null"], "items": {"type": "string"}},
-                            "target_outcome": {"type": ["string", "null"]},
-                            "deadline": {"type": ["string", "null"]},
-                            "motivation_type": {"type": ["string", "null"], "enum": ["achievement", "health", "social", "mastery", "enjoyment", "necessity", None]}
-                        },
-                        "required": ["primary_goal", "secondary_goals", "target_outcome", "deadline", "motivation_type"]
-                    },
-                    "constraints": {
-                        "type": "object",
-                        "additionalProperties": False,
-                        "properties": {
-                            "budget_level": {"type": ["string", "null"], "enum": ["minimal", "moderate", "flexible", "unlimited", None]},
-                            "time_constraints": {"type": ["string", "null"]},
-                            "excluded_activities": {"type": ["array", "null"], "items": {"type": "string"}},
-                            "preferred_activities": {"type": ["array", "null"], "items": {"type": "string"}},
-                            "rest_requirements": {"type": ["string", "null"]}
-                        },
-                        "required": ["budget_level", "time_constraints", "excluded_activities", "preferred_activities", "rest_requirements"]
-                    },
-                    "learning_style": {
-                        "type": "object",
-                        "additionalProperties": False,
-                        "properties": {
-                            "learning_style": {"type": ["string", "null"], "enum": ["visual", "reading", "hands_on", "auditory", "mixed", None]},
-                            "pace_preference": {"type": ["string", "null"], "enum": ["slow_steady", "moderate", "intensive", "flexible", None]},
-                            "feedback_preference": {"type": ["string", "null"], "enum": ["detailed", "brief", "encouraging", "challenging", None]}
-                        },
-                        "required": ["learning_style", "pace_preference", "feedback_preference"]
-                    },
-                    "category_specific": category_specific_schema.get(category, category_specific_schema["other"]),
-                    "key_requirements": {"type": ["array", "null"], "items": {"type": "string"}},
-                    "tone_preference": {"type": ["string", "null"], "enum": ["professional", "casual", "motivational", "educational", "friendly", None]},
-                    "special_considerations": {"type": ["array", "null"], "items": {"type": "string"}}
-                },
-                "required": ["profile", "goals", "constraints", "learning_style", "category_specific", "key_requirements", "tone_preference", "special_considerations"]
-            }
-        }
+        return _EXTRACTION_SCHEMAS.get(category, _EXTRACTION_SCHEMAS["other"])
     
     def _get_extraction_prompt(self, category: str) -> str:
         """Get the system prompt for context extraction"""
@@ -984,7 +1681,7 @@ Extract all relevant structured information from this description."""
                 return None
             
             raw_response = response.choices[0].message.content
-            data = json.loads(raw_response)
+            data = orjson.loads(raw_response)
             
             # Convert to ExtractedUserContext
             context = ExtractedUserContext(
@@ -1038,6 +1735,51 @@ class ChatWrapper:
             payload["stages_completed"] = stages_completed
         callback(payload)
 
+    def _stream_completion(
+        self,
+        request_params: Dict[str, Any],
+        total_days: int,
+        progress_callback: ProgressCallback,
+    ) -> Optional[str]:
+        """Stream a chat completion, reporting progress as each day starts.
+
+        Days are counted by spotting the ``"dayNumber"`` key in the streamed
+        text, so progress moves from 40% to 85% while the model is still
+        writing instead of jumping once the whole reply has arrived. A reply
+        that starts more days than requested would fail the day-count check
+        anyway, so the stream is closed as soon as that happens and the
+        caller retries instead of waiting for the rest of it.
+        """
+        key = _STREAM_DAY_KEY
+        parts: List[str] = []
+        carry = ""
+        days_seen = 0
+        stream = get_openai_client().chat.completions.create(**request_params, stream=True)
+        for event in stream:
+            if not event.choices:
+                continue
+            delta = event.choices[0].delta.content
+            if not delta:
+                continue
+            parts.append(delta)
+            # carry holds the previous tail so a key split across deltas is
+            # still counted, and never counted twice.
+            window = carry + delta
+            found = window.count(key)
+            carry = window[-(len(key) - 1):]
+            if found:
+                days_seen += found
+                if days_seen > total_days:
+                    stream.close()
+                    raise ValueError(f"completion overran {total_days} days")
+                self._emit_progress(
+                    progress_callback,
+                    progress=40 + int(45 * (days_seen - 1) / max(total_days, 1)),
+                    progress_message=f"Writing day {days_seen} of {total_days}...",
+                    current_stage="generating_days",
+                )
+        return "".join(parts) or None
+
     def _outline_to_prompt_section(self, outline: Optional[PlanOutline]) -> str:
         if not outline:
             return ""
@@ -1092,62 +1834,19 @@ class ChatWrapper:
                 "path, not a template:\n" + req.userContext[:3500]
             )
 
-        schema = {
-            "name": "plan_outline",
-            "schema": {
-                "type": "object",
-                "additionalProperties": False,
-                "properties": {
-                    "overview": {"type": "string"},
-                    "difficulty_arc": {"type": ["string", "null"]},
-                    "key_milestones": {"type": "array", "items": {"type": "string"}},
-                    "weekly_focus": {"type": "array", "items": {"type": "string"}},
-                    "rest_day_numbers": {"type": "array", "items": {"type": "integer"}},
-                    "phases": {
-                        "type": "array",
-                        "items": {
-                            "type": "object",
-                            "additionalProperties": False,
-                            "properties": {
-                                "phase_name": {"type": "string"},
-                                "start_day": {"type": "integer", "minimum": 1},
-                                "end_day": {"type": "integer", "minimum": 1},
-                                "focus": {"type": "string"},
-                                "goals": {"type": "array", "items": {"type": "string"}},
-                            },
-                            "required": ["phase_name", "start_day", "end_day", "focus", "goals"],
-                        },
-                    },
-                },
-                "required": [
-                    "overview",
-                    "difficulty_arc",
-                    "key_milestones",
-                    "weekly_focus",
-                    "rest_day_numbers",
-                    "phases",
-                ],
-            },
-        }
-
-        user_msg = (
-            f"{lang_note}\n"
-            f"Category: {req.category}\n"
-            f"Execution intent: {intent_type}\n"
-            f"Plan: {req.planName}\n"
-            f"Total days: {req.totalDays}\n"
-            f"Intensity: {req.intensity or 'moderate'}\n"
-            f"Minutes per day: {req.minutesPerDay or 'flexible'}\n"
-            + ("\n".join(context_bits) if context_bits else "")
-            + "\n\nCreate a logical outline covering all days 1.."
-            f"{req.totalDays} without gaps. Match the execution intent exactly. "
-            + (
-                "For an itinerary, each phase/day represents the trip itself; do not turn it "
-                "into lessons, quizzes, travel research, or a pre-trip preparation course."
-                if intent_type == "itinerary"
-                else "Include rest/light days only when the domain genuinely benefits from them."
-            )
-        )
+        user_msg = _OUTLINE_USER_TEMPLATE.format_map({
+            "lang_note": lang_note,
+            "category": req.category,
+            "intent_type": intent_type,
+            "plan_name": req.planName,
+            "total_days": req.totalDays,
+            "intensity": req.intensity or "moderate",
+            "minutes": req.minutesPerDay or "flexible",
+            "context": "\n".join(context_bits),
+            "intent_rule": (
+                _OUTLINE_ITINERARY_RULE if intent_type == "itinerary" else _OUTLINE_DEFAULT_RULE
+            ),
+        })
 
         try:
             response = get_openai_client().chat.completions.create(
@@ -1166,7 +1865,7 @@ class ChatWrapper:
                     },
                     {"role": "user", "content": user_msg},
                 ],
-                response_format={"type": "json_schema", "json_schema": schema},
+                response_format=_OUTLINE_RESPONSE_FORMAT,
             )
             raw = response.choices[0].message.content if response.choices else None
             if not raw:
@@ -1181,26 +1880,28 @@ class ChatWrapper:
         """Parse JSON response with fallback mechanisms for common issues"""
         # First, try direct parsing
         try:
-            return json.loads(raw_response)
+            return orjson.loads(raw_response)
         except json.JSONDecodeError:
             pass
+        raw_response = raw_response.strip()
         
         # Try to extract JSON from markdown code blocks
-        import re
-        json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', raw_response, re.DOTALL)
+        json_match = _JSON_FENCE_RE.search(raw_response) if "```" in raw_response else None
         if json_match:
             try:
-                return json.loads(json_match.group(1))
+                return orjson.loads(json_match.group(1))
             except json.JSONDecodeError:
                 pass
         
-        # Try to find JSON object boundaries
+        # Try to find JSON object boundaries. A reply that is already
+        # brace-delimited was the direct parse above, so don't re-parse it.
         start_idx = raw_response.find('{')
         end_idx = raw_response.rfind('}')
-        if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
+        whole_reply = start_idx == 0 and end_idx == len(raw_response) - 1
+        if start_idx != -1 and end_idx > start_idx and not whole_reply:
             try:
                 json_str = raw_response[start_idx:end_idx + 1]
-                return json.loads(json_str)
+                return orjson.loads(json_str)
             except json.JSONDecodeError:
                 pass
         
@@ -1214,126 +1915,31 @@ class ChatWrapper:
         
         link = link.strip()
         
-        # Basic format validation
-        if not link.startswith(('http://', 'https://')):
+        # Basic format validation; the match also captures the host
+        host_match = _LINK_HOST_RE.match(link)
+        if not host_match:
             return False
         
         # Check for placeholder or invalid URLs
-        invalid_patterns = [
-            'example.com', 'placeholder', 'test.com', 'dummy.com',
-            'bit.ly', 'tinyurl.com', 'short.link', 'goo.gl',
-            'localhost', '127.0.0.1', '0.0.0.0', 'example.org',
-            'test.org', 'dummy.org', 'sample.com', 'demo.com'
-        ]
-        
-        if any(pattern in link.lower() for pattern in invalid_patterns):
+        if _INVALID_LINK_RE.search(link.lower()):
             return False
         
-        # Extract domain from URL
-        try:
-            from urllib.parse import urlparse
-            parsed = urlparse(link)
-            domain = parsed.netloc.lower()
-            
-            # Remove 'www.' prefix if present
-            if domain.startswith('www.'):
-                domain = domain[4:]
-            
-            # More comprehensive and flexible domain validation
-            # Allow common educational, government, and reputable domains
-            trusted_domains = [
-                # Educational institutions
-                '.edu', '.ac.uk', '.ac.jp', '.ac.kr', '.ac.in',
-                # Government domains
-                '.gov', '.gov.uk', '.gov.au', '.gov.ca', '.gov.in',
-                # International organizations
-                '.org', '.int', '.un.org', '.who.int', '.unicef.org',
-                # Major platforms
-                'youtube.com', 'vimeo.com', 'ted.com', 'khanacademy.org',
-                'coursera.org', 'edx.org', 'udemy.com', 'skillshare.com',
-                'codecademy.com', 'freecodecamp.org', 'w3schools.com',
-                'stackoverflow.com', 'github.com', 'gitlab.com',
-                # News and reference
-                'wikipedia.org', 'britannica.com', 'merriam-webster.com',
-                'dictionary.com', 'thesaurus.com', 'oxford.com',
-                # Health and medical
-                'mayoclinic.org', 'healthline.com', 'webmd.com',
-                'medlineplus.gov', 'cdc.gov', 'nih.gov', 'who.int',
-                'clevelandclinic.org', 'hopkinsmedicine.org',
-                # Finance
-                'investopedia.com', 'nerdwallet.com', 'bankrate.com',
-                'mint.com', 'yahoo.com', 'marketwatch.com', 'cnbc.com',
-                'forbes.com', 'bloomberg.com', 'reuters.com',
-                # Fitness and wellness
-                'nike.com', 'adidas.com', 'fitnessblender.com', 'darebee.com',
-                'myfitnesspal.com', 'bodybuilding.com', 'acefitness.org',
-                'verywellfit.com', 'menshealth.com', 'womenshealthmag.com',
-                # Travel
-                'tripadvisor.com', 'booking.com', 'expedia.com', 'airbnb.com',
-                'lonelyplanet.com', 'nationalgeographic.com', 'rome2rio.com',
-                # Personal development
-                'mindtools.com', 'psychologytoday.com', 'hbr.org',
-                'lifehack.org', 'zenhabits.net', 'jamesclear.com',
-                'charlesduhigg.com', 'gretchenrubin.com',
-                # General platforms
-                'medium.com', 'quora.com', 'reddit.com', 'linkedin.com',
-                'twitter.com', 'facebook.com', 'instagram.com',
-                # Technology
-                'mozilla.org', 'w3.org', 'ietf.org', 'apache.org',
-                'python.org', 'nodejs.org', 'reactjs.org', 'vuejs.org',
-                'angular.io', 'typescript.org', 'developer.mozilla.org'
-            ]
-            
-            # Check if domain matches any trusted domain pattern
-            for trusted_domain in trusted_domains:
-                if trusted_domain.startswith('.'):
-                    # TLD or subdomain pattern (e.g., .edu, .gov)
-                    if domain.endswith(trusted_domain):
-                        return True
-                else:
-                    # Exact domain match (e.g., youtube.com)
-                    if domain == trusted_domain or domain.endswith('.' + trusted_domain):
-                        return True
-            
-            # Additional category-specific validation for more targeted domains
-            category_specific_domains = {
-                "learning": [
-                    'udacity.com', 'pluralsight.com', 'lynda.com', 'treehouse.com',
-                    'datacamp.com', 'kaggle.com', 'leetcode.com', 'hackerrank.com',
-                    'codewars.com', 'exercism.io', 'scrimba.com', 'egghead.io'
-                ],
-                "exercise": [
-                    'peloton.com', 'strava.com', 'runtastic.com', 'mapmyrun.com',
-                    'myfitnesspal.com', 'cronometer.com', 'fitbit.com', 'garmin.com'
-                ],
-                "finance": [
-                    'mint.com', 'ynab.com', 'personalcapital.com', 'wealthfront.com',
-                    'betterment.com', 'robinhood.com', 'etrade.com', 'schwab.com'
-                ],
-                "health": [
-                    'myfitnesspal.com', 'cronometer.com', 'loseit.com', 'sparkpeople.com',
-                    'fitbit.com', 'garmin.com', 'apple.com/health', 'google.com/fit'
-                ]
-            }
-            
-            # Check category-specific domains
-            if category in category_specific_domains:
-                for cat_domain in category_specific_domains[category]:
-                    if domain == cat_domain or domain.endswith('.' + cat_domain):
-                        return True
-            
-            # Fallback: If no trusted domain matches, use more permissive validation
-            # Allow any domain that doesn't match invalid patterns and has a reasonable structure
-            if len(domain) > 3 and '.' in domain and not any(bad in domain for bad in ['localhost', '127.0.0.1', 'test', 'dummy', 'example', 'placeholder']):
-                # Additional check: ensure it's not a suspicious domain
-                suspicious_patterns = ['bit.ly', 'tinyurl', 'short.link', 'goo.gl', 't.co']
-                if not any(pattern in domain for pattern in suspicious_patterns):
-                    return True
-            
-            return False
-            
-        except Exception:
-            return False
+        domain = host_match.group(1).lower().removeprefix('www.')
+        labels = tuple(reversed(domain.split('.')))
+        
+        # Trusted TLDs/subdomain patterns, then exact-or-subdomain matches
+        if (_matches_domain(labels, _TRUSTED_LINK_SUFFIXES, subdomains_only=True)
+                or _matches_domain(labels, _TRUSTED_LINK_DOMAINS)):
+            return True
+        
+        # Additional category-specific validation for more targeted domains
+        category_domains = _CATEGORY_LINK_DOMAINS.get(category)
+        if category_domains and _matches_domain(labels, category_domains):
+            return True
+        
+        # Fallback: If no trusted domain matches, use more permissive validation
+        # Allow any domain that doesn't match invalid patterns and has a reasonable structure
+        return len(domain) > 3 and '.' in domain and not _UNTRUSTED_DOMAIN_RE.search(domain)
 
     def _enhance_task_description(self, task_text: str, category: str) -> str:
         """Enhance task description to be more detailed and actionable"""
@@ -1782,96 +2388,8 @@ class ChatWrapper:
         """Build a personalized system prompt based on category and extracted context"""
         intent_type = intent_type or infer_plan_intent(category)
         
-        if refinement_mode:
-            base_prompt = (
-                "You are an expert plan editor for a lifestyle planner app. "
-                "The user has a DRAFT plan and wants specific changes. "
-                "Preserve days, tasks, and structure they did NOT ask to change. "
-                "Apply only the requested refinements while keeping the same totalDays. "
-                "Output a complete updated plan JSON matching the schema. "
-            )
-        else:
-            base_prompt = (
-                "You are an expert intent-aware planner-content generator for a lifestyle planner app. "
-                "Generate structured daily plans with clear titles, concise summaries, and actionable tasks. "
-                f"The resolved execution intent is '{intent_type}'. Match that experience exactly. "
-            )
-        
-        # Category-specific expertise
-        category_expertise = {
-            "learning": (
-                "You are a learning science expert who understands spaced repetition, active recall, "
-                "and progressive skill building. Design learning plans that:\n"
-                "- Start with foundational concepts before advancing\n"
-                "- Include regular review sessions to reinforce retention\n"
-                "- Alternate between theory and practical application\n"
-                "- Build in weekly reflection and consolidation days\n"
-                "- Vary learning activities to maintain engagement\n"
-            ),
-            "exercise": (
-                "You are a certified fitness professional who understands exercise physiology and "
-                "progressive training. Design workout plans that:\n"
-                "- Follow proper periodization (preparation, building, peak, recovery)\n"
-                "- Include appropriate warm-up and cool-down for each session\n"
-                "- Alternate muscle groups and training modalities\n"
-                "- Build in rest days and deload periods\n"
-                "- Progress safely with gradual intensity increases\n"
-                "- Adapt to user's available equipment and limitations\n"
-            ),
-            "travel": (
-                "You are an experienced travel planner who understands logistics and local experiences. "
-                "Design travel itineraries that:\n"
-                "- Treat every generated day as a day of the actual trip unless the user explicitly asks for pre-trip preparation\n"
-                "- Fill each day with a realistic schedule using most of the user's daily time budget "
-                "(typically several hours: sightseeing blocks, meals, transit, and short rest breaks)\n"
-                "- Group activities by geographic proximity to minimize backtracking\n"
-                "- Balance busy exploration days with lighter recovery days\n"
-                "- Name exact venues/areas so Google Places enrichment can attach maps, addresses, coordinates, and ratings\n"
-                "- Include practical logistics in task notes: transport mode and duration, reservation/ticket needs, "
-                "approximate cost, accessibility, and a fallback when it materially helps\n"
-                "- Use realistic chronological HH:MM task times; include arrival/check-in, meals, and transfers when present\n"
-                "- Include buffer time for unexpected discoveries\n"
-                "- Never add quizzes, study drills, generic research homework, packing, or reflection exercises unless explicitly requested\n"
-            ),
-            "finance": (
-                "You are a financial literacy expert who understands budgeting, saving, and investing. "
-                "Design financial plans that:\n"
-                "- Start with assessment and goal-setting\n"
-                "- Build foundational habits before complex strategies\n"
-                "- Include regular tracking and review tasks\n"
-                "- Progress from saving to investing concepts\n"
-                "- Provide actionable, specific financial tasks\n"
-                "- Account for user's financial situation and goals\n"
-            ),
-            "health": (
-                "You are a wellness expert who understands holistic health and sustainable habits. "
-                "Design health plans that:\n"
-                "- Address multiple dimensions (physical, mental, nutritional)\n"
-                "- Build sustainable habits over quick fixes\n"
-                "- Include regular self-assessment checkpoints\n"
-                "- Balance action items with rest and recovery\n"
-                "- Provide evidence-based recommendations\n"
-                "- Adapt to user's health conditions and preferences\n"
-            ),
-            "personal_development": (
-                "You are a personal development coach who understands behavior change and growth. "
-                "Design development plans that:\n"
-                "- Start with self-reflection and goal clarity\n"
-                "- Build habits using proven frameworks (habit stacking, tiny habits)\n"
-                "- Include journaling and reflection prompts\n"
-                "- Progress from awareness to action to mastery\n"
-                "- Balance challenge with achievability\n"
-                "- Incorporate accountability mechanisms\n"
-            ),
-            "other": (
-                "You are a versatile planning expert who can adapt to any domain. "
-                "Design plans that:\n"
-                "- Analyze the user's specific needs carefully\n"
-                "- Create logical progression from start to goal\n"
-                "- Include variety and engagement\n"
-                "- Build in reflection and adjustment points\n"
-            )
-        }
+        if extracted_context is None:
+            return _default_system_prompt(category, intent_type, refinement_mode)
         
         # Add personalization based on extracted context
         personalization_rules = []
@@ -2094,64 +2612,7 @@ class ChatWrapper:
                 "\n=== END PERSONALIZATION ===\n"
             )
         
-        rules = """
-GENERATION RULES:
-1) Keep each day practical (2-4 tasks tailored to the user's context)
-2) Add brief tips that are relevant to the user's situation
-3) Titles should be short, motivating, and reflect the day's focus
-4) Never invent unsafe or extreme advice; prefer safe defaults
-5) CRITICAL: Output MUST be valid JSON matching the exact schema provided
-6) Include ALL required fields: planName, category, totalDays, currency, totalBudget, createdAt, days, summary, tags, difficultyLevel, estimatedCompletionRate
-7) ABSOLUTE REQUIREMENT: The 'days' array MUST contain EXACTLY the number of days specified in totalDays
-8) TIME ALLOCATION: If minutesPerDay is specified, allocate time based on task complexity (±20% flexibility)
-9) DAY NUMBERING: dayNumber must start from 1 and increment sequentially
-10) DETAILED TASKS: Each task MUST include comprehensive, actionable instructions
-11) INTENT FIRST: Do not force every plan into learning, practice, habit-building, reflection, or quiz form.
-    Use itinerary stops for trips, sessions for workouts, deliverables for projects, logistics for events,
-    transactions/checks for finance, and lessons/exercises only for true learning plans.
-12) QUIZZES: Planner content never contains quiz-like questions unless the resolved intent is learning and
-    the user would genuinely benefit from recall. Travel, exercise, event, project, finance, and routine plans
-    must not contain quizzes.
-13) UNIVERSAL BUDGET: Every task in every intent carries `estimatedCost` in the single plan currency.
-    Use 0 for free activities. This includes meetings, events, projects, workouts, learning, errands, and travel.
-    For event/meeting plans, include relevant venue, AV, catering, material, transport, and service costs.
-
-PLAN SUMMARY REQUIREMENTS (REQUIRED):
-You MUST include a comprehensive 'summary' object with these fields:
-- overview: 2-3 sentence overview of the entire plan and its approach
-- targetAudience: Who this plan is ideal for (e.g., "Beginners with no prior experience" or "Intermediate learners looking to advance")
-- expectedOutcomes: List of 3-5 specific outcomes users can expect to achieve
-- keyMilestones: List of 3-5 major milestones throughout the plan (e.g., "Week 1: Master fundamentals", "Week 2: Build first project")
-- difficultyProgression: How difficulty evolves (e.g., "Starts easy, gradually increases to intermediate level by week 3")
-- totalEstimatedHours: Calculate total hours based on daily time allocation and number of days
-- prerequisites: List any prerequisites (or null if none required)
-- tipsForSuccess: 3-5 actionable tips for users to maximize success
-- weeklyFocus: Brief description of each week's main focus area
-
-Also include:
-- tags: 5-8 relevant tags for categorization (e.g., ["python", "programming", "beginner", "30-day", "coding"])
-- difficultyLevel: Overall difficulty ("beginner", "intermediate", "advanced", or "mixed")
-- estimatedCompletionRate: Realistic completion expectation (e.g., "85% with consistent daily practice")
-
-TASK QUALITY REQUIREMENTS:
-✓ Provide specific, actionable steps personalized to the user
-✓ Include relevant tips, techniques, or methods
-✓ Give clear success criteria or what to expect
-✓ Include safety considerations where applicable
-✓ Make tasks self-contained and complete
-✓ Use the 'note' field for additional helpful details
-✓ Reference user's goals, equipment, and preferences when relevant
-
-TASK EXAMPLES:
-✅ GOOD: 'Practice Python variables: Create 5 different variable types (string, integer, float, boolean, list). Write a simple program that uses each type and prints the results. Focus on proper naming conventions and data type understanding.'
-✅ GOOD: 'Morning cardio workout: Do 20 minutes of moderate-intensity exercise (brisk walking, jogging, or cycling). Start with 5-minute warm-up, maintain steady pace for 15 minutes, finish with 5-minute cool-down.'
-✅ GOOD TRAVEL: '09:00 — Wat Mahathat: explore the central ruins for 75 minutes; arrive by tuk-tuk from the hotel (15 minutes). Note ticket requirements and keep the official place name for Maps.'
-❌ BAD: 'Learn Python' (too vague)
-❌ BAD: 'Do some exercise' (not specific enough)
-❌ BAD TRAVEL: 'Research the destination and take a quiz about local culture' (this is not an itinerary)
-"""
-        
-        return base_prompt + category_expertise.get(category, category_expertise["other"]) + personalization_section + rules
+        return _system_prompt_head(category, intent_type, refinement_mode) + personalization_section + _GENERATION_RULES
 
     def _generate_chunk_worker(
         self,
@@ -2196,18 +2657,17 @@ TASK EXAMPLES:
                     extracted_context=extracted_context,
                     plan_outline=plan_outline,
                     progress_callback=progress_callback,
+                    stream_progress=False,  # generate_chunked reports per phase
                 )
                 
-                # Adjust day numbers
-                for day in chunk_content.days:
-                    day.dayNumber = chunk.start_day + (day.dayNumber - 1)
-                
+                # Day numbers stay chunk-local; generate_chunked renumbers
+                # the merged list in one pass
                 return (chunk_idx, chunk_content, None)
                 
             except Exception as e:
                 if retry == max_retries:
                     return (chunk_idx, None, f"Failed chunk {chunk_idx} ({chunk.phase_name}): {str(e)}")
-                time.sleep(0.5)
+                time.sleep(_retry_delay(retry, e, base=0.5))
         
         return (chunk_idx, None, f"Failed chunk {chunk_idx} after retries")
 
@@ -2296,44 +2756,41 @@ TASK EXAMPLES:
             stages_completed=3,
         )
         
-        # PARALLEL GENERATION using ThreadPoolExecutor
+        # PARALLEL GENERATION on the shared, bounded chunk pool
         results = {}
         errors = []
         
-        # Use max 4 workers to avoid rate limits, but process chunks in parallel
-        max_workers = min(len(chunks), 4)
-        print(f"Starting parallel generation with {max_workers} workers...")
+        print(f"Starting parallel generation of {len(chunks)} chunks...")
         
         parallel_start = time.time()
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all chunks for parallel processing
-            future_to_chunk = {
-                executor.submit(self._generate_chunk_worker, info): info[0]
-                for info in chunk_infos
-            }
-            
-            # Collect results as they complete
-            for future in concurrent.futures.as_completed(future_to_chunk):
-                chunk_idx = future_to_chunk[future]
-                try:
-                    idx, content, error = future.result()
-                    if error:
-                        errors.append(error)
-                        print(f"Chunk {idx} failed: {error}")
-                    else:
-                        results[idx] = content
-                        print(f"Chunk {idx} completed successfully")
-                        done_chunks = len(results)
-                        pct = 35 + int((done_chunks / len(chunks)) * 50)
-                        self._emit_progress(
-                            progress_callback,
-                            progress=min(pct, 85),
-                            progress_message=f"Completed phase {done_chunks} of {len(chunks)}...",
-                            current_stage="generating_days",
-                        )
-                except Exception as e:
-                    errors.append(f"Chunk {chunk_idx} exception: {str(e)}")
+        # Submit all chunks for parallel processing
+        future_to_chunk = {
+            _CHUNK_EXECUTOR.submit(self._generate_chunk_worker, info): info[0]
+            for info in chunk_infos
+        }
         
+        # Collect results as they complete
+        for future in concurrent.futures.as_completed(future_to_chunk):
+            chunk_idx = future_to_chunk[future]
+            try:
+                idx, content, error = future.result()
+                if error:
+                    errors.append(error)
+                    print(f"Chunk {idx} failed: {error}")
+                else:
+                    results[idx] = content
+                    print(f"Chunk {idx} completed successfully")
+                    done_chunks = len(results)
+                    pct = 35 + int((done_chunks / len(chunks)) * 50)
+                    self._emit_progress(
+                        progress_callback,
+                        progress=min(pct, 85),
+                        progress_message=f"Completed phase {done_chunks} of {len(chunks)}...",
+                        current_stage="generating_days",
+                    )
+            except Exception as e:
+                errors.append(f"Chunk {chunk_idx} exception: {str(e)}")
+    
         parallel_time = time.time() - parallel_start
         print(f"Parallel generation completed in {parallel_time:.2f}s")
         
@@ -2380,14 +2837,13 @@ TASK EXAMPLES:
                 f"Could not generate the complete {req.totalDays}-day plan. Please try again."
             )
         
-        # Validate and fix day numbering
-        for i, day in enumerate(all_days):
-            expected_day_num = i + 1
-            if day.dayNumber != expected_day_num:
-                day.dayNumber = expected_day_num
+        # Number days across chunks in place (DayPlans are already validated)
+        for day_number, day in enumerate(all_days, start=1):
+            day.dayNumber = day_number
         
         # Create the final content with merged summary data
-        final_content = PlannerContent(
+        # Every part below is already validated (request fields, chunk DayPlans)
+        final_content = PlannerContent.from_trusted(
             planName=req.planName,
             category=req.category,
             intentType=infer_plan_intent(req.category, req.planName, req.detailPrompt),
@@ -2396,7 +2852,7 @@ TASK EXAMPLES:
             currency=req.currency,
             coverImage=None,
             coverImageUrl=None,
-            createdAt={"seconds": now_s, "nanoseconds": 0},
+            createdAt=TimeStamp(seconds=now_s, nanoseconds=0),
             days=all_days,
             summary=first_summary,
             tags=list(all_tags) if all_tags else None,
@@ -2539,11 +2995,11 @@ TASK EXAMPLES:
     ) -> str:
         """Serialize compact draft for refinement; shrink if needed."""
         compact = self._compact_plan_snapshot(content, day_start, day_end, aggressive=False)
-        payload = json.dumps(compact, ensure_ascii=False)
+        payload = orjson.dumps(compact).decode()
         if len(payload) <= max_chars:
             return payload
         compact = self._compact_plan_snapshot(content, day_start, day_end, aggressive=True)
-        payload = json.dumps(compact, ensure_ascii=False)
+        payload = orjson.dumps(compact).decode()
         if len(payload) <= max_chars:
             return payload
         return payload[: max_chars - 24] + "\n/* draft truncated */"
@@ -2621,10 +3077,10 @@ TASK EXAMPLES:
             for d in slice_content.days:
                 target_num = start + (d.dayNumber - 1)
                 d.dayNumber = target_num
-                d.id = d.id or uuid.uuid4().hex[:8]
+                d.id = d.id or _new_id()
                 day_by_num[target_num] = d
             merged_days = [day_by_num[i] for i in range(1, existing.totalDays + 1) if i in day_by_num]
-            result = PlannerContent(
+            result = PlannerContent.from_trusted(
                 planName=existing.planName,
                 category=existing.category,
                 intentType=existing.intentType or infer_plan_intent(
@@ -2652,14 +3108,13 @@ TASK EXAMPLES:
             )
             result.createdAt = created_at
             # Full refine rebuilds from scratch — keep the existing cover
-            # (mirrors the partial branch, which carries it via PlannerContent()).
+            # (mirrors the partial branch, which carries it via from_trusted()).
             result.coverImage = existing.coverImage
             result.coverImageUrl = existing.coverImageUrl
             result.currency = existing.currency
-            result = PlannerContent.model_validate(result.model_dump())
 
-        # Enrich only tasks the refinement touched (existing video/place survive
-        # PlannerContent.model_validate above because the fields live on Task).
+        # Enrich only tasks the refinement touched (existing video/place are
+        # carried on the Task instances, so they survive the merge above).
         result = self._maybe_enrich(result, gen_req, progress_callback, skip_existing=True)
 
         self._emit_progress(
@@ -2690,6 +3145,18 @@ TASK EXAMPLES:
             content = self.generate_single(req, progress_callback=progress_callback)
         return self._maybe_enrich(content, req, progress_callback)
 
+    async def agenerate(
+        self,
+        req: GeneratePlannerRequest,
+        progress_callback: Optional[ProgressCallback] = None,
+    ) -> PlannerContent:
+        """Awaitable generate() for async servers.
+
+        Generation runs in a worker thread so the event loop keeps serving
+        other requests while this one waits on OpenAI.
+        """
+        return await asyncio.to_thread(self.generate, req, progress_callback)
+
     def _maybe_enrich(
         self,
         content: PlannerContent,
@@ -2716,6 +3183,7 @@ TASK EXAMPLES:
         progress_callback: Optional[ProgressCallback] = None,
         plan_outline: Optional[PlanOutline] = None,
         is_refinement: bool = False,
+        stream_progress: bool = True,
     ) -> PlannerContent:
         """
         Generate planner content with optional pre-extracted context.
@@ -2723,6 +3191,8 @@ TASK EXAMPLES:
         Args:
             req: The generation request
             extracted_context: Pre-extracted context (if None, will extract from detailPrompt)
+            stream_progress: Stream the completion and report per-day progress
+                (only when a progress_callback is given)
         """
         now_s = int(time.time())
         
@@ -2775,10 +3245,12 @@ TASK EXAMPLES:
             stages_completed=3,
         )
         
+        # Resolved once; the payload, both prompts and the result all use it
+        intent_type = infer_plan_intent(req.category, req.planName, req.detailPrompt)
         payload = {
             "planName": req.planName,
             "category": req.category,
-            "intentType": infer_plan_intent(req.category, req.planName, req.detailPrompt),
+            "intentType": intent_type,
             "totalDays": req.totalDays,
             "minutesPerDay": req.minutesPerDay,
             "intensity": req.intensity,
@@ -2789,175 +3261,11 @@ TASK EXAMPLES:
             "unix_now": now_s
         }
 
-        # Build the json schema for the exact PlannerContent shape with summary fields
-        schema = self.config.json_schema or {
-            "name": "planner_content",
-            "schema": {
-                "type": "object",
-                "additionalProperties": False,
-                "properties": {
-                    "planName": {"type": "string"},
-                    "category": {"type": "string"},
-                    "intentType": {
-                        "type": ["string", "null"],
-                        "enum": [*PLAN_INTENT_TYPES, None],
-                        "description": "Resolved execution intent; controls how the plan should behave in the app",
-                    },
-                    "totalDays": {"type": "integer", "minimum": 1, "maximum": 90},
-                    "minutesPerDay": {"type": ["integer", "null"], "minimum": 10, "maximum": 480},
-                    "currency": {
-                        "type": "string",
-                        "minLength": 3,
-                        "maxLength": 3,
-                        "description": "One ISO 4217 currency code for all activity estimates",
-                    },
-                    "totalBudget": {
-                        "type": "number",
-                        "minimum": 0,
-                        "description": "Sum of activity estimatedCost values; server recalculates this value",
-                    },
-                    "coverImage": {"type": ["string", "null"]},
-                    "coverImageUrl": {"type": ["string", "null"]},
-                    "createdAt": {
-                        "type": "object",
-                        "additionalProperties": False,
-                        "properties": {
-                            "seconds": {"type": "integer"},
-                            "nanoseconds": {"type": "integer", "minimum": 0, "maximum": 999999999}
-                        },
-                        "required": ["seconds", "nanoseconds"]
-                    },
-                    # New summary fields
-                    "summary": {
-                        "type": ["object", "null"],
-                        "additionalProperties": False,
-                        "properties": {
-                            "overview": {"type": ["string", "null"], "description": "Brief overview of the plan (2-3 sentences)"},
-                            #"targetAudience": {"type": ["string", "null"], "description": "Who this plan is best suited for"},
-                            #"expectedOutcomes": {"type": ["array", "null"], "items": {"type": "string"}, "description": "3-5 expected outcomes"},
-                            "keyMilestones": {"type": ["array", "null"], "items": {"type": "string"}, "description": "3-5 key milestones"},
-                            #"difficultyProgression": {"type": ["string", "null"], "description": "How difficulty changes"},
-                            #"totalEstimatedHours": {"type": ["number", "null"], "description": "Total hours to complete"},
-                            #"prerequisites": {"type": ["array", "null"], "items": {"type": "string"}, "description": "Prerequisites if any"},
-                            "tipsForSuccess": {"type": ["array", "null"], "items": {"type": "string"}, "description": "3-5 tips for success"},
-                            "weeklyFocus": {"type": ["array", "null"], "items": {"type": "string"}, "description": "Focus for each week"}
-                        },
-                        "required": ["overview", "keyMilestones", "tipsForSuccess", "weeklyFocus"]
-                    },
-                    "tags": {"type": ["array", "null"], "items": {"type": "string"}, "description": "Relevant tags for the plan"},
-                    "difficultyLevel": {"type": ["string", "null"], "enum": ["beginner", "intermediate", "advanced", "mixed", None], "description": "Overall difficulty"},
-                    "estimatedCompletionRate": {"type": ["string", "null"], "description": "Expected completion rate"},
-                    "days": {
-                        "type": "array",
-                        "minItems": 1,
-                        "maxItems": 90,
-                        "items": {
-                            "type": "object",
-                            "additionalProperties": False,
-                            "properties": {
-                                "id": {"type": "string"},
-                                "dayNumber": {"type": "integer", "minimum": 1},
-                                "title": {"type": "string"},
-                                "summary": {"type": "string"},
-                                "tasks": {
-                                    "type": "array",
-                                    "minItems": 1,
-                                    "items": {
-                                        "type": "object",
-                                        "additionalProperties": False,
-                                        "properties": {
-                                            "id": {"type": "string"},
-                                            "text": {"type": "string"},
-                                            "done": {"type": "boolean"},
-                                            "duration_min": {"type": ["integer", "null"], "minimum": 0, "maximum": 600},
-                                            "estimatedCost": {
-                                                "type": "number",
-                                                "minimum": 0,
-                                                "maximum": 1000000000,
-                                                "description": "Realistic activity estimate in plan currency; 0 if free",
-                                            },
-                                            "time": {"type": ["string", "null"], "description": "HH:MM start time — REQUIRED for travel itinerary days, chronological"},
-                                            "note": {"type": ["string", "null"]},
-                                            "link": {"type": "string"},
-                                        },
-                                        "required": ["id", "text", "done", "estimatedCost", "link"]
-                                    }
-                                },
-                                "tips": {"type": ["string", "array", "null"], "items": {"type": "string"}},
-                                "flashcards": {
-                                    "type": ["array", "null"],
-                                    "maxItems": 6,
-                                    "description": "Learning plans only: 3-6 study cards for the day's key facts/vocab",
-                                    "items": {
-                                        "type": "object",
-                                        "additionalProperties": False,
-                                        "properties": {
-                                            "front": {"type": "string", "description": "Prompt/term (short)"},
-                                            "back": {"type": "string", "description": "Answer/meaning"}
-                                        },
-                                        "required": ["front", "back"]
-                                    }
-                                }
-                            },
-                            "required": ["id", "dayNumber", "title", "summary", "tasks"]
-                        }
-                    }
-                },
-                "required": ["planName", "category", "totalDays", "currency", "totalBudget", "createdAt", "days", "summary", "tags", "difficultyLevel", "estimatedCompletionRate"]
-            }
-        }
-
-        # Assistant guidance for per-category specifics (few-shot style brief)
-        category_hints = {
-            "learning": (
-                "User goal: skill acquisition and knowledge development. Include variety: active practice, "
-                "review/repetition, application exercises, and reflection. Build progressively from basics "
-                "to advanced concepts. Include weekly review days with lighter cognitive load. "
-                "Adapt to user's specified learning domain (language, coding, music, etc.). "
-                "EVERY day MUST include 3-6 `flashcards` capturing that day's key facts, vocabulary, or "
-                "concepts (front = term/prompt, back = answer/meaning, in the plan's language) — the app "
-                "renders them as tap-to-flip study cards, and review days should reuse earlier cards' topics "
-                "with new phrasing for spaced repetition."
-            ),
-            "exercise": (
-                "User goal: physical fitness and health. Rotate training focus (strength, cardio, flexibility, mobility), "
-                "include proper warm-ups and cool-downs. At least one full rest day per week; incorporate deload weeks. "
-                "Progressive overload with safe form cues. Scale exercises for different fitness levels. "
-                "Balance intensity across the week."
-            ),
-            "travel": (
-                "User goal: trip planning and itinerary. Group activities by geographic proximity and themes. "
-                "Include practical logistics (transport modes, time estimates, booking tips). "
-                "Provide budget estimates per activity. Alternate high-intensity sightseeing days with relaxed exploration. "
-                "Include contingency plans and local cultural tips. "
-                "EVERY task MUST carry a realistic `time` (HH:MM, chronological through the day) and NAME the "
-                "specific venue/area in its text (e.g. 'Wat Mahathat, Ayutthaya old town') — the app renders "
-                "each day as a visual timeline and attaches real map data to named places."
-            ),
-            "finance": (
-                "User goal: financial management and literacy. Cover budgeting, tracking expenses, saving strategies, "
-                "investment basics, and debt management. Include actionable review tasks (e.g., audit subscriptions, "
-                "track weekly spending). Build from foundational concepts to advanced planning. "
-                "Weekly reflection on progress and adjustments."
-            ),
-            "health": (
-                "User goal: holistic wellness and healthy habits. Include nutrition planning, sleep hygiene, "
-                "stress management, hydration tracking, and mental health practices. "
-                "Provide evidence-based, sustainable habit formation. Balance physical and mental wellness tasks. "
-                "Include weekly self-assessment and adjustment days."
-            ),
-            "personal_development": (
-                "User goal: self-improvement and growth. Cover goal setting, productivity habits, mindfulness, "
-                "relationship skills, time management, and self-reflection practices. "
-                "Include journaling prompts, actionable exercises, and progress tracking. "
-                "Build awareness before action; emphasize consistency over intensity."
-            ),
-            "other": (
-                "User goal: custom plan based on user's specific needs. Analyze the user's detailPrompt carefully "
-                "and structure the plan with logical progression, variety, and practical actionable tasks. "
-                "Include appropriate rest/reflection days and balance intensity throughout the period."
-            )
-        }
+        response_format = (
+            {"type": "json_schema", "json_schema": self.config.json_schema}
+            if self.config.json_schema
+            else _PLANNER_RESPONSE_FORMAT
+        )
 
         # Language requirement (brief)
         lang_note = "Write in Thai." if req.language == "th" else "Write in English."
@@ -2966,7 +3274,7 @@ TASK EXAMPLES:
         user_msg_parts = [
             lang_note,
             f"Category: {req.category}",
-            f"Execution intent: {infer_plan_intent(req.category, req.planName, req.detailPrompt)}",
+            f"Execution intent: {intent_type}",
             f"Plan name: {req.planName}",
             f"Total days: {req.totalDays}",
         ]
@@ -3084,7 +3392,7 @@ TASK EXAMPLES:
         # Add category hints
         user_msg_parts.extend([
             "",
-            category_hints.get(req.category, category_hints["other"]),
+            _CATEGORY_HINTS.get(req.category, _CATEGORY_HINTS["other"]),
             "",
             "BUDGETS APPLY TO EVERY PLAN TYPE — not only travel. For every task in a trip, "
             "event, meeting, conference, workout, learning plan, project, routine, errand, or "
@@ -3117,28 +3425,51 @@ TASK EXAMPLES:
             req.category,
             extracted_context,
             refinement_mode=is_refinement,
-            intent_type=infer_plan_intent(req.category, req.planName, req.detailPrompt),
+            intent_type=intent_type,
         )
         
         # Response format with JSON schema enforcement
+        request_params = {
+            "model": use_model,  # Uses fast_model or model based on fastMode
+            "temperature": use_temperature,
+            "messages": [{
+                "role": "system",
+                "content": system_prompt
+            }, {
+                "role": "user",
+                "content": user_msg
+            }],
+            "response_format": response_format,
+        }
+        use_stream = stream_progress and progress_callback is not None
         max_retries = 2
-        for attempt in range(max_retries + 1):
+
+        # Identical prompts (same model, messages and schema) replay a recent
+        # completion instead of another OpenAI round-trip. Refinements always
+        # call the model.
+        completion_key = None
+        raw = None
+        if not is_refinement and not os.getenv("PLANNER_RESPONSE_CACHE_DISABLED"):
+            completion_key = _completion_cache_key(request_params)
+            with _completion_cache_lock:
+                packed = _completion_cache.get(completion_key)
+            if packed is not None:
+                raw = zlib.decompress(packed).decode()
+                print("Reusing cached completion for an identical prompt")
+        replayed = raw is not None
+
+        for attempt in range(0 if replayed else max_retries + 1):
             try:
-                response = get_openai_client().chat.completions.create(
-                    model=use_model,  # Uses fast_model or model based on fastMode
-                    temperature=use_temperature,
-                    messages=[{
-                        "role": "system",
-                        "content": system_prompt
-                    }, {
-                        "role": "user",
-                        "content": user_msg
-                    }],
-                    response_format={
-                        "type": "json_schema",
-                        "json_schema": schema
-                    }
-                )
+                if use_stream:
+                    try:
+                        raw = self._stream_completion(request_params, req.totalDays, progress_callback)
+                        break
+                    except Exception as stream_error:
+                        # Fall back to a plain request for this and later attempts
+                        print(f"Streaming failed, retrying without stream: {stream_error}")
+                        use_stream = False
+                response = get_openai_client().chat.completions.create(**request_params)
+                raw = response.choices[0].message.content if response.choices else None
                 break  # Success, exit retry loop
             except Exception as e:
                 if attempt == max_retries:
@@ -3166,23 +3497,23 @@ TASK EXAMPLES:
                         )
                 else:
                     # Wait before retry
-                    time.sleep(1)
+                    time.sleep(_retry_delay(attempt, e))
 
         # Extract JSON
+        debug = logger.isEnabledFor(logging.DEBUG)
         try:
-            if not response.choices or not response.choices[0].message.content:
+            if not raw:
                 self._handle_generation_failure(req, "Empty response from OpenAI API")
             else:
-                raw = response.choices[0].message.content
-                print(f"DEBUG: Raw AI response: {raw[:500]}...")  # Log first 500 chars
+                logger.debug("Raw AI response: %.500s...", raw)
                 
                 # Try to clean and parse the JSON response
                 data = self._parse_json_response(raw)
                 
                 if not isinstance(data, dict):
                     self._handle_generation_failure(req, f"Invalid response type: {type(data)}")
-                else:
-                    print(f"DEBUG: Parsed data keys: {list(data.keys())}")  # Log available keys
+                elif debug:
+                    logger.debug("Parsed data keys: %s", list(data))
                     
         except json.JSONDecodeError as e:
             print(f"DEBUG: JSON decode error: {e}")
@@ -3193,66 +3524,79 @@ TASK EXAMPLES:
             print(f"DEBUG: Raw response: {raw}")
             self._handle_generation_failure(req, f"Response parsing error: {str(e)}")
 
-        # Fill in createdAt if model left null, and ensure ids
+        # Server clock owns createdAt (whatever the model echoed is replaced);
+        # a ready TimeStamp instance passes validation without a nested pass.
+        # Also ensure ids below.
         try:
-            seconds = payload["unix_now"]
-            data.setdefault("createdAt", {"seconds": seconds, "nanoseconds": 0})
+            data["createdAt"] = TimeStamp(seconds=payload["unix_now"], nanoseconds=0)
             
             # Ensure minutesPerDay is included in response from request
             if "minutesPerDay" not in data and req.minutesPerDay is not None:
                 data["minutesPerDay"] = req.minutesPerDay
             
-            if "days" not in data or not isinstance(data.get("days"), list):
+            days = data.get("days")
+            if not isinstance(days, list):
                 available_keys = list(data.keys()) if isinstance(data, dict) else "not a dict"
                 print(f"Warning: AI response missing 'days' field. Available keys: {available_keys}")
                 self._handle_generation_failure(req, f"Missing 'days' field in AI response. Available keys: {available_keys}")
             
-            current_days = len(data.get("days", []))
+            current_days = len(days)
             if current_days != req.totalDays:
                 # Day count mismatch - this should not happen with proper AI generation
                 self._handle_generation_failure(req, f"Day count mismatch: generated {current_days} days instead of {req.totalDays}")
             
             # No need to check for duplicate links since we're not using external links
             
-            for i, d in enumerate(data.get("days", []), start=1):
+            # Single pass over days/tasks; hot names bound to locals up front.
+            minutes_per_day = req.minutesPerDay
+            category = req.category
+            enhance = self._enhance_task_description
+            new_id = _new_id
+            plan_cost = 0.0
+            for i, d in enumerate(days, start=1):
                 if not isinstance(d, dict):
                     raise PlannerGenerationError(
                         f"Invalid day format at index {i}",
                         "The generated plan has invalid day data. Please try again."
                     )
-                d.setdefault("id", uuid.uuid4().hex[:8])
+                # Replayed completions get fresh ids so plans never share them
+                if replayed or "id" not in d:
+                    d["id"] = new_id()
                 # Ensure dayNumber is correct and sequential
-                expected_day_num = i
-                if d.get("dayNumber") != expected_day_num:
-                    print(f"Warning: Day {i} has incorrect dayNumber {d.get('dayNumber')}, correcting to {expected_day_num}")
-                    d["dayNumber"] = expected_day_num
-                else:
-                    d.setdefault("dayNumber", expected_day_num)
+                if d.get("dayNumber") != i:
+                    print(f"Warning: Day {i} has incorrect dayNumber {d.get('dayNumber')}, correcting to {i}")
+                    d["dayNumber"] = i
                 
                 # Convert tips from list to string if needed
-                if "tips" in d and isinstance(d["tips"], list):
-                    d["tips"] = '\n• '.join(d["tips"]) if d["tips"] else None
+                tips = d.get("tips")
+                if isinstance(tips, list):
+                    d["tips"] = '\n• '.join(tips) if tips else None
                 
-                if "tasks" not in d or not isinstance(d.get("tasks"), list):
+                tasks = d.get("tasks")
+                if not isinstance(tasks, list):
                     raise PlannerGenerationError(
                         f"Missing or invalid tasks for day {i}",
                         f"Day {i} is missing task information. Please try again."
                     )
                 
-                if len(d.get("tasks", [])) == 0:
+                if not tasks:
                     raise PlannerGenerationError(
                         f"No tasks generated for day {i}",
                         f"Day {i} has no tasks. Please try again."
                     )
                 
-                for t in d.get("tasks", []):
+                total_duration = 0
+                tasks_without_duration = []
+                for t in tasks:
                     if not isinstance(t, dict):
                         raise PlannerGenerationError(
                             f"Invalid task format on day {i}",
                             f"Day {i} has invalid task data. Please try again."
                         )
-                    t.setdefault("id", uuid.uuid4().hex[:8])
-                    t.setdefault("done", False)
+                    if replayed or "id" not in t:
+                        t["id"] = new_id()
+                    if "done" not in t:
+                        t["done"] = False
                     
                     # Set link field to None since we're not using external links
                     t["link"] = None
@@ -3260,60 +3604,57 @@ TASK EXAMPLES:
                     # Budget is universal across plan intents. Keep bad model
                     # values from breaking totals; free activities are 0.
                     try:
-                        estimated_cost = float(t.get("estimatedCost", 0) or 0)
-                        t["estimatedCost"] = round(max(0, estimated_cost), 2)
+                        estimated_cost = round(max(0, float(t.get("estimatedCost", 0) or 0)), 2)
                     except (TypeError, ValueError):
-                        t["estimatedCost"] = 0
+                        estimated_cost = 0
+                    t["estimatedCost"] = estimated_cost
+                    plan_cost += estimated_cost
                     
                     # Validate task text quality - ensure it's detailed and actionable
                     task_text = t.get("text", "")
                     if not task_text or len(task_text.strip()) < 20:
                         # If task is too short or vague, provide a more detailed version
-                        t["text"] = self._enhance_task_description(task_text, req.category)
+                        t["text"] = enhance(task_text, category)
+
+                    duration = t.get("duration_min")
+                    if duration is None:
+                        tasks_without_duration.append(t)
+                    else:
+                        total_duration += duration
                 
                 # Validate and fill in missing durations - flexible approach
-                if req.minutesPerDay:
-                    total_duration = 0
-                    tasks_without_duration = []
-                    
-                    for j, task in enumerate(d.get("tasks", [])):
-                        if task.get("duration_min") is None:
-                            tasks_without_duration.append(j + 1)
-                        else:
-                            total_duration += task["duration_min"]
-                    
+                if minutes_per_day:
                     # Only auto-assign durations to tasks that are missing them
                     # Use a flexible estimate based on remaining time and task count
                     if tasks_without_duration:
                         # Calculate reasonable average duration based on remaining time
                         # Use minutesPerDay as a rough guide, but don't force exact matching
-                        remaining_minutes = max(0, req.minutesPerDay - total_duration)
+                        remaining_minutes = max(0, minutes_per_day - total_duration)
                         tasks_needing_duration = len(tasks_without_duration)
                         
-                        if tasks_needing_duration > 0:
-                            if remaining_minutes > 0:
-                                # Distribute remaining time proportionally
-                                avg_duration = max(5, remaining_minutes // tasks_needing_duration)  # At least 5 min per task
-                                remainder = remaining_minutes % tasks_needing_duration
-                                
-                                for idx, task_idx in enumerate(tasks_without_duration):
-                                    duration = avg_duration + (1 if idx < remainder else 0)
-                                    d["tasks"][task_idx - 1]["duration_min"] = duration
-                            else:
-                                # If we've exceeded the guideline, give minimum durations to tasks without them
-                                for task_idx in tasks_without_duration:
-                                    d["tasks"][task_idx - 1]["duration_min"] = 5  # Minimum 5 minutes
+                        if remaining_minutes > 0:
+                            # Distribute remaining time proportionally
+                            avg_duration = max(5, remaining_minutes // tasks_needing_duration)  # At least 5 min per task
+                            remainder = remaining_minutes % tasks_needing_duration
                             
-                            print(f"Info: Day {i} had {len(tasks_without_duration)} task(s) without duration. Assigned reasonable durations.")
+                            for idx, task in enumerate(tasks_without_duration):
+                                task["duration_min"] = avg_duration + (1 if idx < remainder else 0)
+                                total_duration += task["duration_min"]
+                        else:
+                            # If we've exceeded the guideline, give minimum durations to tasks without them
+                            for task in tasks_without_duration:
+                                task["duration_min"] = 5  # Minimum 5 minutes
+                            total_duration += 5 * tasks_needing_duration
+                        
+                        print(f"Info: Day {i} had {tasks_needing_duration} task(s) without duration. Assigned reasonable durations.")
                     
-                    # Calculate final total for logging only - don't force adjustment
-                    final_total = sum(task.get("duration_min", 0) for task in d.get("tasks", []))
-                    if final_total != req.minutesPerDay:
-                        variance_percent = abs(final_total - req.minutesPerDay) / req.minutesPerDay * 100
+                    # Final total is for logging only - don't force adjustment
+                    if total_duration != minutes_per_day:
+                        variance_percent = abs(total_duration - minutes_per_day) / minutes_per_day * 100
                         if variance_percent <= 20:
-                            print(f"Info: Day {i} total duration is {final_total} minutes (target: {req.minutesPerDay}, variance: {variance_percent:.1f}%) - acceptable flexibility.")
+                            print(f"Info: Day {i} total duration is {total_duration} minutes (target: {minutes_per_day}, variance: {variance_percent:.1f}%) - acceptable flexibility.")
                         else:
-                            print(f"Note: Day {i} total duration is {final_total} minutes (target: {req.minutesPerDay}, variance: {variance_percent:.1f}%) - prioritizing task-appropriate durations over exact matching.")
+                            print(f"Note: Day {i} total duration is {total_duration} minutes (target: {minutes_per_day}, variance: {variance_percent:.1f}%) - prioritizing task-appropriate durations over exact matching.")
         
         except PlannerGenerationError:
             raise  # Re-raise our custom errors
@@ -3326,7 +3667,8 @@ TASK EXAMPLES:
         # Ensure summary fields are properly structured
         if "summary" in data and isinstance(data["summary"], dict):
             # Convert summary dict to PlannerSummary if needed
-            print(f"DEBUG: Summary data found: {list(data['summary'].keys())}")
+            if debug:
+                logger.debug("Summary data found: %s", list(data["summary"]))
         else:
             # Set default empty summary if not present
             data.setdefault("summary", None)
@@ -3336,25 +3678,24 @@ TASK EXAMPLES:
         data.setdefault("difficultyLevel", None)
         data.setdefault("estimatedCompletionRate", None)
         data["currency"] = req.currency
-        data["totalBudget"] = round(
-            sum(
-                float(task.get("estimatedCost", 0) or 0)
-                for day in data.get("days", [])
-                for task in day.get("tasks", [])
-            ),
-            2,
-        )
+        data["totalBudget"] = round(plan_cost, 2)
         # Category/intent come from validated request context, not model
         # improvisation. Persisting this lets dateFullScreen choose itinerary,
         # workout, project, or learning affordances deterministically.
         data["category"] = req.category
-        data["intentType"] = infer_plan_intent(req.category, req.planName, req.detailPrompt)
+        data["intentType"] = intent_type
         
-        print(f"DEBUG: Final data keys before validation: {list(data.keys())}")
+        if debug:
+            logger.debug("Final data keys before validation: %s", list(data))
 
         # Validate with Pydantic (final gate)
         try:
-            validated = PlannerContent(**data)
+            validated = _PLANNER_VALIDATOR.validate_python(data)
+            # Only completions that validated cleanly are worth replaying
+            if completion_key and not replayed:
+                packed = zlib.compress(raw.encode(), 1)
+                with _completion_cache_lock:
+                    _completion_cache[completion_key] = packed
             return validated
         except ValidationError as ve:
             # Format validation errors
@@ -3367,10 +3708,7 @@ TASK EXAMPLES:
                 # Ensure all required fields are present
                 data.setdefault("planName", req.planName)
                 data.setdefault("category", req.category)
-                data.setdefault(
-                    "intentType",
-                    infer_plan_intent(req.category, req.planName, req.detailPrompt),
-                )
+                data.setdefault("intentType", intent_type)
                 data.setdefault("totalDays", req.totalDays)
                 data.setdefault("createdAt", {"seconds": int(time.time()), "nanoseconds": 0})
                 data.setdefault("summary", None)
@@ -3392,7 +3730,7 @@ TASK EXAMPLES:
                     self._handle_generation_failure(req, "Days field is missing or invalid after validation fixes")
                 
                 # Try validation again
-                validated = PlannerContent(**data)
+                validated = _PLANNER_VALIDATOR.validate_python(data)
                 return validated
                 
             except Exception as fix_error:
@@ -3406,15 +3744,152 @@ TASK EXAMPLES:
 
 chat = ChatWrapper(ChatWrapperConfig())
 
-def _cors_headers(origin: Optional[str]) -> Dict[str, str]:
-    # Relaxed CORS; tune for production domains
-    allow_origin = origin or "*"
-    return {
-        "Access-Control-Allow-Origin": allow_origin,
-        "Access-Control-Allow-Methods": "POST, OPTIONS",
+# Relaxed CORS; tune for production domains. The header tables are built once
+# per method list; treat them as read-only (Response copies headers, it never mutates).
+_JSON_CONTENT_TYPE = "application/json; charset=utf-8"
+
+@lru_cache(maxsize=None)
+def _cors_tables(methods: str) -> Tuple[Dict[str, str], Dict[str, str], Dict[str, str]]:
+    """Return (base, wildcard, wildcard_json) CORS header dicts for methods."""
+    base = {
+        "Access-Control-Allow-Methods": methods,
         "Access-Control-Allow-Headers": "Content-Type, Authorization",
         "Access-Control-Max-Age": "3600"
     }
+    wildcard = {"Access-Control-Allow-Origin": "*", **base}
+    return base, wildcard, {**wildcard, "Content-Type": _JSON_CONTENT_TYPE}
+
+def _cors_headers(origin: Optional[str], json_body: bool = False,
+                  methods: str = "POST, OPTIONS") -> Dict[str, str]:
+    base, wildcard, wildcard_json = _cors_tables(methods)
+    if not origin or origin == "*":
+        return wildcard_json if json_body else wildcard
+    headers = {"Access-Control-Allow-Origin": origin, **base}
+    if json_body:
+        headers["Content-Type"] = _JSON_CONTENT_TYPE
+    return headers
+
+# Static error bodies, serialized once at import; _json_response sends bytes
+# through untouched. Only errors with per-request details are encoded per call.
+_METHOD_NOT_ALLOWED_ERR = orjson.dumps({"error": "Use POST with JSON body."})
+_REQUEST_TOO_LARGE_ERR = orjson.dumps({
+    "error": "Request too large",
+    "message": "Request payload is too large. Please simplify your requirements."
+})
+_INVALID_JSON_ERR = orjson.dumps({
+    "error": "Invalid JSON",
+    "message": "The request body must be valid JSON format."
+})
+# Envelopes for unexpected exceptions, matched on the error text
+_AI_UNAVAILABLE_ERR = orjson.dumps({
+    "error": "AI service unavailable",
+    "message": "We're having trouble generating your planner right now. Please try again in a moment."
+})
+_TIMEOUT_ERR = orjson.dumps({
+    "error": "Request timeout",
+    "message": "The request took too long to process. Please try with fewer days or simpler requirements."
+})
+_RATE_LIMITED_ERR = orjson.dumps({
+    "error": "Service temporarily unavailable",
+    "message": "We've reached our service limit. Please try again in a few minutes."
+})
+_GENERATION_FAILED_ERR = orjson.dumps({
+    "error": "Generation failed",
+    "message": "We couldn't generate your planner. Please check your inputs and try again."
+})
+
+# Bodies smaller than this (error messages) aren't worth compressing
+_COMPRESS_MIN_BYTES = 1024
+
+def _pick_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Choose br or gzip from an Accept-Encoding header, or None."""
+    if not accept_encoding:
+        return None
+    offered = set()
+    for token in accept_encoding.split(","):
+        name, _, params = token.partition(";")
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) <= 0:
+                    continue  # explicitly refused
+            except ValueError:
+                pass
+        offered.add(name.strip().lower())
+    if brotli is not None and "br" in offered:
+        return "br"
+    if "gzip" in offered:
+        return "gzip"
+    return None
+
+def _json_response(body: Any, status: int, headers: Dict[str, str], encoding: Optional[str] = None):
+    """Serialize ``body`` with orjson (UTF-8 bytes, no ensure_ascii escaping).
+
+    Pre-serialized ``bytes`` (e.g. from ``TypeAdapter.dump_json``) are sent
+    as-is; Werkzeug derives Content-Length from the bytes body.
+    Large bodies are compressed with ``encoding`` (see _pick_encoding).
+    """
+    data = body if isinstance(body, bytes) else orjson.dumps(body)
+    if encoding and len(data) >= _COMPRESS_MIN_BYTES:
+        if encoding == "br":
+            data = brotli.compress(data, quality=4)
+        else:
+            data = gzip.compress(data, compresslevel=5)
+        headers = {**headers, "Content-Encoding": encoding, "Vary": "Accept-Encoding"}
+    return https_fn.Response(
+        data,
+        status=status,
+        headers=headers
+    )
+
+# Repeat identical requests (same inputs, e.g. retries or the /test endpoint)
+# reuse a recent plan instead of paying another OpenAI round-trip. Per warm
+# instance; set PLANNER_RESPONSE_CACHE_DISABLED to bypass. Plans are cached as
+# JSON bytes without day/task ids, so every hit validates into its own model
+# (callers mutate tasks in place) and gets freshly minted ids.
+_response_cache: TTLCache = TTLCache(maxsize=256, ttl=15 * 60)
+_response_cache_lock = threading.Lock()
+_RESPONSE_CACHE_KEY_FIELDS = (
+    "planName", "category", "totalDays", "minutesPerDay", "intensity", "language",
+    "detailPrompt", "currency", "startDate", "timeOfDay", "fastMode",
+    "skipContextExtraction", "enrich", "userContext", "refinementContext",
+)
+_RESPONSE_CACHE_EXCLUDE = {"days": {"__all__": {"id": True, "tasks": {"__all__": {"id"}}}}}
+
+
+# Raw completion text keyed by a hash of the full OpenAI request, so it also
+# covers callers that bypass generate_cached (main.py, chunk workers) and
+# differing request fields that produce the same prompt. Entries are stored
+# zlib-compressed (level 1): plan JSON shrinks several-fold for well under a
+# millisecond of CPU per store.
+_completion_cache: TTLCache = TTLCache(maxsize=64, ttl=60 * 60)
+_completion_cache_lock = threading.Lock()
+
+
+def _completion_cache_key(request_params: Dict[str, Any]) -> str:
+    return hashlib.sha256(orjson.dumps(request_params, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+def generate_cached(
+    parsed: GeneratePlannerRequest, wrapper: Optional[ChatWrapper] = None
+) -> PlannerContent:
+    """``wrapper.generate()`` memoized on the fields that shape the generated plan."""
+    wrapper = wrapper or chat
+    if os.getenv("PLANNER_RESPONSE_CACHE_DISABLED"):
+        return wrapper.generate(parsed)
+    key = tuple(getattr(parsed, name) for name in _RESPONSE_CACHE_KEY_FIELDS)
+    with _response_cache_lock:
+        cached = _response_cache.get(key)
+    if cached is not None:
+        print("Serving planner content from response cache")
+        content = _PLANNER_VALIDATOR.validate_json(cached)
+        content.createdAt = TimeStamp(seconds=int(time.time()), nanoseconds=0)
+        return content
+    content = wrapper.generate(parsed)
+    cached = _PLANNER_VALIDATOR.dump_json(content, exclude=_RESPONSE_CACHE_EXCLUDE)
+    with _response_cache_lock:
+        _response_cache[key] = cached
+    return content
 
 # Firebase Cloud Function decorator - conditionally applied
 def _firebase_decorator(func):
@@ -3426,65 +3901,57 @@ def _firebase_decorator(func):
 @_firebase_decorator
 def generate_planner_content(req):
     """Main HTTP handler for planner generation"""
-    # Handle both Firebase Request and Flask request objects
-    if FIREBASE_AVAILABLE:
-        origin = req.headers.get("Origin")
-    else:
-        origin = req.headers.get("Origin") if hasattr(req, 'headers') else None
-    
     origin = req.headers.get("Origin")
     if req.method == "OPTIONS":
-        return https_fn.Response("", status=204, headers=_cors_headers(origin))
+        # Preflight: empty bytes body and, for wildcard origins, the shared
+        # header dict. The Response itself is per request because Flask's
+        # after-request hooks may mutate it.
+        return https_fn.Response(b"", status=204, headers=_cors_headers(origin))
+
+    # Built once and shared by every JSON reply below
+    json_headers = _cors_headers(origin, json_body=True)
 
     if req.method != "POST":
-        return https_fn.Response(
-            json.dumps({"error": "Use POST with JSON body."}),
-            status=405,
-            headers={**_cors_headers(origin), "Content-Type": "application/json"}
-        )
+        return _json_response(_METHOD_NOT_ALLOWED_ERR, 405, json_headers)
 
     try:
-        payload = req.get_json(silent=True) or {}
-        
-        # Validate request size and complexity to prevent timeouts
-        if len(str(payload)) > 10000:  # 10KB limit for request payload
-            return https_fn.Response(
-                json.dumps({
-                    "error": "Request too large",
-                    "message": "Request payload is too large. Please simplify your requirements."
-                }),
-                status=400,
-                headers={**_cors_headers(origin), "Content-Type": "application/json"}
-            )
+        # Validated straight from the body bytes; no intermediate dict
+        raw = req.get_data() or b"{}"
         
-        parsed = GeneratePlannerRequest(**payload)
+        # Validate request size and complexity to prevent timeouts.
+        # 10K characters; only decode when the byte count could exceed it.
+        if len(raw) > 10000 and len(raw.decode("utf-8", "replace")) > 10000:
+            return _json_response(_REQUEST_TOO_LARGE_ERR, 400, json_headers)
+        
+        parsed = parse_request(raw)
         
         # Additional validation for large plans that might cause timeouts
         if parsed.totalDays > 60:
-            return https_fn.Response(
-                json.dumps({
-                    "error": "Plan too large",
-                    "message": f"Plans with {parsed.totalDays} days may take too long to generate. Please try with 60 days or fewer."
-                }),
-                status=400,
-                headers={**_cors_headers(origin), "Content-Type": "application/json"}
-            )
+            return _json_response({
+                "error": "Plan too large",
+                "message": f"Plans with {parsed.totalDays} days may take too long to generate. Please try with 60 days or fewer."
+            }, 400, json_headers)
         
         print(f"Processing {parsed.totalDays}-day {parsed.category} plan...")
         start_time = time.time()
         
-        content = chat.generate(parsed)
+        content = generate_cached(parsed)
         
         generation_time = time.time() - start_time
         print(f"Generated {parsed.totalDays}-day plan in {generation_time:.2f} seconds")
         
-        body = content.model_dump()
-        return https_fn.Response(
-            json.dumps(body, ensure_ascii=False),
-            status=200,
-            headers={**_cors_headers(origin), "Content-Type": "application/json"}
+        # Serialize straight from the validated model in pydantic-core instead
+        # of building an intermediate dict tree with model_dump(); dump_json
+        # returns UTF-8 bytes, so there is no str round-trip either.
+        body = _PLANNER_VALIDATOR.dump_json(content)
+        return _json_response(
+            body, 200, json_headers, _pick_encoding(req.headers.get("Accept-Encoding"))
         )
     except ValidationError as ve:
+        # validate_json reports a malformed body as a json_invalid error
+        if ve.errors()[0]["type"] == "json_invalid":
+            return _json_response(_INVALID_JSON_ERR, 400, json_headers)
+
         # Format validation errors in a user-friendly way
         errors = []
         for error in ve.errors():
@@ -3497,64 +3964,35 @@ def generate_planner_content(req):
             "message": "Please check the following fields and try again:",
             "details": errors
         }
-        return https_fn.Response(
-            json.dumps(err, ensure_ascii=False),
-            status=400,
-            headers={**_cors_headers(origin), "Content-Type": "application/json"}
-        )
+        return _json_response(err, 400, json_headers)
     except json.JSONDecodeError:
-        err = {
-            "error": "Invalid JSON",
-            "message": "The request body must be valid JSON format."
-        }
-        return https_fn.Response(
-            json.dumps(err),
-            status=400,
-            headers={**_cors_headers(origin), "Content-Type": "application/json"}
-        )
+        return _json_response(_INVALID_JSON_ERR, 400, json_headers)
     except PlannerGenerationError as pge:
         # Custom planner generation errors with user-friendly messages
         err = {
             "error": "Generation error",
             "message": pge.user_message
         }
-        return https_fn.Response(
-            json.dumps(err, ensure_ascii=False),
-            status=500,
-            headers={**_cors_headers(origin), "Content-Type": "application/json"}
-        )
+        return _json_response(err, 500, json_headers)
     except Exception as e:
         # Provide user-friendly error message without exposing internals
         error_type = type(e).__name__
         
-        # Map common errors to user-friendly messages
-        if "API" in str(e) or "openai" in str(e).lower():
-            err = {
-                "error": "AI service unavailable",
-                "message": "We're having trouble generating your planner right now. Please try again in a moment."
-            }
-        elif "timeout" in str(e).lower():
-            err = {
-                "error": "Request timeout",
-                "message": "The request took too long to process. Please try with fewer days or simpler requirements."
-            }
-        elif "rate" in str(e).lower() or "quota" in str(e).lower():
-            err = {
-                "error": "Service temporarily unavailable",
-                "message": "We've reached our service limit. Please try again in a few minutes."
-            }
+        # Map common errors to user-friendly messages ("API" stays
+        # case-sensitive so words like "rapid" don't read as API errors)
+        message = str(e)
+        lowered = message.lower()
+        if "API" in message or "openai" in lowered:
+            err = _AI_UNAVAILABLE_ERR
+        elif "timeout" in lowered:
+            err = _TIMEOUT_ERR
+        elif "rate" in lowered or "quota" in lowered:
+            err = _RATE_LIMITED_ERR
         else:
-            err = {
-                "error": "Generation failed",
-                "message": "We couldn't generate your planner. Please check your inputs and try again."
-            }
+            err = _GENERATION_FAILED_ERR
         
         # In development, you might want to include more details
         # Uncomment the next line for debugging (but remove in production)
-        # err["debug"] = f"{error_type}: {str(e)}"
+        # err = {**orjson.loads(err), "debug": f"{error_type}: {message}"}
         
-        return https_fn.Response(
-            json.dumps(err, ensure_ascii=False),
-            status=500,
-            headers={**_cors_headers(origin), "Content-Type": "application/json"}
-        )
+        return _json_response(err, 500, json_headers)
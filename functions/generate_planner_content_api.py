@@ -6,11 +6,12 @@ This provides a FastAPI interface to test the planner generation locally.
 
 import os
 import json
+import asyncio
 import uvicorn
 from typing import Optional, Dict, Any
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel, Field
 
 # Try to load environment variables from .env file
@@ -38,7 +39,9 @@ try:
         PlannerContent, 
         ChatWrapper, 
         ChatWrapperConfig,
-        PlannerGenerationError
+        PlannerGenerationError,
+        generate_cached,
+        parse_request,
     )
 except Exception as e:
     if "OPENAI_API_KEY" in str(e):
@@ -202,7 +205,7 @@ async def generate_planner(request: PlannerRequest):
         )
         
         # Generate the planner content
-        content = chat_wrapper.generate(planner_request)
+        content = await chat_wrapper.agenerate(planner_request)
         
         # Convert to dict for JSON response
         content_dict = content.model_dump()
@@ -237,17 +240,14 @@ async def generate_planner_raw(request: Request):
     This endpoint accepts any JSON and passes it directly to the generation function.
     """
     try:
-        # Get raw JSON from request
-        raw_data = await request.json()
-        
-        # Create request model from raw data
-        planner_request = GeneratePlannerRequest(**raw_data)
+        # Validate the raw body directly (no json.loads + dict walk)
+        planner_request = parse_request(await request.body())
         
         # Generate content
-        content = chat_wrapper.generate(planner_request)
+        content = await chat_wrapper.agenerate(planner_request)
         
-        # Return raw content
-        return content.model_dump()
+        # Return raw content, serialized by pydantic-core
+        return Response(content=content.model_dump_json(), media_type="application/json")
         
     except Exception as e:
         raise HTTPException(
@@ -284,8 +284,8 @@ async def test_category(category: str, days: int = 7, minutes: Optional[int] = N
             language="en"
         )
         
-        # Generate content
-        content = chat_wrapper.generate(test_request)
+        # Generate content (identical test requests are served from cache)
+        content = await asyncio.to_thread(generate_cached, test_request, chat_wrapper)
         
         return {
             "success": True,
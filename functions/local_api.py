@@ -180,7 +180,7 @@ def generate_planner_content():
         payload = request.get_json()
         
         logger.info(f"Received payload: {payload}")
-        parsed = gpc.GeneratePlannerRequest(**payload)
+        parsed = gpc.parse_request(payload)
         
         content = gpc.chat.generate(parsed)
         logger.info(f"Generated: {content.planName} with {len(content.days)} days")
@@ -2,6 +2,7 @@
 # This function provides HTTP endpoints for generating and managing school schedules
 
 import json
+import orjson
 import hashlib
 import hmac
 import logging
@@ -142,15 +143,11 @@ def _normalize_xai_voice(raw: str) -> str:
 from firebase_admin import initialize_app, storage, firestore
 from fastapi import HTTPException
 from pydantic import BaseModel, Field, ValidationError
-from dotenv import load_dotenv
+from env_loader import load_local_env
 from datetime import datetime, timedelta, timezone
-from pathlib import Path
 
 # Local overrides only — never deployed as plain env vars by Firebase CLI.
-_functions_dir = Path(__file__).resolve().parent
-load_dotenv(_functions_dir / ".env.local")
-load_dotenv(_functions_dir.parent / ".env")
-load_dotenv()
+load_local_env()
 
 logger = logging.getLogger(__name__)
 
@@ -370,6 +367,14 @@ def with_timeout(seconds: int):
         return wrapper
     return decorator
 
+# create_response encodes with orjson (UTF-8 bytes, no Python-level escaping).
+# Datetimes and dataclasses are passed through to default=str and non-str keys
+# are stringified, so payloads read back exactly as they did via json.dumps.
+_RESPONSE_JSON_OPTS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+)
+
+
 def create_response(
     data: Optional[Dict[str, Any]] = None,
     success: bool = True,
@@ -389,7 +394,7 @@ def create_response(
     }
     headers = {**CORS_HEADERS, **(extra_headers or {})}
     return https_fn.Response(
-        json.dumps(response_data, default=str),
+        orjson.dumps(response_data, default=str, option=_RESPONSE_JSON_OPTS),
         status=status_code,
         headers=headers
     )
@@ -815,7 +820,7 @@ def generate_planner_content(req: https_fn.Request) -> https_fn.Response:
         gpc = get_generate_planner_content()
         payload = req.get_json() or {}
         logger.info("generate_planner_content: days=%s", payload.get("totalDays"))
-        parsed = gpc.GeneratePlannerRequest(**payload)
+        parsed = gpc.parse_request(payload)
         chat = gpc.ChatWrapper(gpc.ChatWrapperConfig())
         content = chat.generate(parsed)
         logger.info(
@@ -5208,7 +5213,7 @@ def _get_firestore_client():
 
 def _create_planner_job(request_data: Dict[str, Any]) -> Dict[str, Any]:
     """Create a new planner generation job in Firestore"""
-    job_id = f"plan_{uuid.uuid4().hex[:12]}"
+    job_id = f"plan_{os.urandom(6).hex()}"
     now = datetime.now(timezone.utc).isoformat()
     
     # Estimate generation time
@@ -5301,7 +5306,7 @@ def _run_planner_generation_background(job_id: str, request_data: Dict[str, Any]
     """
     try:
         gpc = get_generate_planner_content()
-        parsed = gpc.GeneratePlannerRequest(**request_data)
+        parsed = gpc.parse_request(request_data)
 
         _update_planner_job(job_id, {
             "status": "processing",
@@ -5674,7 +5679,7 @@ def generate_planner_content_async(req: https_fn.Request) -> https_fn.Response:
         request_data = req.get_json() or {}
         request_data.setdefault("skipContextExtraction", False)
         
-        parsed = gpc.GeneratePlannerRequest(**request_data)
+        parsed = gpc.parse_request(request_data)
         job = _create_planner_job(parsed.model_dump())
         job_id = job["job_id"]
         
@@ -17,6 +17,8 @@ import re
 from typing import Optional
 
 _HHMM_RE = re.compile(r"(\d{1,2})\s*[:.]\s*(\d{2})")
+# Already-normalized values (every re-validation of a stored plan) skip parsing
+_CANONICAL_RE = re.compile(r"(?:[01]\d|2[0-3]):[0-5]\d", re.ASCII)
 # Letter lookarounds rather than \b: `\bam` never matches "9am" (digit→letter is
 # not a word boundary), while a bare `am` would match inside "amenities".
 _PM_RE = re.compile(r"(?<![a-z])p\.?m\.?(?![a-z])")
@@ -30,6 +32,8 @@ def normalize_clock_time(value: object) -> Optional[str]:
     with nothing to disambiguate it ("3"), is not a time this can recover, and
     inventing one would put a real task at a made-up hour.
     """
+    if isinstance(value, str) and _CANONICAL_RE.fullmatch(value):
+        return value
     text = str(value or "").strip()
     if not text:
         return None
@@ -197,6 +197,9 @@ class PlannerConfig:
 
 class PlannerValidator:
     """Input validation for planner operations"""
+
+    # One case-insensitive scan instead of lowercasing the input per pattern
+    _SUSPICIOUS_RE = re.compile(r"<script>|javascript:|data:text/html|eval\(", re.IGNORECASE)
     
     @staticmethod
     def validate_planner_data(data: Dict[str, Any]) -> bool:
@@ -234,11 +237,10 @@ class PlannerValidator:
             raise ValueError("User input must be a non-empty string")
         
         # Check for potential injection or inappropriate content
-        suspicious_patterns = ['<script>', 'javascript:', 'data:text/html', 'eval(']
-        for pattern in suspicious_patterns:
-            if pattern.lower() in user_input.lower():
-                logger.warning(f"Potential injection attempt in user input: {pattern}")
-                raise ValueError("Invalid input detected")
+        match = PlannerValidator._SUSPICIOUS_RE.search(user_input)
+        if match:
+            logger.warning(f"Potential injection attempt in user input: {match.group(0).lower()}")
+            raise ValueError("Invalid input detected")
         
         return user_input.strip()
 
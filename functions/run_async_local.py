@@ -13,7 +13,6 @@ import os
 import sys
 import json
 import time
-import uuid
 import threading
 from datetime import datetime
 from pathlib import Path
@@ -35,7 +34,7 @@ try:
 except ImportError:
     print("Note: python-dotenv not installed, skipping .env file loading")
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 
 # Ensure the OpenAI API key is set
@@ -67,6 +66,7 @@ from generate_planner_content import (
     ChatWrapper,
     ChatWrapperConfig,
     PlannerGenerationError,
+    parse_request,
 )
 
 app = Flask(__name__)
@@ -86,7 +86,7 @@ def estimate_generation_time(total_days: int, fast_mode: bool) -> int:
 
 def create_job(request_data: GeneratePlannerRequest) -> dict:
     """Create a new generation job"""
-    job_id = f"plan_{uuid.uuid4().hex[:12]}"
+    job_id = f"plan_{os.urandom(6).hex()}"
     now = datetime.utcnow().isoformat()
     
     estimated_time = estimate_generation_time(request_data.totalDays, request_data.fastMode)
@@ -103,7 +103,8 @@ def create_job(request_data: GeneratePlannerRequest) -> dict:
         "current_stage": "initializing",
         "stages_completed": 0,
         "total_stages": 4,
-        "result": None,
+        "result": None,  # PlannerContent JSON, served as-is
+        "result_summary": None,
         "error": None
     }
     
@@ -151,7 +152,14 @@ def complete_job(job_id: str, result: PlannerContent):
             job["stages_completed"] = 4
             job["estimated_seconds_remaining"] = 0
             job["updated_at"] = datetime.utcnow().isoformat()
-            job["result"] = result.model_dump()
+            # Serialized once in pydantic-core; no intermediate dict tree
+            job["result"] = result.model_dump_json()
+            job["result_summary"] = {
+                "planName": result.planName,
+                "category": result.category,
+                "totalDays": result.totalDays,
+                "ready": True
+            }
             print(f"[Job {job_id}] COMPLETED!")
 
 
@@ -220,7 +228,7 @@ def start_planner_generation():
     
     try:
         payload = request.get_json() or {}
-        parsed_request = GeneratePlannerRequest(**payload)
+        parsed_request = parse_request(payload)
         
         # Create job
         job = create_job(parsed_request)
@@ -292,14 +300,8 @@ def get_planner_status():
     if job["status"] == "failed":
         response["error"] = job["error"]
     
-    if job["status"] == "completed" and job.get("result"):
-        result = job["result"]
-        response["resultSummary"] = {
-            "planName": result.get("planName"),
-            "category": result.get("category"),
-            "totalDays": result.get("totalDays"),
-            "ready": True
-        }
+    if job["status"] == "completed" and job.get("result_summary"):
+        response["resultSummary"] = job["result_summary"]
     
     return jsonify(response)
 
@@ -325,7 +327,7 @@ def get_planner_result():
             "progress": job["progress"]
         }), 400
     
-    return jsonify(job["result"])
+    return Response(job["result"], mimetype="application/json")
 
 
 @app.route('/generate_planner_content', methods=['POST', 'OPTIONS'])
@@ -339,7 +341,7 @@ def generate_planner_content_sync():
     
     try:
         payload = request.get_json() or {}
-        parsed_request = GeneratePlannerRequest(**payload)
+        parsed_request = parse_request(payload)
         
         print(f"\n{'='*60}")
         print(f"Synchronous generation request")
@@ -5,13 +5,14 @@ Test script for improved ChatGPT wrapper and planner utilities
 
 import json
 import time
+import asyncio
 import logging
 import unittest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, patch, MagicMock, AsyncMock
 from typing import Dict, Any
 
 # Import the improved modules
-from chatgpt_wrapper import ChatGPTWrapper, ChatConfig, LanguageDetector, RateLimiter
+from chatgpt_wrapper import AsyncChatGPTWrapper, ChatGPTWrapper, ChatConfig, LanguageDetector, RateLimiter
 from planner_utils import PlannerUtils, PlannerConfig, PlannerValidator, PromptBuilder
 from config import get_config, AppConfig
 
@@ -71,6 +72,28 @@ class TestChatGPTWrapper(unittest.TestCase):
         self.assertEqual(detector.get_language_name("th"), "Thai")
         self.assertEqual(detector.get_language_name("unknown"), "unknown")
     
+    def test_script_hint_short_circuits_single_script_text(self):
+        """Test unambiguous scripts skip langdetect; Latin text does not"""
+        self.assertEqual(LanguageDetector._script_hint("สวัสดีครับ"), "th")
+        self.assertEqual(LanguageDetector._script_hint("こんにちは世界"), "ja")
+        self.assertEqual(LanguageDetector._script_hint("안녕하세요"), "ko")
+        self.assertEqual(LanguageDetector._script_hint("你好世界"), "zh-cn")
+        self.assertIsNone(LanguageDetector._script_hint("Selamat pagi semua"))
+        self.assertIsNone(LanguageDetector._script_hint("Meeting with ทีม"))
+
+    def test_language_cache_store_persists_across_instances(self):
+        """Test the SQLite language cache survives a new store instance"""
+        import os
+        import tempfile
+        from chatgpt_wrapper import LanguageCacheStore
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "lang.sqlite3")
+            LanguageCacheStore(path).set("bonjour tout le monde", "fr")
+            self.assertEqual(LanguageCacheStore(path).get("bonjour tout le monde"), "fr")
+            self.assertIsNone(LanguageCacheStore(path).get("unseen text"))
+        self.assertIsNone(LanguageCacheStore("").get("bonjour tout le monde"))
+    
     def test_rate_limiter(self):
         """Test rate limiting functionality"""
         limiter = RateLimiter(max_calls=2, time_window=1.0)
@@ -84,6 +107,8 @@ class TestChatGPTWrapper(unittest.TestCase):
         
         # Third call should be blocked
         self.assertFalse(limiter.can_proceed())
+        self.assertGreater(limiter.get_wait_time(), 0.0)
+        self.assertLessEqual(limiter.get_wait_time(), 0.5)
         
         # Wait and try again
         time.sleep(1.1)
@@ -122,6 +147,115 @@ class TestChatGPTWrapper(unittest.TestCase):
             # Should return error message instead of raising exception
             self.assertIn("unexpected error", response.lower())
 
+    def test_chat_request_config_overrides(self):
+        """Test overrides reuse the base config and keep falsy values like 0.0"""
+        _, config = self.wrapper._build_chat_request("sys", "hello", auto_detect_language=False)
+        self.assertIs(config, self.wrapper.config)
+
+        _, config = self.wrapper._build_chat_request(
+            "sys", "hello", temperature=0.0, auto_detect_language=False
+        )
+        self.assertEqual(config.temperature, 0.0)
+        self.assertEqual(config.max_retries, self.config.max_retries)
+        self.assertEqual(self.wrapper.config.temperature, 1.0)
+
+    def test_handle_api_error_dispatches_on_exception_type(self):
+        """Test error classification uses the exception type, not its message"""
+        import httpx
+        from openai import APITimeoutError, AuthenticationError
+
+        request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+        timeout = APITimeoutError(request=request)
+        auth = AuthenticationError(
+            "ungültiger Schlüssel", response=httpx.Response(401, request=request), body=None
+        )
+
+        self.assertIn("timed out", self.wrapper._handle_api_error(timeout, 1))
+        self.assertIn("configuration error", self.wrapper._handle_api_error(auth, 1))
+        self.assertIn("unexpected error", self.wrapper._handle_api_error(Exception("rate limit timeout"), 1))
+
+    @patch('chatgpt_wrapper.time.sleep')
+    def test_retry_loop_recovers_after_transient_failures(self, mock_sleep):
+        """Test retries are iterative and back off before succeeding"""
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message.content = "Recovered"
+        mock_response.choices[0].finish_reason = "stop"
+
+        self.wrapper.client = Mock()
+        self.wrapper.client.chat.completions.create.side_effect = [
+            Exception("boom"), Exception("boom"), mock_response
+        ]
+
+        config = ChatConfig(model="gpt-5.1", max_retries=3, retry_delay=1.0)
+        response = self.wrapper._make_api_call([{"role": "user", "content": "hi"}], config)
+
+        self.assertEqual(response, "Recovered")
+        self.assertEqual(self.wrapper.client.chat.completions.create.call_count, 3)
+        delays = [c.args[0] for c in mock_sleep.call_args_list]
+        self.assertEqual(len(delays), 2)
+        self.assertTrue(1.0 <= delays[0] < 1.25)
+        self.assertTrue(2.0 <= delays[1] < 2.25)
+
+class TestAsyncChatGPTWrapper(unittest.TestCase):
+    """Test cases for the concurrent async wrapper"""
+
+    def test_chat_many_preserves_order_and_isolates_failures(self):
+        """Test chat_many returns replies in order with per-item exceptions"""
+        def make_response(text):
+            response = Mock()
+            response.choices = [Mock()]
+            response.choices[0].message.content = text
+            response.choices[0].finish_reason = "stop"
+            return response
+
+        async def fake_create(**params):
+            await asyncio.sleep(0)
+            return make_response("reply: " + params["messages"][-1]["content"])
+
+        async def run():
+            with patch.dict('os.environ', {'OPENAI_API_KEY': 'test-key'}):
+                wrapper = AsyncChatGPTWrapper(config=ChatConfig(model="gpt-5.1", max_retries=1))
+            wrapper.client = Mock()
+            wrapper.client.chat.completions.create = AsyncMock(side_effect=fake_create)
+            return await wrapper.chat_many(
+                [
+                    {"system_prompt": "sys", "user_prompt": "first", "auto_detect_language": False},
+                    {"system_prompt": "sys", "user_prompt": "", "auto_detect_language": False},
+                    {"system_prompt": "sys", "user_prompt": "third", "auto_detect_language": False},
+                ],
+                concurrency=2,
+            )
+
+        results = asyncio.run(run())
+        self.assertEqual(results[0], "reply: first")
+        self.assertIsInstance(results[1], RuntimeError)
+        self.assertEqual(results[2], "reply: third")
+
+    @patch('chatgpt_wrapper.asyncio.sleep', new_callable=AsyncMock)
+    def test_retry_policy_is_shared_with_sync_wrapper(self, mock_sleep):
+        """Test the async wrapper backs off like the sync one and exposes only chat calls"""
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message.content = "Recovered"
+        mock_response.choices[0].finish_reason = "stop"
+
+        with patch.dict('os.environ', {'OPENAI_API_KEY': 'test-key'}):
+            wrapper = AsyncChatGPTWrapper(config=ChatConfig(model="gpt-5.1"))
+        wrapper.client = Mock()
+        wrapper.client.chat.completions.create = AsyncMock(
+            side_effect=[Exception("boom"), mock_response]
+        )
+
+        config = ChatConfig(model="gpt-5.1", max_retries=3, retry_delay=1.0)
+        response = asyncio.run(wrapper._make_api_call([{"role": "user", "content": "hi"}], config))
+
+        self.assertEqual(response, "Recovered")
+        self.assertEqual(len(mock_sleep.await_args_list), 1)
+        self.assertTrue(1.0 <= mock_sleep.await_args_list[0].args[0] < 1.25)
+        self.assertFalse(isinstance(wrapper, ChatGPTWrapper))
+        self.assertFalse(hasattr(wrapper, "chat_with_images"))
+
 class TestPlannerUtils(unittest.TestCase):
     """Test cases for improved planner utilities"""
     
@@ -174,6 +308,9 @@ class TestPlannerUtils(unittest.TestCase):
         
         with self.assertRaises(ValueError):
             validator.validate_user_input("<script>alert('xss')</script>")
+
+        with self.assertRaises(ValueError):
+            validator.validate_user_input("Open JavaScript:void(0) then EVAL(x)")
     
     def test_prompt_builder(self):
         """Test prompt building functionality"""
@@ -282,6 +419,15 @@ class TestConfiguration(unittest.TestCase):
             with self.assertRaises(ValueError):
                 get_config()
     
+    def test_bare_app_config_reads_environment(self):
+        """Test AppConfig() resolves the key and settings like from_env()"""
+        with patch.dict('os.environ', {'OPENAI_API_KEY': 'test-key', 'OPENAI_MODEL': 'gpt-test', 'ENVIRONMENT': 'staging'}):
+            config = AppConfig()
+
+            self.assertEqual(config.openai.api_key, 'test-key')
+            self.assertEqual(config.openai.model, 'gpt-test')
+            self.assertEqual(config.environment.value, 'staging')
+
     def test_config_to_dict(self):
         """Test configuration serialization"""
         with patch.dict('os.environ', {'OPENAI_API_KEY': 'test-key'}):
@@ -295,6 +441,9 @@ class TestConfiguration(unittest.TestCase):
             self.assertIn("security", config_dict)
             self.assertIn("monitoring", config_dict)
 
+            config_dict["openai"]["model"] = "mutated"
+            self.assertNotEqual(config.to_dict()["openai"]["model"], "mutated")
+
 class TestIntegration(unittest.TestCase):
     """Integration tests for the improved system"""
     
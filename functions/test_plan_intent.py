@@ -1,11 +1,26 @@
+import asyncio
+import gzip
+import os
+import threading
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import orjson
+
+import generate_planner_content as gpc
 from generate_planner_content import (
     ChatWrapper,
     ChatWrapperConfig,
     DayPlan,
+    GeneratePlannerRequest,
     PlannerContent,
     Task,
     TimeStamp,
+    _gen_ids,
+    _normalize_start_date,
+    generate_cached,
     infer_plan_intent,
+    parse_request,
 )
 from planner_enrichment import EnrichmentConfig, _directive_system_prompt
 
@@ -78,6 +93,379 @@ def test_every_plan_type_gets_a_recalculated_budget():
     assert plan.totalBudget == 275.5
 
 
+def test_generated_ids_are_unique_8_char_hex():
+    ids = _gen_ids(64)
+    assert len(ids) == 64
+    assert len(set(ids)) == 64
+    assert all(len(i) == 8 and int(i, 16) >= 0 for i in ids)
+
+    tasks = [Task(text="Stretch for ten minutes") for _ in range(300)]
+    assert len({task.id for task in tasks}) == 300
+
+
+def test_identical_requests_reuse_cached_plan_with_fresh_timestamp():
+    class CountingWrapper:
+        calls = 0
+
+        def generate(self, req):
+            self.calls += 1
+            return PlannerContent(
+                planName=req.planName,
+                category=req.category,
+                totalDays=1,
+                createdAt=TimeStamp(seconds=1, nanoseconds=0),
+                days=[DayPlan(dayNumber=1, title="Day 1", summary="Start", tasks=[Task(text="Warm up", time="7:00 am")])],
+            )
+
+    gpc._response_cache.clear()
+    wrapper = CountingWrapper()
+    req = GeneratePlannerRequest(planName="Cache check", category="health", totalDays=1, enrich=False)
+
+    first = generate_cached(req, wrapper)
+    second = generate_cached(req, wrapper)
+    other = generate_cached(req.model_copy(update={"language": "th"}), wrapper)
+
+    second.days[0].tasks[0].done = True
+    third = generate_cached(req, wrapper)
+
+    assert wrapper.calls == 2
+    assert second.days[0].tasks[0].text == first.days[0].tasks[0].text
+    assert second.createdAt.seconds > 1
+    assert other is not first
+    assert not first.days[0].tasks[0].done and not third.days[0].tasks[0].done
+    assert third.days[0].tasks[0].time == "07:00"
+    assert len({plan.days[0].tasks[0].id for plan in (first, second, third)}) == 3
+    assert len({plan.days[0].id for plan in (first, second, third)}) == 3
+    gpc._response_cache.clear()
+
+
+def test_streamed_completion_reports_progress_per_day():
+    chunks = ['{"days": [{"day', 'Number": 1, "title": "A"}, {"dayNum', 'ber": 2}, ', '{"dayNumber": 3}]}']
+    events = [
+        SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=c))]) for c in chunks
+    ] + [SimpleNamespace(choices=[])]
+    client = MagicMock()
+    client.chat.completions.create.return_value = iter(events)
+    updates = []
+
+    with patch.object(gpc, "get_openai_client", return_value=client):
+        raw = ChatWrapper(ChatWrapperConfig())._stream_completion({"model": "m"}, 3, updates.append)
+
+    assert raw == "".join(chunks)
+    assert client.chat.completions.create.call_args.kwargs["stream"] is True
+    assert [u["progress_message"] for u in updates] == [
+        "Writing day 1 of 3...",
+        "Writing day 2 of 3...",
+        "Writing day 3 of 3...",
+    ]
+    assert [u["progress"] for u in updates] == sorted(u["progress"] for u in updates)
+
+
+def test_stream_is_abandoned_once_it_overruns_the_requested_days():
+    chunks = ['{"days": [{"dayNumber": 1}, ', '{"dayNumber": 2}, ', '{"dayNumber": 3}, ', '{"dayNumber": 4}]}']
+    stream = MagicMock()
+    stream.__iter__.return_value = iter(
+        SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=c))]) for c in chunks
+    )
+    client = MagicMock()
+    client.chat.completions.create.return_value = stream
+
+    with patch.object(gpc, "get_openai_client", return_value=client):
+        try:
+            ChatWrapper(ChatWrapperConfig())._stream_completion({"model": "m"}, 2, lambda update: None)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("an overrunning stream should be abandoned")
+
+    stream.close.assert_called_once()
+
+
+def test_agenerate_runs_generation_off_the_event_loop_thread():
+    wrapper = ChatWrapper(ChatWrapperConfig())
+    req = GeneratePlannerRequest(planName="Async check", category="health", totalDays=1)
+
+    with patch.object(wrapper, "generate", side_effect=lambda r, cb: threading.current_thread()):
+        worker = asyncio.run(wrapper.agenerate(req))
+
+    assert worker is not threading.current_thread()
+
+
+def test_large_responses_are_compressed_for_accepting_clients():
+    assert gpc._pick_encoding("gzip;q=1.0, br;q=0") == "gzip"
+    assert gpc._pick_encoding("identity") is None
+
+    headers = gpc._cors_headers(None, json_body=True)
+    small = gpc._json_response({"error": "nope"}, 400, headers, "gzip")
+    large = gpc._json_response({"days": ["x" * 4000]}, 200, headers, "gzip")
+
+    assert "Content-Encoding" not in small.headers
+    assert large.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(large.get_data()) == b'{"days":["' + b"x" * 4000 + b'"]}'
+    assert "Content-Encoding" not in headers
+
+
+def test_generate_single_fills_ids_durations_and_budget_in_one_pass():
+    raw = orjson.dumps({
+        "planName": "Morning reset",
+        "category": "health",
+        "totalDays": 1,
+        "createdAt": {"seconds": 5, "nanoseconds": 0},
+        "days": [{
+            "dayNumber": 7,
+            "title": "Day one",
+            "summary": "Start gently",
+            "tips": ["Drink water", "Sleep early"],
+            "tasks": [
+                {"text": "Drink a full glass of water after waking up", "estimatedCost": "12.345"},
+                {"text": "Walk around the block for fresh morning air", "duration_min": 10},
+                {"text": "Write three lines in a gratitude journal today", "estimatedCost": -5},
+            ],
+        }],
+    }).decode()
+    client = MagicMock()
+    client.chat.completions.create.return_value = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=raw))]
+    )
+    req = GeneratePlannerRequest(
+        planName="Morning reset", category="health", totalDays=1,
+        minutesPerDay=30, skipContextExtraction=True, enrich=False,
+    )
+
+    # Completion cache off: this test must neither replay nor leave behind a cached reply
+    with patch.object(gpc, "get_openai_client", return_value=client), \
+            patch.dict(os.environ, {"PLANNER_RESPONSE_CACHE_DISABLED": "1"}):
+        plan = ChatWrapper(ChatWrapperConfig()).generate_single(req)
+
+    day = plan.days[0]
+    assert day.dayNumber == 1
+    assert day.tips == "Drink water\n• Sleep early"
+    assert all(task.id and task.done is False for task in day.tasks)
+    assert [task.duration_min for task in day.tasks] == [10, 10, 10]
+    assert [task.estimatedCost for task in day.tasks] == [12.35, 0, 0]
+    assert plan.totalBudget == 12.35
+    assert plan.createdAt.seconds > 5
+
+
+def test_start_date_iso_fast_path_and_fallback_formats():
+    assert _normalize_start_date("2025-03-04") == "2025-03-04"
+    assert _normalize_start_date("2025-02-30") is None
+    assert _normalize_start_date("2025-03-04\n") is None
+    assert _normalize_start_date("๒๐๒๕-๐๓-๐๔") is None
+    assert _normalize_start_date("12/31/2025") == "2025-12-31"
+    assert _normalize_start_date("2025/3/4") == "2025-03-04"
+    assert _normalize_start_date("next tuesday") is None
+
+
+def test_from_trusted_keeps_validated_parts_and_recomputes_budget():
+    day = DayPlan(dayNumber=1, title="Day 1", summary="Start", tasks=[
+        Task(text="Buy running shoes", estimatedCost=80),
+        Task(text="Book a physio session", estimatedCost=45.25),
+    ])
+    plan = PlannerContent.from_trusted(
+        planName="Run club",
+        category="exercise",
+        totalDays=1,
+        currency="EUR",
+        createdAt=TimeStamp(seconds=1, nanoseconds=0),
+        days=[day],
+    )
+
+    assert plan.days[0] is day
+    assert plan.totalBudget == 125.25
+    assert plan.warning is None
+    assert PlannerContent.model_validate(plan.model_dump()) == plan
+
+
+def test_nested_models_are_not_revalidated_on_assembly():
+    task = Task(text="Pack a water bottle")
+    day = DayPlan(dayNumber=1, title="Day 1", summary="Start", tasks=[task])
+    plan = PlannerContent(
+        planName="Hike",
+        category="travel",
+        totalDays=1,
+        createdAt=TimeStamp(seconds=1, nanoseconds=0),
+        days=[day],
+    )
+
+    assert plan.days[0] is day
+    assert plan.days[0].tasks[0] is task
+
+
+def test_exercise_minutes_are_clamped_to_category_bounds():
+    def minutes(category, value):
+        return GeneratePlannerRequest(
+            planName="Clamp check", category=category, totalDays=3, minutesPerDay=value,
+        ).minutesPerDay
+
+    assert minutes("exercise", 10) == 15
+    assert minutes("exercise", 45) == 45
+    assert minutes("learning", 10) == 10
+
+
+def test_long_plans_are_capped_at_200_total_hours():
+    def minutes(days, value):
+        return GeneratePlannerRequest(
+            planName="Cap check", category="learning", totalDays=days, minutesPerDay=value,
+        ).minutesPerDay
+
+    assert minutes(90, 300) == 133
+    assert minutes(40, 300) == 300
+
+
+def test_extraction_schema_is_prebuilt_per_category():
+    extractor = gpc.ContextExtractor()
+
+    travel = extractor._get_extraction_schema("travel")
+    assert extractor._get_extraction_schema("travel") is travel
+    assert "destination" in travel["schema"]["properties"]["category_specific"]["properties"]
+    assert extractor._get_extraction_schema("wedding") is extractor._get_extraction_schema("other")
+
+
+def test_identical_prompts_replay_the_completion_with_fresh_ids():
+    raw = orjson.dumps({
+        "planName": "Replay check",
+        "category": "health",
+        "totalDays": 1,
+        "days": [{
+            "id": "day-1",
+            "dayNumber": 1,
+            "title": "Day one",
+            "summary": "Start gently",
+            "tasks": [{"id": "task-1", "text": "Drink a full glass of water after waking up"}],
+        }],
+    }).decode()
+    client = MagicMock()
+    client.chat.completions.create.return_value = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=raw))]
+    )
+    req = GeneratePlannerRequest(
+        planName="Replay check", category="health", totalDays=1,
+        skipContextExtraction=True, enrich=False,
+    )
+    gpc._completion_cache.clear()
+
+    with patch.object(gpc, "get_openai_client", return_value=client):
+        wrapper = ChatWrapper(ChatWrapperConfig())
+        first = wrapper.generate_single(req)
+        second = wrapper.generate_single(req)
+
+    assert client.chat.completions.create.call_count == 1
+    assert second.days[0].tasks[0].text == first.days[0].tasks[0].text
+    assert second.days[0].id != first.days[0].id
+    assert second.days[0].tasks[0].id != first.days[0].tasks[0].id
+    assert all(isinstance(packed, bytes) for packed in gpc._completion_cache.values())
+    gpc._completion_cache.clear()
+
+
+def test_parse_request_accepts_dicts_and_raw_json():
+    body = {"planName": "Read more", "category": "learning", "totalDays": 5}
+
+    from_dict = parse_request(body)
+    from_bytes = parse_request(orjson.dumps(body))
+
+    assert isinstance(from_bytes, GeneratePlannerRequest)
+    assert from_bytes == from_dict
+    assert from_dict.totalDays == 5
+
+
+def test_parse_json_response_handles_padded_fenced_and_wrapped_replies():
+    wrapper = ChatWrapper(ChatWrapperConfig())
+
+    assert wrapper._parse_json_response('\n  {"a": 1}  \n') == {"a": 1}
+    assert wrapper._parse_json_response('Here:\n```json\n{"a": 2}\n```') == {"a": 2}
+    assert wrapper._parse_json_response('Sure! {"a": 3} Enjoy.') == {"a": 3}
+    try:
+        wrapper._parse_json_response('{"a": 4,}')
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("malformed JSON should not parse")
+
+
+def test_system_prompt_without_context_is_built_once():
+    wrapper = ChatWrapper(ChatWrapperConfig())
+
+    first = wrapper._build_system_prompt("learning")
+    second = wrapper._build_system_prompt("learning")
+    personalized = wrapper._build_system_prompt(
+        "learning",
+        gpc.ExtractedUserContext.model_validate({"goals": {"primary_goal": "pass the JLPT N4"}}),
+    )
+
+    assert first is second
+    assert personalized.startswith(first[: first.index("\nGENERATION RULES:")])
+    assert "pass the JLPT N4" in personalized
+    assert personalized.endswith(first[first.index("\nGENERATION RULES:"):])
+
+
+def test_chunked_days_are_numbered_once_across_chunks():
+    def fake_single(chunk_req, **kwargs):
+        days = [
+            DayPlan(dayNumber=n, title=f"Day {n}", summary="Chunk day", tasks=[Task(text="Walk 20 minutes")])
+            for n in range(1, chunk_req.totalDays + 1)
+        ]
+        return PlannerContent.from_trusted(
+            planName=chunk_req.planName,
+            category=chunk_req.category,
+            totalDays=chunk_req.totalDays,
+            currency=chunk_req.currency,
+            createdAt=TimeStamp(seconds=1, nanoseconds=0),
+            days=days,
+        )
+
+    wrapper = ChatWrapper(ChatWrapperConfig())
+    req = GeneratePlannerRequest(
+        planName="Walking habit", category="exercise", totalDays=40, skipContextExtraction=True,
+    )
+    outline = gpc.PlanOutline(overview="Build up to daily walks")
+
+    with patch.object(wrapper, "generate_single", side_effect=fake_single) as single:
+        plan = wrapper.generate_chunked(req, plan_outline=outline)
+
+    assert single.call_count > 1
+    assert [d.dayNumber for d in plan.days] == list(range(1, 41))
+
+
+def test_retry_delay_jitters_and_honours_retry_after():
+    throttled = Exception("429")
+    throttled.response = SimpleNamespace(headers={"retry-after": "7"})
+    chunk_error = gpc.PlannerGenerationError("OpenAI rate limit", "Try again")
+    chunk_error.__context__ = throttled
+
+    for attempt in range(6):
+        assert 0 <= gpc._retry_delay(attempt) <= min(2 ** attempt, gpc._RETRY_BACKOFF_CAP)
+    assert 7 <= gpc._retry_delay(0, throttled) < 8
+    assert 7 <= gpc._retry_delay(0, chunk_error, base=0.5) < 7.5
+    throttled.response = SimpleNamespace(headers={"retry-after": "3600"})
+    assert gpc._RETRY_BACKOFF_CAP <= gpc._retry_delay(0, throttled) < gpc._RETRY_BACKOFF_CAP + 1
+    for bad in ("-5", "nan", "soon"):
+        throttled.response = SimpleNamespace(headers={"retry-after": bad})
+        assert 0 <= gpc._retry_delay(2, throttled) <= 4
+
+
+def test_handler_errors_use_prebuilt_envelopes():
+    req = MagicMock()
+    req.headers = {}
+    req.method = "POST"
+    req.get_data.return_value = orjson.dumps({"planName": "Read more", "category": "learning", "totalDays": 3})
+
+    bodies = {}
+    for text in ("OpenAI API unreachable", "Read timeout", "Quota exceeded", "rapid failure"):
+        with patch.object(gpc, "generate_cached", side_effect=RuntimeError(text)):
+            response = gpc.generate_planner_content(req)
+        assert response.status_code == 500
+        bodies[text] = response.get_data()
+
+    assert bodies["OpenAI API unreachable"] == gpc._AI_UNAVAILABLE_ERR
+    assert bodies["Read timeout"] == gpc._TIMEOUT_ERR
+    assert bodies["Quota exceeded"] == gpc._RATE_LIMITED_ERR
+    assert bodies["rapid failure"] == gpc._GENERATION_FAILED_ERR
+
+    req.get_data.return_value = b"{not json"
+    assert gpc.generate_planner_content(req).get_data() == gpc._INVALID_JSON_ERR
+
+
 if __name__ == "__main__":
     test_travel_defaults_to_real_itinerary()
     test_explicit_pre_trip_work_stays_preparation()
@@ -85,4 +473,25 @@ if __name__ == "__main__":
     test_travel_prompt_prohibits_quiz_and_requires_map_ready_places()
     test_place_enrichment_never_substitutes_an_unnamed_venue()
     test_every_plan_type_gets_a_recalculated_budget()
+    test_generated_ids_are_unique_8_char_hex()
+    test_identical_requests_reuse_cached_plan_with_fresh_timestamp()
+    test_streamed_completion_reports_progress_per_day()
+    test_stream_is_abandoned_once_it_overruns_the_requested_days()
+    test_agenerate_runs_generation_off_the_event_loop_thread()
+    test_large_responses_are_compressed_for_accepting_clients()
+    test_generate_single_fills_ids_durations_and_budget_in_one_pass()
+    test_start_date_iso_fast_path_and_fallback_formats()
+    test_from_trusted_keeps_validated_parts_and_recomputes_budget()
+    test_nested_models_are_not_revalidated_on_assembly()
+    test_exercise_minutes_are_clamped_to_category_bounds()
+    test_long_plans_are_capped_at_200_total_hours()
+    test_extraction_schema_is_prebuilt_per_category()
+    test_identical_prompts_replay_the_completion_with_fresh_ids()
+    test_parse_request_accepts_dicts_and_raw_json()
+    test_parse_json_response_handles_padded_fenced_and_wrapped_replies()
+    test_system_prompt_without_context_is_built_once()
+    test_chunked_days_are_numbered_once_across_chunks()
+    test_retry_delay_jitters_and_honours_retry_after()
+    test_handler_errors_use_prebuilt_envelopes()
     print("plan intent tests passed")
+